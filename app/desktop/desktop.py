@@ -1,4 +1,5 @@
 import contextlib
+import multiprocessing
 import os
 import sys
 import tkinter as tk
@@ -86,6 +87,8 @@ def close_splash():
 
 
 if __name__ == "__main__":
+    # Must be first: in the frozen app, worker processes (eg parallel model loading) re-launch this executable
+    multiprocessing.freeze_support()
     # run the server in a thread, and shut down server when main thread exits
     # use_colors=False to disable colored logs, as windows doesn't support them
     config = server_config()
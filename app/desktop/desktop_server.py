@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import threading
 import time
@@ -7,6 +8,9 @@ import kiln_ai.datamodel.strict_mode as datamodel_strict_mode
 import kiln_server.server as kiln_server
 import uvicorn
 from fastapi import FastAPI
+from kiln_ai.datamodel.basemodel import shutdown_model_load_pool
+from kiln_ai.datamodel.write_behind import WriteBehindQueue
+from kiln_ai.utils.http_client import HttpClientPool
 
 from app.desktop.log_config import log_config
 from app.desktop.studio_server.data_gen_api import connect_data_gen_api
@@ -25,6 +29,12 @@ async def lifespan(app: FastAPI):
     original_strict_mode = datamodel_strict_mode.strict_mode()
     datamodel_strict_mode.set_strict_mode(True)
     yield
+    # Write any queued saves before we exit
+    await asyncio.to_thread(WriteBehindQueue.shared().flush)
+    # Close pooled provider connections
+    await HttpClientPool.shared().aclose()
+    # Stop parallel model loading workers, if started
+    await asyncio.to_thread(shutdown_model_load_pool)
     # Reset datamodel strict mode on shutdown
     datamodel_strict_mode.set_strict_mode(original_strict_mode)
 
@@ -1,9 +1,24 @@
 import math
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Sequence
 
+import numpy as np
 from scipy import stats
 
+# Columns of the score array
+MEASURED, HUMAN, NORMALIZED_MEASURED, NORMALIZED_HUMAN = range(4)
+# Scores added one at a time are buffered, and appended to the array in chunks of this size
+CHUNK_SIZE = 1024
+# Error metrics, in the column order of _item_errors
+ERROR_METRICS = (
+    "mean_absolute_error",
+    "mean_normalized_absolute_error",
+    "mean_squared_error",
+    "mean_normalized_squared_error",
+)
+# Bound the memory of bootstrap resampling: resamples are computed in batches of about this many values
+BOOTSTRAP_BATCH_VALUES = 1_000_000
+
 
 @dataclass
 class CorrelationScore:
@@ -13,6 +28,12 @@ class CorrelationScore:
     normalized_human_score: float
 
 
+@dataclass
+class ConfidenceInterval:
+    lower: float
+    upper: float
+
+
 @dataclass
 class CorrelationResult:
     mean_absolute_error: float
@@ -22,89 +43,282 @@ class CorrelationResult:
     spearman_correlation: float | None
     pearson_correlation: float | None
     kendalltau_correlation: float | None
+    # Bootstrap confidence intervals, if requested: metric name (a field above) -> interval.
+    # Metrics without an interval (kendalltau, or correlations undefined for the data) are omitted.
+    confidence_intervals: Dict[str, ConfidenceInterval] | None = None
 
 
 class CorrelationCalculator:
     def __init__(self):
-        self.scores: List[CorrelationScore] = []
+        # Scores are kept in (n, 4) float arrays, see the column constants. Concatenated into one array when read.
+        self._chunks: List[np.ndarray] = []
+        self._count = 0
+        self._pending: List[Sequence[float]] = []
+
+    @property
+    def scores(self) -> List[CorrelationScore]:
+        return [
+            CorrelationScore(*(float(value) for value in row)) for row in self.values()
+        ]
+
+    def __len__(self) -> int:
+        return self._count + len(self._pending)
 
     def add_score(self, score: CorrelationScore):
-        self.scores.append(score)
+        self._pending.append(
+            (
+                score.measured_score,
+                score.human_score,
+                score.normalized_measured_score,
+                score.normalized_human_score,
+            )
+        )
+        if len(self._pending) >= CHUNK_SIZE:
+            self._flush()
+
+    def add_scores(
+        self,
+        measured_scores: Sequence[float],
+        human_scores: Sequence[float],
+        normalized_measured_scores: Sequence[float],
+        normalized_human_scores: Sequence[float],
+    ):
+        """Add a chunk of scores at once. Each argument is a sequence (or array) of the same length."""
+        chunk = np.column_stack(
+            [
+                np.asarray(measured_scores, dtype=np.float64),
+                np.asarray(human_scores, dtype=np.float64),
+                np.asarray(normalized_measured_scores, dtype=np.float64),
+                np.asarray(normalized_human_scores, dtype=np.float64),
+            ]
+        )
+        self._flush()
+        self._chunks.append(chunk)
+        self._count += len(chunk)
+
+    def values(self) -> np.ndarray:
+        """All scores as a (n, 4) array. Don't modify."""
+        self._flush()
+        if len(self._chunks) != 1:
+            self._chunks = [
+                np.concatenate(self._chunks)
+                if self._chunks
+                else np.empty((0, 4), dtype=np.float64)
+            ]
+        return self._chunks[0]
+
+    def _flush(self):
+        if self._pending:
+            self._chunks.append(np.array(self._pending, dtype=np.float64))
+            self._count += len(self._pending)
+            self._pending = []
 
-    def calculate_correlation(self) -> CorrelationResult:
-        if len(self.scores) == 0:
+    def calculate_correlation(
+        self,
+        confidence_level: float | None = None,
+        bootstrap_resamples: int = 1000,
+        seed: int | None = None,
+    ) -> CorrelationResult:
+        """Calculate error and correlation metrics for all scores.
+
+        Args:
+            confidence_level: If set (eg 0.95), also calculate percentile bootstrap confidence intervals at this level.
+            bootstrap_resamples: The number of bootstrap resamples for confidence intervals.
+            seed: Random seed for resampling, for reproducible intervals.
+        """
+        if len(self) == 0:
             raise ValueError("No scores to calculate correlation")
 
-        return CorrelationResult(
-            mean_absolute_error=self.calculate_mean_absolute_error(),
-            mean_normalized_absolute_error=self.calculate_mean_normalized_absolute_error(),
-            mean_squared_error=self.calculate_mean_squared_error(),
-            mean_normalized_squared_error=self.calculate_mean_normalized_squared_error(),
+        errors = self._errors()
+        result = CorrelationResult(
+            **errors,
             spearman_correlation=self.calculate_spearman_correlation(),
             pearson_correlation=self.calculate_pearson_correlation(),
             kendalltau_correlation=self.calculate_kendalltau_correlation(),
         )
+        if confidence_level is not None:
+            result.confidence_intervals = self.calculate_confidence_intervals(
+                confidence_level, bootstrap_resamples, seed
+            )
+        return result
 
-    def calculate_mean_absolute_error(self) -> float:
-        total_absolute_error = sum(
-            abs(score.measured_score - score.human_score) for score in self.scores
+    def _errors(self) -> Dict[str, float]:
+        # All four error metrics in one vectorized pass
+        means = _item_errors(self.values()).mean(axis=0)
+        return {name: float(mean) for name, mean in zip(ERROR_METRICS, means)}
+
+    def calculate_confidence_intervals(
+        self,
+        confidence_level: float = 0.95,
+        bootstrap_resamples: int = 1000,
+        seed: int | None = None,
+    ) -> Dict[str, ConfidenceInterval]:
+        """Percentile bootstrap confidence intervals for the error metrics, and the Pearson and Spearman correlations.
+
+        Kendall's tau isn't included: it's quadratic in the number of scores for each resample.
+        """
+        if not 0 < confidence_level < 1:
+            raise ValueError("Confidence level must be between 0 and 1")
+        if bootstrap_resamples < 1:
+            raise ValueError("Bootstrap resamples must be at least 1")
+        if len(self) == 0:
+            raise ValueError("No scores to calculate correlation")
+
+        # Resamples are computed in batches, as arrays. Ratings have few distinct values, so rather than
+        # gathering each resample's scores, each resample is a row of counts of the distinct score pairs drawn.
+        # Every metric is then a weighted sum over the pairs.
+        values = self.values()
+        n = len(values)
+        pairs, pair_codes = np.unique(values, axis=0, return_inverse=True)
+        pair_codes = pair_codes.ravel()
+        pair_errors = _item_errors(pairs)
+        measured_values, measured_codes = np.unique(
+            pairs[:, MEASURED], return_inverse=True
         )
-        return total_absolute_error / len(self.scores)
+        human_values, human_codes = np.unique(pairs[:, HUMAN], return_inverse=True)
+
+        rng = np.random.default_rng(seed)
+        batch_size = max(1, BOOTSTRAP_BATCH_VALUES // n)
+        metrics: Dict[str, List[np.ndarray]] = {}
+        for start in range(0, bootstrap_resamples, batch_size):
+            count = min(batch_size, bootstrap_resamples - start)
+            indexes = rng.integers(0, n, size=(count, n))
+            # (count, pairs): times each distinct score pair was drawn in each resample
+            weights = _row_bincount(pair_codes[indexes], len(pairs)).astype(np.float64)
+
+            batch = dict(zip(ERROR_METRICS, (weights @ pair_errors / n).T))
+            if n >= 2:
+                batch["spearman_correlation"] = _weighted_pearson(
+                    _resample_ranks(weights, measured_codes, len(measured_values)),
+                    _resample_ranks(weights, human_codes, len(human_values)),
+                    weights,
+                )
+                batch["pearson_correlation"] = _weighted_pearson(
+                    pairs[:, MEASURED], pairs[:, HUMAN], weights
+                )
+            for name, metric_values in batch.items():
+                metrics.setdefault(name, []).append(metric_values)
+
+        alpha = (1 - confidence_level) / 2
+        intervals: Dict[str, ConfidenceInterval] = {}
+        for name, batches in metrics.items():
+            metric_values = np.concatenate(batches)
+            # Resamples with constant scores have no correlation
+            metric_values = metric_values[~np.isnan(metric_values)]
+            if len(metric_values) == 0:
+                continue
+            lower, upper = np.quantile(metric_values, [alpha, 1 - alpha])
+            intervals[name] = ConfidenceInterval(lower=float(lower), upper=float(upper))
+        return intervals
+
+    def calculate_mean_absolute_error(self) -> float:
+        return self._errors()["mean_absolute_error"]
 
     def calculate_mean_normalized_absolute_error(self) -> float:
-        total_normalized_absolute_error = sum(
-            abs(score.normalized_measured_score - score.normalized_human_score)
-            for score in self.scores
-        )
-        return total_normalized_absolute_error / len(self.scores)
+        return self._errors()["mean_normalized_absolute_error"]
 
     def calculate_mean_squared_error(self) -> float:
-        total_squared_error = sum(
-            (score.measured_score - score.human_score) ** 2 for score in self.scores
-        )
-        return total_squared_error / len(self.scores)
+        return self._errors()["mean_squared_error"]
 
     def calculate_mean_normalized_squared_error(self) -> float:
-        total_normalized_squared_error = sum(
-            (score.normalized_measured_score - score.normalized_human_score) ** 2
-            for score in self.scores
-        )
-        return total_normalized_squared_error / len(self.scores)
+        return self._errors()["mean_normalized_squared_error"]
 
     def calculate_spearman_correlation(self) -> float | None:
-        if len(self.scores) < 2:
+        if len(self) < 2:
             # If there is only one pair, no correlation
             return None
-        x = [score.measured_score for score in self.scores]
-        y = [score.human_score for score in self.scores]
-        result = stats.spearmanr(x, y)
-        # library doesn't support proper types
-        correlation = result.__getattribute__("correlation")
-        if math.isnan(correlation) or not isinstance(correlation, float):
-            # Very small samples may have a NaN result (unknown correlation)
-            return None
-        return correlation
+        values = self.values()
+        return _correlation_or_none(
+            _pearson(
+                stats.rankdata(values[:, MEASURED]), stats.rankdata(values[:, HUMAN])
+            )
+        )
 
     def calculate_pearson_correlation(self) -> float | None:
-        if len(self.scores) < 2:
+        if len(self) < 2:
             # If there is only one pair,  no correlation
             return None
-        x = [score.measured_score for score in self.scores]
-        y = [score.human_score for score in self.scores]
-        result = stats.pearsonr(x, y)
-        if math.isnan(result.correlation):
-            # Very small samples may have a NaN result (unknown correlation)
-            return None
-        return result.correlation
+        values = self.values()
+        return _correlation_or_none(_pearson(values[:, MEASURED], values[:, HUMAN]))
 
     def calculate_kendalltau_correlation(self) -> float | None:
-        if len(self.scores) < 2:
+        if len(self) < 2:
             # If there is only one pair, no correlation
             return None
-        x = [score.measured_score for score in self.scores]
-        y = [score.human_score for score in self.scores]
-        result = stats.kendalltau(x, y)
-        if math.isnan(result.correlation):
-            # Very small samples may have a NaN result (unknown correlation)
-            return None
-        return result.correlation
+        values = self.values()
+        result = stats.kendalltau(values[:, MEASURED], values[:, HUMAN])
+        return _correlation_or_none(result.correlation)
+
+
+def _correlation_or_none(correlation: float | np.ndarray) -> float | None:
+    correlation = float(correlation)
+    if math.isnan(correlation):
+        # Very small samples may have a NaN result (unknown correlation)
+        return None
+    return correlation
+
+
+def _item_errors(values: np.ndarray) -> np.ndarray:
+    """Errors of each score in a (n, 4) array, as a (n, 4) array with columns in ERROR_METRICS order."""
+    differences = (
+        values[:, [MEASURED, NORMALIZED_MEASURED]]
+        - values[:, [HUMAN, NORMALIZED_HUMAN]]
+    )
+    return np.concatenate([np.abs(differences), np.square(differences)], axis=1)
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """Pearson correlation. NaN if undefined (constant input)."""
+    x = x - x.mean()
+    y = y - y.mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = (x * y).sum() / np.sqrt(np.square(x).sum() * np.square(y).sum())
+    # Clamp float error past +/-1
+    return float(np.clip(correlation, -1.0, 1.0))
+
+
+def _weighted_pearson(x: np.ndarray, y: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Pearson correlation of each row of weights (counts of each value). NaN where undefined.
+
+    x and y are values, (values,) or one row per weights row (rows, values).
+    """
+    total = weights.sum(axis=1, keepdims=True)
+    x = x - (weights * x).sum(axis=1, keepdims=True) / total
+    y = y - (weights * y).sum(axis=1, keepdims=True) / total
+    covariance = (weights * x * y).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.sqrt(
+            (weights * x * x).sum(axis=1) * (weights * y * y).sum(axis=1)
+        )
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _row_bincount(codes: np.ndarray, length: int) -> np.ndarray:
+    """Count each code (0 to length-1) in each row of a 2D array: a (rows, length) array."""
+    rows = codes.shape[0]
+    offsets = np.arange(rows)[:, np.newaxis] * length
+    return np.bincount((codes + offsets).ravel(), minlength=rows * length).reshape(
+        rows, length
+    )
+
+
+def _resample_ranks(
+    weights: np.ndarray, codes: np.ndarray, values_count: int
+) -> np.ndarray:
+    """Ranks (ties averaged) of one score of the distinct pairs, in each resample.
+
+    Args:
+        weights: (resamples, pairs) counts of each pair drawn
+        codes: (pairs,) index of each pair's score in the sorted distinct values of that score
+        values_count: number of distinct values of the score
+    """
+    resamples = weights.shape[0]
+    offsets = np.arange(resamples)[:, np.newaxis] * values_count
+    counts = np.bincount(
+        (codes + offsets).ravel(),
+        weights=weights.ravel(),
+        minlength=resamples * values_count,
+    ).reshape(resamples, values_count)
+    # The average of the ranks each value spans. Values not drawn get a rank, but have no weight.
+    value_ranks = np.cumsum(counts, axis=1) - (counts - 1) / 2
+    return value_ranks[:, codes]
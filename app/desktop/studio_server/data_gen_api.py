@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from kiln_ai.adapters.adapter_registry import adapter_for_task
+from kiln_ai.adapters.call_scheduler import CallPriority, call_priority
 from kiln_ai.adapters.data_gen.data_gen_task import (
     DataGenCategoriesTask,
     DataGenCategoriesTaskInput,
@@ -92,7 +93,8 @@ def connect_data_gen_api(app: FastAPI):
             provider=model_provider_from_string(input.provider),
         )
 
-        categories_run = await adapter.invoke(task_input.model_dump())
+        with call_priority(CallPriority.data_gen):
+            categories_run = await adapter.invoke(task_input.model_dump())
         return categories_run
 
     @app.post("/api/projects/{project_id}/tasks/{task_id}/generate_samples")
@@ -115,7 +117,8 @@ def connect_data_gen_api(app: FastAPI):
             provider=model_provider_from_string(input.provider),
         )
 
-        samples_run = await adapter.invoke(task_input.model_dump())
+        with call_priority(CallPriority.data_gen):
+            samples_run = await adapter.invoke(task_input.model_dump())
         return samples_run
 
     @app.post("/api/projects/{project_id}/tasks/{task_id}/save_sample")
@@ -154,13 +157,14 @@ def connect_data_gen_api(app: FastAPI):
         if topic_path:
             properties["topic_path"] = topic_path
 
-        run = await adapter.invoke(
-            input=sample.input,
-            input_source=DataSource(
-                type=DataSourceType.synthetic,
-                properties=properties,
-            ),
-        )
+        with call_priority(CallPriority.data_gen):
+            run = await adapter.invoke(
+                input=sample.input,
+                input_source=DataSource(
+                    type=DataSourceType.synthetic,
+                    properties=properties,
+                ),
+            )
 
         run.save_to_file()
         return run
@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Set, Tuple
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from kiln_ai.adapters.eval.eval_runner import EvalRunner
+from kiln_ai.adapters.eval.score_aggregates import EvalScoreAggregates
 from kiln_ai.adapters.ml_model_list import ModelProviderName
 from kiln_ai.adapters.prompt_builders import prompt_builder_from_id
 from kiln_ai.datamodel import (
@@ -28,6 +29,7 @@ from kiln_ai.datamodel.json_schema import string_to_json_key
 from kiln_ai.datamodel.prompt_id import is_frozen_prompt
 from kiln_ai.datamodel.task import RunConfigProperties, TaskRunConfig
 from kiln_ai.datamodel.task_output import normalize_rating
+from kiln_ai.datamodel.write_behind import WriteBehindQueue
 from kiln_ai.utils.name_generator import generate_memorable_name
 from kiln_server.task_api import task_from_id
 from pydantic import BaseModel
@@ -38,12 +40,17 @@ from .correlation_calculator import (
     CorrelationScore,
 )
 
+# Progress updates for a large, fast eval run arrive far faster than the UI can use them. Coalesce to at most this many SSE messages per second.
+MAX_PROGRESS_UPDATES_PER_SECOND = 10
+# Level of the (optional) bootstrap confidence intervals for eval config correlations with human ratings
+CORRELATION_CONFIDENCE_LEVEL = 0.95
+
 
 def eval_from_id(project_id: str, task_id: str, eval_id: str) -> Eval:
     task = task_from_id(project_id, task_id)
-    for eval in task.evals():
-        if eval.id == eval_id:
-            return eval
+    eval = Eval.from_id_and_parent_path(eval_id, task.path)
+    if eval:
+        return eval
 
     raise HTTPException(
         status_code=404,
@@ -55,9 +62,9 @@ def eval_config_from_id(
     project_id: str, task_id: str, eval_id: str, eval_config_id: str
 ) -> EvalConfig:
     eval = eval_from_id(project_id, task_id, eval_id)
-    for config in eval.configs():
-        if config.id == eval_config_id:
-            return config
+    config = EvalConfig.from_id_and_parent_path(eval_config_id, eval.path)
+    if config:
+        return config
 
     raise HTTPException(
         status_code=404,
@@ -69,9 +76,9 @@ def task_run_config_from_id(
     project_id: str, task_id: str, run_config_id: str
 ) -> TaskRunConfig:
     task = task_from_id(project_id, task_id)
-    for run_config in task.run_configs():
-        if run_config.id == run_config_id:
-            return run_config
+    run_config = TaskRunConfig.from_id_and_parent_path(run_config_id, task.path)
+    if run_config:
+        return run_config
 
     raise HTTPException(
         status_code=404,
@@ -83,11 +90,16 @@ async def run_eval_runner_with_status(eval_runner: EvalRunner) -> StreamingRespo
     # Yields async messages designed to be used with server sent events (SSE)
     # https://developer.mozilla.org/en-US/docs/Web/API/Server-sent_events/Using_server-sent_events
     async def event_generator():
-        async for progress in eval_runner.run():
+        async for progress in eval_runner.run(
+            max_updates_per_second=MAX_PROGRESS_UPDATES_PER_SECOND
+        ):
             data = {
                 "progress": progress.complete,
                 "total": progress.total,
                 "errors": progress.errors,
+                "concurrency": progress.concurrency,
+                "items_per_second": progress.items_per_second,
+                "eta_seconds": progress.eta_seconds,
             }
             yield f"data: {json.dumps(data)}\n\n"
 
@@ -399,6 +411,8 @@ def connect_evals_api(app: FastAPI):
             eval_configs=[eval_config],
             run_configs=run_configs,
             eval_run_type="task_run_eval",
+            write_queue=WriteBehindQueue.shared(),
+            adaptive_concurrency=True,
         )
 
         return await run_eval_runner_with_status(eval_runner)
@@ -433,6 +447,8 @@ def connect_evals_api(app: FastAPI):
             eval_configs=eval_configs,
             run_configs=None,
             eval_run_type="eval_config_eval",
+            write_queue=WriteBehindQueue.shared(),
+            adaptive_concurrency=True,
         )
 
         return await run_eval_runner_with_status(eval_runner)
@@ -485,74 +501,38 @@ def connect_evals_api(app: FastAPI):
                 detail="No dataset ids in eval set filter. Add items to your dataset matching the eval set filter.",
             )
 
-        # save a copy of the expected dataset ids for each run config, we'll update each as we process each eval run
-        remaining_expected_dataset_ids: Dict[ID_TYPE, Set[ID_TYPE]] = {
-            run_config.id: set(expected_dataset_ids) for run_config in task_runs_configs
-        }
-        # Track how often we are missing scores in a eval_config. Should be 0 for a complete eval_config
-        partial_incomplete_counts: Dict[ID_TYPE, int] = {
-            run_config.id: 0 for run_config in task_runs_configs
-        }
-
-        # task_run_config_id -> output_score_json_key -> score/total for calculating the mean score
-        total_scores: Dict[ID_TYPE, Dict[str, float]] = {}
-        score_counts: Dict[ID_TYPE, Dict[str, int]] = {}
-
-        for eval_run in eval_config.runs(readonly=True):
-            if eval_run.task_run_config_id is None:
-                # This eval_run is not associated with a run_config, so we should not count it
-                continue
-            run_config_id = eval_run.task_run_config_id
+        # Running aggregates of the eval config's runs, rather than loading every eval run
+        eval_config_scores = EvalScoreAggregates.shared().scores(
+            eval_config,
+            [output_score.json_key() for output_score in eval.output_scores],
+        )
 
-            # Check if we should count this eval_run. Not every eval_run has to go into the stats:
-            # - a dataset_id can be removed from the dataset filter (removed a tag)
-            # - this dataset_id was already counted (not great there are dupes, but shouldn't be double counted if there are)
-            if run_config_id not in remaining_expected_dataset_ids:
-                # This run_config is not in the eval config, so we should not count it
-                continue
-            if eval_run.dataset_id not in remaining_expected_dataset_ids[run_config_id]:
+        results: Dict[ID_TYPE, Dict[str, ScoreSummary]] = {}
+        run_config_percent_complete: Dict[ID_TYPE, float] = {}
+        for run_config in task_runs_configs:
+            aggregate = eval_config_scores.by_run_config.get(run_config.id)
+            if aggregate is not None:
+                # Not every eval_run has to go into the stats: a dataset_id can be removed from the dataset filter (removed a tag)
+                aggregate = aggregate.within(expected_dataset_ids)
+            if aggregate is None or len(aggregate.items) == 0:
+                run_config_percent_complete[run_config.id] = 0.0
                 continue
-            else:
-                remaining_expected_dataset_ids[run_config_id].remove(
-                    eval_run.dataset_id
-                )
 
-            incomplete = False
+            # Convert to score summaries
+            results[run_config.id] = {}
             for output_score in eval.output_scores:
                 score_key = output_score.json_key()
-                if run_config_id not in total_scores:
-                    total_scores[run_config_id] = {}
-                    score_counts[run_config_id] = {}
-                if score_key not in total_scores[run_config_id]:
-                    total_scores[run_config_id][score_key] = 0
-                    score_counts[run_config_id][score_key] = 0
-                if score_key in eval_run.scores:
-                    total_scores[run_config_id][score_key] += eval_run.scores[score_key]
-                    score_counts[run_config_id][score_key] += 1
-                else:
-                    # We're missing a required score, so this eval_run is incomplete
-                    incomplete = True
-
-            if incomplete:
-                partial_incomplete_counts[run_config_id] += 1
-
-        # Convert to score summaries
-        results: Dict[ID_TYPE, Dict[str, ScoreSummary]] = {}
-        for run_config_id, output_scores in total_scores.items():
-            results[run_config_id] = {}
-            for output_score_id, score in output_scores.items():
-                count = score_counts[run_config_id][output_score_id]
-                if count > 0:
-                    results[run_config_id][output_score_id] = ScoreSummary(
-                        mean_score=score / count
+                stats = aggregate.stats.get(score_key)
+                mean_score = stats.mean() if stats is not None else None
+                if mean_score is not None:
+                    results[run_config.id][score_key] = ScoreSummary(
+                        mean_score=mean_score
                     )
 
-        # Calculate the percent of the dataset that has been processed
-        run_config_percent_complete: Dict[ID_TYPE, float] = {}
-        for run_config in task_runs_configs:
+            # Calculate the percent of the dataset that has been processed
             # Partial incomplete (missing scores), and fully incomplete (no eval_run)
-            incomplete_count = partial_incomplete_counts[run_config.id] + len(
-                remaining_expected_dataset_ids[run_config.id]
+            incomplete_count = len(aggregate.incomplete) + (
+                len(expected_dataset_ids) - len(aggregate.items)
             )
             percent_incomplete = incomplete_count / len(expected_dataset_ids)
             run_config_percent_complete[run_config.id] = 1 - percent_incomplete
@@ -571,6 +551,7 @@ def connect_evals_api(app: FastAPI):
         project_id: str,
         task_id: str,
         eval_id: str,
+        confidence_intervals: bool = Query(False),
     ) -> EvalConfigCompareSummary:
         task = task_from_id(project_id, task_id)
         eval = eval_from_id(project_id, task_id, eval_id)
@@ -597,39 +578,33 @@ def connect_evals_api(app: FastAPI):
                 not_rated_count=0,
             )
 
-        # save a copy of the expected dataset ids for each eval config id, we'll update each as we process each eval run
-        remaining_expected_dataset_ids: Dict[ID_TYPE, Set[ID_TYPE]] = {
-            eval_config.id: set(expected_dataset_ids) for eval_config in eval_configs
-        }
+        score_keys = [output_score.json_key() for output_score in eval.output_scores]
 
         # eval_config_id -> output_score_json_key -> correlation calculator
         correlation_calculators: Dict[ID_TYPE, Dict[str, CorrelationCalculator]] = {}
+        eval_config_percent_complete: Dict[ID_TYPE, float] = {}
 
         for eval_config in eval_configs:
-            for eval_run in eval_config.runs(readonly=True):
-                dataset_item = expected_dataset_items.get(eval_run.dataset_id, None)
-                if dataset_item is None:
-                    # A dataset_id can be removed from the dataset filter (ran previously, then removed the tag to remove it from the eval config set filter)
-                    # A dataset_id could be for an run_config, not for comparing eval at all
-                    continue
+            # Running aggregates of the eval config's runs, rather than loading every eval run.
+            # A dataset_id can be removed from the dataset filter (ran previously, then removed the tag to remove it from the eval config set filter)
+            aggregate = (
+                EvalScoreAggregates.shared()
+                .scores(eval_config, score_keys)
+                .by_dataset_item.within(expected_dataset_ids)
+            )
 
-                # Check if we should count this eval_run. Not every eval_run has to go into the stats:
-                # Example: this dataset_id was already counted (not great there are dupes, but shouldn't be double counted if there are)
-                if (
-                    eval_run.dataset_id
-                    not in remaining_expected_dataset_ids[eval_config.id]
-                ):
-                    continue
-                else:
-                    remaining_expected_dataset_ids[eval_config.id].remove(
-                        eval_run.dataset_id
-                    )
+            # Calculate the percent of the dataset that has been processed
+            incomplete_count = len(expected_dataset_ids) - len(aggregate.items)
+            percent_incomplete = incomplete_count / len(expected_dataset_ids)
+            eval_config_percent_complete[eval_config.id] = 1 - percent_incomplete
 
+            for dataset_id, eval_scores in aggregate.items.items():
+                dataset_item = expected_dataset_items[dataset_id]
                 for output_score in eval.output_scores:
                     score_key = output_score.json_key()
-                    eval_score: float | None = eval_run.scores.get(score_key, None)
+                    eval_score: float | None = eval_scores.get(score_key, None)
 
-                    # Fetch the human eval score from the dataset item
+                    # Fetch the human eval score from the dataset item. Ratings can change at any time, so these aren't aggregated.
                     human_score = human_score_from_task_run(
                         dataset_item, score_key, score_key_to_task_requirement_id
                     )
@@ -675,16 +650,15 @@ def connect_evals_api(app: FastAPI):
                     # No scores to calculate correlation for this pair
                     continue
 
-                correlation_result = calculator.calculate_correlation()
+                correlation_result = calculator.calculate_correlation(
+                    confidence_level=CORRELATION_CONFIDENCE_LEVEL
+                    if confidence_intervals
+                    else None,
+                    # Fixed seed: intervals don't jitter between polls
+                    seed=0,
+                )
                 results[eval_config_id][score_key] = correlation_result
 
-        # Calculate the percent of the dataset that has been processed
-        eval_config_percent_complete: Dict[ID_TYPE, float] = {}
-        for eval_config in eval_configs:
-            incomplete_count = len(remaining_expected_dataset_ids[eval_config.id])
-            percent_incomplete = incomplete_count / len(expected_dataset_ids)
-            eval_config_percent_complete[eval_config.id] = 1 - percent_incomplete
-
         # Count how many dataset items have human evals
         fully_rated_count, partially_rated_count, not_rated_count = count_human_evals(
             list(expected_dataset_items.values()),
@@ -4,8 +4,8 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
+import httpx
 import openai
-import requests
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
 from kiln_ai.adapters.ml_model_list import (
@@ -24,6 +24,7 @@ from kiln_ai.adapters.provider_tools import provider_name_from_id, provider_warn
 from kiln_ai.datamodel.registry import all_projects
 from kiln_ai.utils.config import Config
 from kiln_ai.utils.exhaustive_error import raise_exhaustive_enum_error
+from kiln_ai.utils.http_client import HttpClientPool
 from langchain_aws import ChatBedrockConverse
 from pydantic import BaseModel, Field
 
@@ -42,33 +43,38 @@ async def connect_ollama(custom_ollama_url: str | None = None) -> OllamaConnecti
             detail="Invalid Ollama URL. It must start with http:// or https://",
         )
 
-    try:
-        base_url = custom_ollama_url or ollama_base_url()
-        tags = requests.get(base_url + "/api/tags", timeout=5).json()
-    except requests.exceptions.ConnectionError:
-        raise HTTPException(
-            status_code=417,
-            detail="Failed to connect. Ensure Ollama app is running.",
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to connect to Ollama: {e}",
-        )
+    base_url = custom_ollama_url or ollama_base_url()
+    async with HttpClientPool.shared().async_client(
+        base_url, follow_redirects=True
+    ) as client:
+        try:
+            tags = (await client.get(base_url + "/api/tags", timeout=5)).json()
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            raise HTTPException(
+                status_code=417,
+                detail="Failed to connect. Ensure Ollama app is running.",
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to connect to Ollama: {e}",
+            )
 
-    ollama_connection = parse_ollama_tags(tags)
-    if ollama_connection is None:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to parse Ollama data - unsure which models are installed.",
-        )
+        ollama_connection = parse_ollama_tags(tags)
+        if ollama_connection is None:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to parse Ollama data - unsure which models are installed.",
+            )
 
-    # attempt to get the Ollama version
-    try:
-        version_body = requests.get(base_url + "/api/version", timeout=5).json()
-        ollama_connection.version = version_body.get("version", None)
-    except Exception:
-        pass
+        # attempt to get the Ollama version
+        try:
+            version_body = (
+                await client.get(base_url + "/api/version", timeout=5)
+            ).json()
+            ollama_connection.version = version_body.get("version", None)
+        except Exception:
+            pass
 
     # Save the custom Ollama URL if used to connect
     if custom_ollama_url and custom_ollama_url != Config.shared().ollama_base_url:
@@ -315,11 +321,14 @@ async def connect_openrouter(key: str):
             "Content-Type": "application/json",
         }
         # invalid body, but we just want to see if the key is valid
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json={},
-        )
+        async with HttpClientPool.shared().async_client(
+            "https://openrouter.ai", follow_redirects=True, timeout=None
+        ) as client:
+            response = await client.post(
+                "https://openrouter.ai/api/v1/chat/completions",
+                headers=headers,
+                json={},
+            )
 
         # 401 def means invalid API key
         if response.status_code == 401:
@@ -366,10 +375,13 @@ async def connect_fireworks(key_data: dict):
             "Content-Type": "application/json",
         }
         # list the shared models (fireworks account)
-        response = requests.get(
-            f"https://api.fireworks.ai/v1/accounts/{account_id}/models",
-            headers=headers,
-        )
+        async with HttpClientPool.shared().async_client(
+            "https://api.fireworks.ai", follow_redirects=True, timeout=None
+        ) as client:
+            response = await client.get(
+                f"https://api.fireworks.ai/v1/accounts/{account_id}/models",
+                headers=headers,
+            )
 
         if response.status_code == 403:
             return JSONResponse(
@@ -407,7 +419,12 @@ async def connect_openai(key: str):
             "Authorization": f"Bearer {key}",
             "Content-Type": "application/json",
         }
-        response = requests.get("https://api.openai.com/v1/models", headers=headers)
+        async with HttpClientPool.shared().async_client(
+            "https://api.openai.com", follow_redirects=True, timeout=None
+        ) as client:
+            response = await client.get(
+                "https://api.openai.com/v1/models", headers=headers
+            )
 
         # 401 def means invalid API key, so special case it
         if response.status_code == 401:
@@ -440,9 +457,12 @@ async def connect_groq(key: str):
             "Authorization": f"Bearer {key}",
             "Content-Type": "application/json",
         }
-        response = requests.get(
-            "https://api.groq.com/openai/v1/models", headers=headers
-        )
+        async with HttpClientPool.shared().async_client(
+            "https://api.groq.com", follow_redirects=True, timeout=None
+        ) as client:
+            response = await client.get(
+                "https://api.groq.com/openai/v1/models", headers=headers
+            )
 
         if "invalid_api_key" in response.text:
             return JSONResponse(
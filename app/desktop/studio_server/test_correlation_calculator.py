@@ -244,3 +244,127 @@ class TestCorrelationCalculator:
         assert result.spearman_correlation == spearman
         assert result.pearson_correlation == pearson
         assert result.kendalltau_correlation == kendall
+
+    def test_add_scores_chunk(self, high_correlation_data):
+        """Adding a chunk of scores matches adding them one at a time"""
+        chunked = CorrelationCalculator()
+        chunked.add_scores(
+            [score.measured_score for score in high_correlation_data],
+            [score.human_score for score in high_correlation_data],
+            [score.normalized_measured_score for score in high_correlation_data],
+            [score.normalized_human_score for score in high_correlation_data],
+        )
+        one_at_a_time = self.setup_calculator_with_data(high_correlation_data)
+
+        assert len(chunked) == len(high_correlation_data)
+        assert chunked.scores == one_at_a_time.scores
+        assert chunked.calculate_correlation() == one_at_a_time.calculate_correlation()
+
+    def test_many_scores_flushed_in_chunks(self):
+        """Scores added one at a time are buffered, then appended in chunks"""
+        calculator = CorrelationCalculator()
+        for i in range(2500):
+            calculator.add_score(
+                CorrelationScore(
+                    measured_score=i % 5,
+                    human_score=(i + 1) % 5,
+                    normalized_measured_score=(i % 5) / 4,
+                    normalized_human_score=((i + 1) % 5) / 4,
+                )
+            )
+        assert len(calculator) == 2500
+        assert calculator.values().shape == (2500, 4)
+        assert calculator.calculate_mean_absolute_error() == pytest.approx(1.6)
+
+    def test_matches_scipy(self, no_correlation_data):
+        """Vectorized correlations match scipy's"""
+        from scipy import stats
+
+        calculator = self.setup_calculator_with_data(no_correlation_data)
+        x = [score.measured_score for score in no_correlation_data]
+        y = [score.human_score for score in no_correlation_data]
+
+        result = calculator.calculate_correlation()
+        assert result.pearson_correlation == pytest.approx(stats.pearsonr(x, y)[0])
+        assert result.spearman_correlation == pytest.approx(stats.spearmanr(x, y)[0])
+        assert result.kendalltau_correlation == pytest.approx(stats.kendalltau(x, y)[0])
+
+    def test_constant_scores_no_correlation(self):
+        """Constant scores have no defined correlation"""
+        calculator = self.setup_calculator_with_data(
+            self.create_correlation_scores([3, 3, 3], [1, 2, 3])
+        )
+        result = calculator.calculate_correlation()
+        assert result.pearson_correlation is None
+        assert result.spearman_correlation is None
+
+    def test_no_confidence_intervals_by_default(self, high_correlation_data):
+        calculator = self.setup_calculator_with_data(high_correlation_data)
+        assert calculator.calculate_correlation().confidence_intervals is None
+
+    def test_confidence_intervals(self, high_correlation_data):
+        """Bootstrap intervals contain the point estimate, and are reproducible with a seed"""
+        calculator = self.setup_calculator_with_data(high_correlation_data)
+
+        result = calculator.calculate_correlation(confidence_level=0.95, seed=1)
+        intervals = result.confidence_intervals
+        assert set(intervals.keys()) == {
+            "mean_absolute_error",
+            "mean_normalized_absolute_error",
+            "mean_squared_error",
+            "mean_normalized_squared_error",
+            "spearman_correlation",
+            "pearson_correlation",
+        }
+        for name, interval in intervals.items():
+            assert interval.lower <= getattr(result, name) <= interval.upper
+        assert intervals["pearson_correlation"].lower > 0.9
+        assert intervals["pearson_correlation"].upper <= 1.0
+
+        again = calculator.calculate_correlation(confidence_level=0.95, seed=1)
+        assert again.confidence_intervals == intervals
+
+        # Narrower at a lower confidence level
+        narrow = calculator.calculate_confidence_intervals(0.5, seed=1)
+        assert (
+            narrow["mean_absolute_error"].upper - narrow["mean_absolute_error"].lower
+            < intervals["mean_absolute_error"].upper
+            - intervals["mean_absolute_error"].lower
+        )
+
+    def test_confidence_intervals_batched(self, high_correlation_data, monkeypatch):
+        """Resamples computed in several batches give the same result as one batch"""
+        calculator = self.setup_calculator_with_data(high_correlation_data)
+        one_batch = calculator.calculate_confidence_intervals(
+            bootstrap_resamples=100, seed=3
+        )
+        monkeypatch.setattr(
+            "app.desktop.studio_server.correlation_calculator.BOOTSTRAP_BATCH_VALUES",
+            70,
+        )
+        batched = calculator.calculate_confidence_intervals(
+            bootstrap_resamples=100, seed=3
+        )
+        for name, interval in one_batch.items():
+            assert batched[name].lower == pytest.approx(interval.lower)
+            assert batched[name].upper == pytest.approx(interval.upper)
+
+    def test_confidence_intervals_single_point(self, single_data_point):
+        """One score: error intervals only, no correlation intervals"""
+        calculator = self.setup_calculator_with_data(single_data_point)
+        intervals = calculator.calculate_confidence_intervals(seed=0)
+        assert intervals["mean_absolute_error"].lower == 0.0
+        assert "pearson_correlation" not in intervals
+
+    @pytest.mark.parametrize(
+        "confidence_level,bootstrap_resamples",
+        [(0, 100), (1, 100), (1.5, 100), (0.95, 0)],
+    )
+    def test_confidence_intervals_invalid(
+        self, high_correlation_data, confidence_level, bootstrap_resamples
+    ):
+        calculator = self.setup_calculator_with_data(high_correlation_data)
+        with pytest.raises(ValueError):
+            calculator.calculate_confidence_intervals(
+                confidence_level, bootstrap_resamples
+            )
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from kiln_ai.adapters.call_scheduler import CallPriority, current_call_context
 from kiln_ai.datamodel import (
     DataSource,
     DataSourceType,
@@ -307,3 +308,33 @@ def test_topic_path_conversions():
     # Test single item path
     assert topic_path_to_string(["AI"]) == "AI"
     assert topic_path_from_string("AI") == ["AI"]
+
+
+def test_generate_samples_data_gen_priority(
+    mock_task_from_id,
+    mock_langchain_adapter,
+    client,
+    mock_task_run,
+):
+    priorities = []
+
+    async def invoke(*args, **kwargs):
+        priorities.append(current_call_context().priority)
+        return mock_task_run
+
+    mock_langchain_adapter.invoke.side_effect = invoke
+    input_data = DataGenSampleApiInput(
+        topic=["technology"],
+        num_samples=2,
+        model_name="gpt-4",
+        provider="openai",
+    )
+
+    response = client.post(
+        "/api/projects/proj-ID/tasks/task-ID/generate_samples",
+        json=input_data.model_dump(),
+    )
+
+    assert response.status_code == 200
+    # Model calls run at data gen priority, behind interactive calls
+    assert priorities == [CallPriority.data_gen]
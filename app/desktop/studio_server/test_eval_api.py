@@ -7,6 +7,7 @@ import pytest
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from fastapi.testclient import TestClient
+from kiln_ai.adapters.eval.eval_runner import EvalProgress
 from kiln_ai.adapters.ml_model_list import ModelProviderName
 from kiln_ai.datamodel import (
     BasePrompt,
@@ -30,8 +31,10 @@ from kiln_ai.datamodel.eval import (
     EvalTemplateId,
 )
 from kiln_ai.datamodel.task import RunConfigProperties, TaskRunConfig
+from kiln_ai.datamodel.write_behind import WriteBehindQueue
 
 from app.desktop.studio_server.eval_api import (
+    MAX_PROGRESS_UPDATES_PER_SECOND,
     CreateEvalConfigRequest,
     CreateEvaluatorRequest,
     connect_evals_api,
@@ -405,9 +408,30 @@ async def test_run_eval_config(
 
     # Mock progress updates
     progress_updates = [
-        Mock(complete=1, total=3, errors=0),
-        Mock(complete=2, total=3, errors=0),
-        Mock(complete=3, total=3, errors=0),
+        EvalProgress(
+            complete=1,
+            total=3,
+            errors=0,
+            concurrency=1,
+            items_per_second=2.0,
+            eta_seconds=1.0,
+        ),
+        EvalProgress(
+            complete=2,
+            total=3,
+            errors=0,
+            concurrency=2,
+            items_per_second=2.0,
+            eta_seconds=0.5,
+        ),
+        EvalProgress(
+            complete=3,
+            total=3,
+            errors=0,
+            concurrency=None,
+            items_per_second=2.0,
+            eta_seconds=0.0,
+        ),
     ]
 
     # Create async generator for mock progress
@@ -447,6 +471,14 @@ async def test_run_eval_config(
             assert data["progress"] == i + 1
             assert data["total"] == 3
             assert data["errors"] == 0
+            assert data["concurrency"] == progress_updates[i].concurrency
+            assert data["items_per_second"] == 2.0
+            assert data["eta_seconds"] == progress_updates[i].eta_seconds
+
+        # Updates are coalesced for the UI
+        mock_eval_runner.run.assert_called_once_with(
+            max_updates_per_second=MAX_PROGRESS_UPDATES_PER_SECOND
+        )
 
         # Check complete message
         assert messages[-1] == "data: complete"
@@ -559,6 +591,8 @@ def mock_eval_config_for_score_summary():
         )
 
     config.runs.return_value = runs
+    # Not saved: scores are aggregated from runs() on each request
+    config.path = None
     return config
 
 
@@ -906,6 +940,7 @@ async def test_get_eval_config_compare_summary(
             "spearman_correlation": None,  # Not enough data
             "pearson_correlation": None,
             "kendalltau_correlation": None,
+            "confidence_intervals": None,
         },
         "score1": {
             "mean_squared_error": 2.25,  # error (3.5-5.0)^2
@@ -915,6 +950,7 @@ async def test_get_eval_config_compare_summary(
             "spearman_correlation": None,  # Not enough data
             "pearson_correlation": None,  # Not enough data
             "kendalltau_correlation": None,  # Not enough data
+            "confidence_intervals": None,
         },
     }
     # 1 of total_in_dataset eval configs are are in ec1 test
@@ -930,15 +966,17 @@ async def test_get_eval_config_compare_summary(
             "spearman_correlation": None,
             "pearson_correlation": None,
             "kendalltau_correlation": None,
+            "confidence_intervals": None,
         },
         "score1": {
             "mean_squared_error": 2.5,  # (1^2+2^2)/2
             "mean_absolute_error": 1.5,  # (1+2)/2
             "mean_normalized_squared_error": 0.15625,  # (0.25^2 + 0.5^2) / 2
             "mean_normalized_absolute_error": 0.375,  # (0.25 + 0.5) / 2
-            "spearman_correlation": 0.9999999999999999,
+            "spearman_correlation": 1,
             "pearson_correlation": 1,
             "kendalltau_correlation": 1,
+            "confidence_intervals": None,
         },
     }
     # 2 of total_in_dataset eval configs are are in ec2 test
@@ -954,6 +992,7 @@ async def test_get_eval_config_compare_summary(
             "spearman_correlation": None,
             "pearson_correlation": None,
             "kendalltau_correlation": None,
+            "confidence_intervals": None,
         },
     }
     # 2 of total_in_dataset eval configs are are in ec2 test
@@ -966,6 +1005,16 @@ async def test_get_eval_config_compare_summary(
     # Test case 5: Check skipping eval run lowers the percent complete
     assert eval_config_percent_complete["ec5"] == pytest.approx(0 / total_in_dataset)
 
+    # Optional bootstrap confidence intervals
+    response = client.get(
+        "/api/projects/project1/tasks/task1/eval/eval1/eval_configs_score_summary?confidence_intervals=true"
+    )
+    assert response.status_code == 200
+    intervals = response.json()["results"]["ec2"]["score1"]["confidence_intervals"]
+    assert intervals["mean_absolute_error"]["lower"] >= 1.0
+    assert intervals["mean_absolute_error"]["upper"] <= 2.0
+    assert "kendalltau_correlation" not in intervals
+
 
 @pytest.mark.asyncio
 async def test_run_eval_config_eval(
@@ -1003,6 +1052,8 @@ async def test_run_eval_config_eval(
         assert eval_runner.eval_configs[0].id == mock_eval_config.id
         assert eval_runner.run_configs is None
         assert eval_runner.eval_run_type == "eval_config_eval"
+        assert eval_runner.write_queue is WriteBehindQueue.shared()
+        assert eval_runner.adaptive_concurrency is True
 
 
 @pytest.mark.asyncio
@@ -1,6 +1,6 @@
 import json
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 from fastapi import FastAPI, HTTPException
@@ -76,12 +76,15 @@ def test_connect_api_key_openai_success(mock_connect_openai, client):
     mock_connect_openai.assert_called_once_with("test_key")
 
 
-@patch("app.desktop.studio_server.provider_api.requests.get")
+@patch(
+    "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+    new_callable=AsyncMock,
+)
 @patch("app.desktop.studio_server.provider_api.Config.shared")
-def test_connect_openai_success(mock_config_shared, mock_requests_get, client):
+def test_connect_openai_success(mock_config_shared, mock_http_get, client):
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_requests_get.return_value = mock_response
+    mock_http_get.return_value = mock_response
 
     mock_config = MagicMock()
     mock_config_shared.return_value = mock_config
@@ -96,11 +99,14 @@ def test_connect_openai_success(mock_config_shared, mock_requests_get, client):
     assert mock_config.open_ai_api_key == "test_key"
 
 
-@patch("app.desktop.studio_server.provider_api.requests.get")
-def test_connect_openai_invalid_key(mock_requests_get, client):
+@patch(
+    "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+    new_callable=AsyncMock,
+)
+def test_connect_openai_invalid_key(mock_http_get, client):
     mock_response = MagicMock()
     mock_response.status_code = 401
-    mock_requests_get.return_value = mock_response
+    mock_http_get.return_value = mock_response
 
     response = client.post(
         "/api/provider/connect_api_key",
@@ -113,9 +119,12 @@ def test_connect_openai_invalid_key(mock_requests_get, client):
     }
 
 
-@patch("app.desktop.studio_server.provider_api.requests.get")
-def test_connect_openai_request_exception(mock_requests_get, client):
-    mock_requests_get.side_effect = Exception("Test error")
+@patch(
+    "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+    new_callable=AsyncMock,
+)
+def test_connect_openai_request_exception(mock_http_get, client):
+    mock_http_get.side_effect = Exception("Test error")
 
     response = client.post(
         "/api/provider/connect_api_key",
@@ -127,8 +136,11 @@ def test_connect_openai_request_exception(mock_requests_get, client):
 
 
 @pytest.fixture
-def mock_requests_get():
-    with patch("app.desktop.studio_server.provider_api.requests.get") as mock_get:
+def mock_http_get():
+    with patch(
+        "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+        new_callable=AsyncMock,
+    ) as mock_get:
         yield mock_get
 
 
@@ -139,13 +151,16 @@ def mock_config():
         yield mock_config
 
 
-@patch("app.desktop.studio_server.provider_api.requests.get")
+@patch(
+    "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+    new_callable=AsyncMock,
+)
 @patch("app.desktop.studio_server.provider_api.Config.shared")
-async def test_connect_groq_success(mock_config_shared, mock_requests_get):
+async def test_connect_groq_success(mock_config_shared, mock_http_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
     mock_response.text = '{"models": []}'
-    mock_requests_get.return_value = mock_response
+    mock_http_get.return_value = mock_response
 
     mock_config = MagicMock()
     mock_config_shared.return_value = mock_config
@@ -156,7 +171,7 @@ async def test_connect_groq_success(mock_config_shared, mock_requests_get):
     assert result.status_code == 200
     assert result.body == b'{"message":"Connected to Groq"}'
     mock_config.shared.return_value.groq_api_key = "test_api_key"
-    mock_requests_get.assert_called_once_with(
+    mock_http_get.assert_called_once_with(
         "https://api.groq.com/openai/v1/models",
         headers={
             "Authorization": "Bearer test_api_key",
@@ -166,11 +181,11 @@ async def test_connect_groq_success(mock_config_shared, mock_requests_get):
     assert mock_config.shared.return_value.groq_api_key == "test_api_key"
 
 
-async def test_connect_groq_invalid_api_key(mock_requests_get):
+async def test_connect_groq_invalid_api_key(mock_http_get):
     mock_response = MagicMock()
     mock_response.status_code = 401
     mock_response.text = "{a:'invalid_api_key'}"
-    mock_requests_get.return_value = mock_response
+    mock_http_get.return_value = mock_response
 
     result = await connect_groq("invalid_key")
 
@@ -179,8 +194,8 @@ async def test_connect_groq_invalid_api_key(mock_requests_get):
     assert "Invalid API key" in response_data["message"]
 
 
-async def test_connect_groq_request_error(mock_requests_get):
-    mock_requests_get.side_effect = Exception("Connection error")
+async def test_connect_groq_request_error(mock_http_get):
+    mock_http_get.side_effect = Exception("Connection error")
 
     result = await connect_groq("test_api_key")
 
@@ -189,11 +204,11 @@ async def test_connect_groq_request_error(mock_requests_get):
     assert "Failed to connect to Groq" in response_data["message"]
 
 
-async def test_connect_groq_non_200_response(mock_requests_get):
+async def test_connect_groq_non_200_response(mock_http_get):
     mock_response = MagicMock()
     mock_response.status_code = 500
     mock_response.raise_for_status.side_effect = Exception("Server error")
-    mock_requests_get.return_value = mock_response
+    mock_http_get.return_value = mock_response
 
     result = await connect_groq("test_api_key")
 
@@ -205,7 +220,10 @@ async def test_connect_groq_non_200_response(mock_requests_get):
 @pytest.mark.asyncio
 async def test_connect_openrouter():
     # Test case 1: Valid API key
-    with patch("requests.post") as mock_post:
+    with patch(
+        "app.desktop.studio_server.provider_api.httpx.AsyncClient.post",
+        new_callable=AsyncMock,
+    ) as mock_post:
         mock_response = MagicMock()
         mock_response.status_code = (
             400  # Simulating an expected error due to empty body
@@ -218,7 +236,10 @@ async def test_connect_openrouter():
         assert Config.shared().open_router_api_key == "valid_api_key"
 
     # Test case 2: Invalid API key
-    with patch("requests.post") as mock_post:
+    with patch(
+        "app.desktop.studio_server.provider_api.httpx.AsyncClient.post",
+        new_callable=AsyncMock,
+    ) as mock_post:
         mock_response = MagicMock()
         mock_response.status_code = 401
         mock_post.return_value = mock_response
@@ -232,7 +253,10 @@ async def test_connect_openrouter():
         assert Config.shared().open_router_api_key != "invalid_api_key"
 
     # Test case 3: Unexpected error
-    with patch("requests.post") as mock_post:
+    with patch(
+        "app.desktop.studio_server.provider_api.httpx.AsyncClient.post",
+        new_callable=AsyncMock,
+    ) as mock_post:
         mock_post.side_effect = Exception("Unexpected error")
 
         result = await connect_openrouter("api_key")
@@ -802,10 +826,14 @@ async def test_connect_ollama_rejects_invalid_url_format():
 async def test_connect_ollama_uses_custom_url_when_provided():
     mock_tags_response = {"models": []}
     with (
-        patch("requests.get") as mock_get,
+        patch(
+            "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+            new_callable=AsyncMock,
+        ) as mock_get,
         patch("app.desktop.studio_server.provider_api.parse_ollama_tags") as mock_parse,
         patch("app.desktop.studio_server.provider_api.Config.shared") as mock_config,
     ):
+        mock_get.return_value = MagicMock()
         mock_get.return_value.json.return_value = mock_tags_response
         mock_parse.return_value = OllamaConnection(
             message="Connected", supported_models=[]
@@ -824,12 +852,16 @@ async def test_connect_ollama_uses_custom_url_when_provided():
 async def test_connect_ollama_uses_default_url_when_no_custom_url():
     mock_tags_response = {"models": []}
     with (
-        patch("requests.get") as mock_get,
+        patch(
+            "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+            new_callable=AsyncMock,
+        ) as mock_get,
         patch("app.desktop.studio_server.provider_api.parse_ollama_tags") as mock_parse,
         patch(
             "app.desktop.studio_server.provider_api.ollama_base_url"
         ) as mock_base_url,
     ):
+        mock_get.return_value = MagicMock()
         mock_get.return_value.json.return_value = mock_tags_response
         mock_parse.return_value = OllamaConnection(
             message="Connected", supported_models=[]
@@ -850,10 +882,14 @@ async def test_connect_ollama_uses_default_url_when_no_custom_url():
 async def test_connect_ollama_saves_custom_url_on_success():
     mock_tags_response = {"models": []}
     with (
-        patch("requests.get") as mock_get,
+        patch(
+            "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+            new_callable=AsyncMock,
+        ) as mock_get,
         patch("app.desktop.studio_server.provider_api.parse_ollama_tags") as mock_parse,
         patch("app.desktop.studio_server.provider_api.Config.shared") as mock_config,
     ):
+        mock_get.return_value = MagicMock()
         mock_get.return_value.json.return_value = mock_tags_response
         mock_parse.return_value = OllamaConnection(
             message="Connected", supported_models=[]
@@ -874,10 +910,14 @@ async def test_connect_ollama_saves_custom_url_on_success():
 async def test_connect_ollama_does_not_save_unchanged_url():
     mock_tags_response = {"models": []}
     with (
-        patch("requests.get") as mock_get,
+        patch(
+            "app.desktop.studio_server.provider_api.httpx.AsyncClient.get",
+            new_callable=AsyncMock,
+        ) as mock_get,
         patch("app.desktop.studio_server.provider_api.parse_ollama_tags") as mock_parse,
         patch("app.desktop.studio_server.provider_api.Config.shared") as mock_config,
     ):
+        mock_get.return_value = MagicMock()
         mock_get.return_value.json.return_value = mock_tags_response
         mock_parse.return_value = OllamaConnection(
             message="Connected", supported_models=[]
@@ -1,9 +1,9 @@
 import os
 import tempfile
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
-import requests
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from kiln_ai.datamodel.strict_mode import strict_mode
@@ -34,14 +34,23 @@ def test_ping(client):
     assert response.json() == "pong"
 
 
+def test_model_cache_stats(client):
+    response = client.get("/api/model_cache/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    for key in ["hits", "misses", "evictions", "entries", "estimated_bytes"]:
+        assert isinstance(stats[key], int)
+
+
 # Check that the server is running in strict datamodel mode
 def test_strict_mode(client):
     assert strict_mode()
 
 
 def test_connect_ollama_success(client):
-    with patch("requests.get") as mock_get:
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
         # Set up mock to return different values on consecutive calls
+        mock_get.return_value = MagicMock()
         mock_get.return_value.json.side_effect = [
             {"models": [{"model": "phi3.5:latest"}]},
             {"version": "0.5.0"},
@@ -57,8 +66,8 @@ def test_connect_ollama_success(client):
 
 
 def test_connect_ollama_connection_error(client):
-    with patch("requests.get") as mock_get:
-        mock_get.side_effect = requests.exceptions.ConnectionError
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
+        mock_get.side_effect = httpx.ConnectError("Connection refused")
         response = client.get("/api/provider/ollama/connect")
         assert response.status_code == 417
         assert response.json() == {
@@ -67,7 +76,7 @@ def test_connect_ollama_connection_error(client):
 
 
 def test_connect_ollama_general_exception(client):
-    with patch("requests.get") as mock_get:
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
         mock_get.side_effect = Exception("Test exception")
         response = client.get("/api/provider/ollama/connect")
         assert response.status_code == 500
@@ -77,7 +86,8 @@ def test_connect_ollama_general_exception(client):
 
 
 def test_connect_ollama_no_models(client):
-    with patch("requests.get") as mock_get:
+    with patch("httpx.AsyncClient.get", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = MagicMock()
         mock_get.return_value.json.return_value = {"models": []}
         response = client.get("/api/provider/ollama/connect")
         assert response.status_code == 200
@@ -1003,6 +1003,13 @@ export interface components {
             /** Remove Tags */
             remove_tags?: string[] | null;
         };
+        /** ConfidenceInterval */
+        ConfidenceInterval: {
+            /** Lower */
+            lower: number;
+            /** Upper */
+            upper: number;
+        };
         /** CorrelationResult */
         CorrelationResult: {
             /** Mean Absolute Error */
@@ -1019,6 +1026,10 @@ export interface components {
             pearson_correlation: number | null;
             /** Kendalltau Correlation */
             kendalltau_correlation: number | null;
+            /** Confidence Intervals */
+            confidence_intervals?: {
+                [key: string]: components["schemas"]["ConfidenceInterval"];
+            } | null;
         };
         /**
          * CreateDatasetSplitRequest
@@ -4599,7 +4610,9 @@ export interface operations {
     };
     get_eval_configs_score_summary_api_projects__project_id__tasks__task_id__eval__eval_id__eval_configs_score_summary_get: {
         parameters: {
-            query?: never;
+            query?: {
+                confidence_intervals?: boolean;
+            };
             header?: never;
             path: {
                 project_id: string;
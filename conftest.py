@@ -13,8 +13,11 @@ def load_env():
 # mock out the settings path so we don't clobber the user's actual settings during tests
 @pytest.fixture(autouse=True)
 def use_temp_settings_dir(tmp_path):
-    with patch.object(
-        Config, "settings_path", return_value=str(tmp_path / "settings.yaml")
+    with (
+        patch.object(
+            Config, "settings_path", return_value=str(tmp_path / "settings.yaml")
+        ),
+        patch.object(Config, "settings_dir", return_value=str(tmp_path)),
     ):
         yield
 
@@ -0,0 +1,172 @@
+"""
+Adaptive concurrency limits for calls to model providers.
+
+A fixed worker count is too aggressive for some providers (a local Ollama server) and too timid for others (OpenAI at a high tier). AdaptiveConcurrencyLimiter adjusts the number of concurrent calls using AIMD (additive increase, multiplicative decrease), like TCP congestion control:
+
+ - Slow start: until the first decrease, each success grows the limit by 1 (roughly doubling each round of calls).
+ - After that, each success grows the limit by about 1 per limit's worth of successes.
+ - A rate limit error (429) halves the limit.
+ - Latency well above the best latency we've seen means the provider is queueing our requests, so the limit shrinks a little.
+ - Decreases are applied at most once per cooldown period, so a burst of errors from the same window of requests only counts once.
+
+One limiter per provider. See ProviderConcurrency.
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True if the error looks like a provider rate limit (HTTP 429). Checks common attributes, as each provider SDK has its own error types."""
+    for candidate in (error, error.__cause__):
+        if candidate is None:
+            continue
+        status_code = getattr(candidate, "status_code", None)
+        if status_code is None:
+            status_code = getattr(
+                getattr(candidate, "response", None), "status_code", None
+            )
+        if status_code == 429:
+            return True
+        if "ratelimit" in type(candidate).__name__.lower():
+            return True
+        message = str(candidate).lower()
+        if "rate limit" in message or "too many requests" in message:
+            return True
+    return False
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limits concurrent calls to one provider, adjusting the limit from observed rate limits and latency.
+
+    Args:
+        initial_limit: Starting concurrency
+        min_limit: Never go below this
+        max_limit: Never go above this
+        latency_tolerance: Latency above this multiple of the best observed latency counts as congestion
+        cooldown: Minimum seconds between decreases
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 3.0,
+        cooldown: float = 2.0,
+    ):
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError(
+                "Concurrency limits must satisfy 1 <= min_limit <= max_limit"
+            )
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._active = 0
+        self._min_latency: float | None = None
+        self._last_decrease = -math.inf
+        self._slow_start = True
+        self._condition = asyncio.Condition()
+        # Counters, for reporting
+        self.successes = 0
+        self.rate_limits = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def record_success(self, latency: float) -> None:
+        self.successes += 1
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+        if latency > self._min_latency * self.latency_tolerance:
+            self._decrease(0.9)
+        else:
+            increase = 1.0 if self._slow_start else 1.0 / self._limit
+            self._limit = min(float(self.max_limit), self._limit + increase)
+        # Waiters are woken by the release which follows
+
+    def record_rate_limit(self) -> None:
+        self.rate_limits += 1
+        self._decrease(0.5)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._slow_start = False
+        self._limit = max(float(self.min_limit), self._limit * factor)
+
+
+class ProviderConcurrency:
+    """A set of adaptive limiters, one per provider (created on first use)."""
+
+    def __init__(self, initial_limit: int = 4, max_limit: int = 64, **kwargs):
+        self.initial_limit = initial_limit
+        self.max_limit = max_limit
+        self.kwargs = kwargs
+        self.limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    def limiter(self, provider: str) -> AdaptiveConcurrencyLimiter:
+        limiter = self.limiters.get(provider)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=self.initial_limit,
+                max_limit=self.max_limit,
+                **self.kwargs,
+            )
+            self.limiters[provider] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def slots(self, providers: Iterable[str]) -> AsyncIterator[None]:
+        """Hold a slot for each provider. Acquired in a consistent (sorted) order, so callers can't deadlock each other."""
+        acquired = []
+        try:
+            for provider in sorted(set(providers)):
+                limiter = self.limiter(provider)
+                await limiter.acquire()
+                acquired.append(limiter)
+            yield
+        finally:
+            for limiter in reversed(acquired):
+                await limiter.release()
+
+    def record_success(self, providers: Iterable[str], latency: float) -> None:
+        for provider in set(providers):
+            self.limiter(provider).record_success(latency)
+
+    def record_rate_limit(self, providers: Iterable[str]) -> None:
+        for provider in set(providers):
+            self.limiter(provider).record_rate_limit()
+
+    def limits(self) -> Dict[str, int]:
+        return {provider: limiter.limit for provider, limiter in self.limiters.items()}
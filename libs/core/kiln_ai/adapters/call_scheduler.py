@@ -0,0 +1,287 @@
+"""
+Priority scheduling for calls to model providers.
+
+Every adapter call takes a slot from the shared CallScheduler before calling its provider. Each provider has a fixed number of slots if the `provider_max_concurrency` setting is set (unlimited by default). When they are all in use, callers queue, and freed slots are handed out:
+
+ - By priority class first: interactive, then eval, then data gen, then batch. A user clicking Run jumps ahead of every queued eval job (calls already running aren't interrupted).
+ - Within a priority class, fairly between groups by weight (stride scheduling). Two eval runs started together share the provider in proportion to their weights, rather than the first to queue its jobs getting them all run first.
+ - Within a group, first come, first served.
+
+Priority and group come from the calling context (see call_priority), so they flow from the code starting the work (an API endpoint, EvalRunner) through evals and adapters without being passed down explicitly. Calls with no context set are interactive.
+
+A call shared by several callers (see SingleFlight) runs at the highest priority of its callers (see SharedCallPriority), moving up the queue if a higher priority caller joins while it waits.
+
+Thread safe and not tied to an event loop, so one shared scheduler serves the whole process.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Tuple
+
+from kiln_ai.utils.config import Config
+
+
+class CallPriority(IntEnum):
+    """Priority class of a model call. Lower values are served first."""
+
+    interactive = 0
+    eval = 1
+    data_gen = 2
+    batch = 3
+
+
+@dataclass(frozen=True)
+class CallContext:
+    priority: CallPriority = CallPriority.interactive
+    # Calls in the same group are one "user" for fairness. None: one shared group per priority.
+    group: str | None = None
+    weight: float = 1.0
+
+
+_call_context: ContextVar[CallContext] = ContextVar(
+    "kiln_call_context", default=CallContext()
+)
+
+
+def current_call_context() -> CallContext:
+    return _call_context.get()
+
+
+class SharedCallPriority:
+    """The calling context of a call shared by several callers: the highest priority of its callers.
+
+    Raised as callers join, including for the call's requests already queued for a slot. Not lowered if a caller leaves.
+    """
+
+    def __init__(self, context: CallContext):
+        self.context = context
+        # (scheduler, provider, waiter) for the call's requests queued for a slot
+        self._queued: List[Tuple["CallScheduler", str, "_Waiter"]] = []
+
+    def join(self, context: CallContext) -> None:
+        if context.priority >= self.context.priority:
+            return
+        self.context = context
+        for scheduler, provider, waiter in list(self._queued):
+            scheduler._reprioritize(provider, waiter, context)
+
+
+_shared_call_priority: ContextVar[SharedCallPriority | None] = ContextVar(
+    "kiln_shared_call_priority", default=None
+)
+
+
+@contextmanager
+def shared_call_priority(priority: SharedCallPriority) -> Iterator[None]:
+    """Schedule model calls made inside this block (including from tasks created inside it) at the shared call's priority."""
+    token = _shared_call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _shared_call_priority.reset(token)
+
+
+@contextmanager
+def call_priority(
+    priority: CallPriority, group: str | None = None, weight: float = 1.0
+) -> Iterator[CallContext]:
+    """Run model calls made inside this block (including from tasks created inside it) at the given priority, and in the given fairness group."""
+    if weight <= 0:
+        raise ValueError("Weight must be greater than 0")
+    context = CallContext(priority=priority, group=group, weight=weight)
+    token = _call_context.set(context)
+    try:
+        yield context
+    finally:
+        _call_context.reset(token)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    context: CallContext
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    granted: bool = False
+
+
+@dataclass
+class _ProviderQueue:
+    active: int = 0
+    # priority -> group -> waiters, FIFO
+    waiters: Dict[CallPriority, Dict[str | None, Deque[_Waiter]]] = field(
+        default_factory=dict
+    )
+    # (priority, group) -> virtual time used while queueing. Each grant adds 1/weight; the group with the least goes next.
+    passes: Dict[Tuple[CallPriority, str | None], float] = field(default_factory=dict)
+
+    def waiting(self) -> int:
+        return sum(
+            len(queue) for groups in self.waiters.values() for queue in groups.values()
+        )
+
+
+class CallScheduler:
+    """Limits concurrent calls per provider, handing out slots by priority class, then fairly between groups."""
+
+    _shared_instance = None
+
+    def __init__(self, max_concurrency: int | None = None):
+        # If not passed, read from the provider_max_concurrency setting, so changes apply without a restart
+        self._max_concurrency = max_concurrency
+        self._queues: Dict[str, _ProviderQueue] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+        return cls._shared_instance
+
+    def max_concurrency(self) -> int | None:
+        """Slots per provider, or None for no limit."""
+        if self._max_concurrency is not None:
+            return self._max_concurrency
+        return Config.shared().provider_max_concurrency
+
+    def active(self, provider: str) -> int:
+        with self._lock:
+            queue = self._queues.get(provider)
+            return queue.active if queue else 0
+
+    def waiting(self, provider: str) -> int:
+        with self._lock:
+            queue = self._queues.get(provider)
+            return queue.waiting() if queue else 0
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """Hold one of the provider's call slots, queueing for it if they are all in use."""
+        await self.acquire(provider)
+        try:
+            yield
+        finally:
+            self.release(provider)
+
+    async def acquire(self, provider: str) -> None:
+        shared = _shared_call_priority.get()
+        context = shared.context if shared is not None else current_call_context()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            queue = self._queues.setdefault(provider, _ProviderQueue())
+            max_concurrency = self.max_concurrency()
+            if (
+                max_concurrency is None or queue.active < max_concurrency
+            ) and not queue.waiters:
+                queue.active += 1
+                return
+            waiter = _Waiter(context=context, loop=loop, future=loop.create_future())
+            self._enqueue(queue, waiter)
+            queued = (self, provider, waiter)
+            if shared is not None:
+                shared._queued.append(queued)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._remove(queue, waiter)
+                    raise
+            # Granted as we were cancelled: pass the slot on
+            self.release(provider)
+            raise
+        finally:
+            if shared is not None:
+                shared._queued.remove(queued)
+
+    def release(self, provider: str) -> None:
+        max_concurrency = self.max_concurrency()
+        with self._lock:
+            queue = self._queues[provider]
+            queue.active -= 1
+            # Waiters left from before the limit was raised or removed are let through
+            while max_concurrency is None or queue.active < max_concurrency:
+                waiter = self._next_waiter(queue)
+                if waiter is None:
+                    break
+                queue.active += 1
+                waiter.granted = True
+                try:
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                except RuntimeError:
+                    # The waiter's event loop is closed. Nothing to wake, so the slot is free again.
+                    queue.active -= 1
+
+    def _reprioritize(
+        self, provider: str, waiter: _Waiter, context: CallContext
+    ) -> None:
+        # Move a queued waiter to another priority/group. Nothing to do once granted or cancelled.
+        with self._lock:
+            queue = self._queues[provider]
+            if waiter.granted or not self._remove(queue, waiter):
+                return
+            waiter.context = context
+            self._enqueue(queue, waiter)
+
+    def _enqueue(self, queue: _ProviderQueue, waiter: _Waiter) -> None:
+        context = waiter.context
+        groups = queue.waiters.setdefault(context.priority, {})
+        if context.group not in groups:
+            groups[context.group] = deque()
+            # A group joining (or rejoining) starts level with the groups already waiting, so it can't claim credit for time it wasn't waiting
+            key = (context.priority, context.group)
+            waiting_passes = [
+                queue.passes.get((context.priority, g), 0.0)
+                for g in groups
+                if g != context.group
+            ]
+            if waiting_passes:
+                queue.passes[key] = max(queue.passes.get(key, 0.0), min(waiting_passes))
+        groups[context.group].append(waiter)
+
+    def _remove(self, queue: _ProviderQueue, waiter: _Waiter) -> bool:
+        # Returns False if the waiter wasn't queued
+        groups = queue.waiters.get(waiter.context.priority, {})
+        group_waiters = groups.get(waiter.context.group)
+        if group_waiters is None:
+            return False
+        try:
+            group_waiters.remove(waiter)
+        except ValueError:
+            return False
+        if not group_waiters:
+            del groups[waiter.context.group]
+        if not groups:
+            self._priority_drained(queue, waiter.context.priority)
+        return True
+
+    def _next_waiter(self, queue: _ProviderQueue) -> _Waiter | None:
+        if not queue.waiters:
+            return None
+        priority = min(queue.waiters.keys())
+        groups = queue.waiters[priority]
+        group = min(groups.keys(), key=lambda g: queue.passes.get((priority, g), 0.0))
+        waiter = groups[group].popleft()
+        key = (priority, group)
+        queue.passes[key] = queue.passes.get(key, 0.0) + 1.0 / waiter.context.weight
+        if not groups[group]:
+            del groups[group]
+        if not groups:
+            self._priority_drained(queue, priority)
+        return waiter
+
+    def _priority_drained(self, queue: _ProviderQueue, priority: CallPriority) -> None:
+        # Nobody is waiting at this priority, so there's no one to be fair between. Reset.
+        queue.waiters.pop(priority, None)
+        for key in [key for key in queue.passes if key[0] == priority]:
+            del queue.passes[key]
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -4,7 +4,7 @@ from typing import Dict
 
 from kiln_ai.adapters.adapter_registry import adapter_for_task
 from kiln_ai.adapters.ml_model_list import ModelProviderName
-from kiln_ai.adapters.model_adapters.base_adapter import AdapterConfig
+from kiln_ai.adapters.model_adapters.base_adapter import AdapterConfig, BaseAdapter
 from kiln_ai.datamodel.eval import Eval, EvalConfig, EvalScores
 from kiln_ai.datamodel.json_schema import validate_schema
 from kiln_ai.datamodel.task import RunConfig, TaskOutputRatingType, TaskRun
@@ -30,6 +30,7 @@ class BaseEval:
         self.target_task = task
         self.score_schema = BaseEval.build_score_schema(eval, allow_float_scores=True)
         self.run_config = run_config
+        self._task_adapter: BaseAdapter | None = None
 
     def model_and_provider(self) -> tuple[str, ModelProviderName]:
         model_name = self.eval_config.model_name
@@ -53,15 +54,15 @@ class BaseEval:
         """
         Runs the task on the provided run_config to generate fresh output, then runs the eval on that output.
         """
-        if self.run_config is None:
-            raise ValueError("Run config is required for run_task_and_eval")
+        run_output = await self.run_task(input)
+        eval_output, intermediate_outputs = await self.eval_task_output(run_output)
+        return run_output, eval_output, intermediate_outputs
 
-        run_adapter = adapter_for_task(
-            self.target_task,
-            self.run_config.model_name,
-            ModelProviderName(self.run_config.model_provider_name),
-            base_adapter_config=AdapterConfig(allow_saving=False),
-        )
+    async def run_task(self, input: str) -> TaskRun:
+        """
+        Runs the task on the provided run_config to generate fresh output, without evaluating it. The output is not saved.
+        """
+        run_adapter = self.task_adapter()
 
         # Parse structured input if needed
         parsed_input = input
@@ -69,12 +70,33 @@ class BaseEval:
             parsed_input = json.loads(input)
 
         # we don't save by default here. We'll save manually after validating the output
-        run_output = await run_adapter.invoke(parsed_input)
+        return await run_adapter.invoke(parsed_input)
 
-        eval_output, intermediate_outputs = await self.run_eval(run_output)
-        validate_schema(eval_output, self.score_schema)
+    def task_adapter(self) -> BaseAdapter:
+        """
+        The adapter for running the task on the run_config. Created on first use and reused, so an evaluator used for many items reuses one adapter (and its HTTP client).
+        """
+        if self.run_config is None:
+            raise ValueError("Run config is required for run_task")
+
+        if self._task_adapter is None:
+            self._task_adapter = adapter_for_task(
+                self.target_task,
+                self.run_config.model_name,
+                ModelProviderName(self.run_config.model_provider_name),
+                base_adapter_config=AdapterConfig(allow_saving=False),
+            )
+        return self._task_adapter
 
-        return run_output, eval_output, intermediate_outputs
+    async def eval_task_output(
+        self, task_run: TaskRun
+    ) -> tuple[EvalScores, Dict[str, str] | None]:
+        """
+        Runs the eval on output generated by run_task, validating the scores against the score schema.
+        """
+        eval_output, intermediate_outputs = await self.run_eval(task_run)
+        validate_schema(eval_output, self.score_schema)
+        return eval_output, intermediate_outputs
 
     @abstractmethod
     async def run_eval(
@@ -1,18 +1,42 @@
 import asyncio
+import itertools
 import logging
+import time
 from dataclasses import dataclass
-from typing import AsyncGenerator, Dict, List, Literal, Set
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Literal, Set, Tuple
 
+from kiln_ai.adapters.adaptive_concurrency import (
+    ProviderConcurrency,
+    is_rate_limit_error,
+)
+from kiln_ai.adapters.call_scheduler import CallPriority, call_priority
 from kiln_ai.adapters.eval.base_eval import BaseEval
 from kiln_ai.adapters.eval.registry import eval_adapter_from_type
+from kiln_ai.adapters.eval.score_aggregates import EvalScoreAggregates
 from kiln_ai.datamodel.basemodel import ID_TYPE
 from kiln_ai.datamodel.dataset_filters import dataset_filter_from_id
 from kiln_ai.datamodel.eval import EvalConfig, EvalRun, EvalScores
+from kiln_ai.datamodel.summary_index import ChildSummaryIndex
 from kiln_ai.datamodel.task import TaskRunConfig
 from kiln_ai.datamodel.task_run import TaskRun
+from kiln_ai.datamodel.write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
+# Persistent index of the dataset items (and run configs) each eval config has already run, so starting or resuming a run doesn't load every existing eval run.
+# Bump the version if the summary changes, to rebuild existing indexes.
+eval_run_completion_index = ChildSummaryIndex(
+    EvalRun,
+    name="eval_run_completion",
+    summarize=lambda run: {
+        "dataset_id": run.dataset_id,
+        "task_run_config_id": run.task_run_config_id,
+    },
+    version=1,
+    # Not needed, and can be large. Skip parsing/validating it.
+    deferred_fields={"intermediate_outputs"},
+)
+
 
 @dataclass
 class EvalJob:
@@ -26,8 +50,15 @@ class EvalJob:
 @dataclass
 class EvalProgress:
     complete: int | None = None
+    # Jobs are generated as the run progresses, so the total can grow until all jobs are generated
     total: int | None = None
     errors: int | None = None
+    # Jobs running right now, and the current limit per provider (adaptive concurrency only)
+    concurrency: int | None = None
+    concurrency_limits: Dict[str, int] | None = None
+    # Jobs finished (complete or errored) per second since the run started, and the estimated seconds remaining. None until the first job finishes.
+    items_per_second: float | None = None
+    eta_seconds: float | None = None
 
 
 class EvalRunner:
@@ -37,6 +68,14 @@ class EvalRunner:
     Can run an eval in 2 modes:
     1) eval_config_eval: evaluate an eval config using existing dataset items.
     2) task_run_eval: evaluate a range of task run configs, generating new run output using existing dataset item input.
+
+    In task_run_eval mode with several eval configs, the task output for each dataset item + run config is generated once and shared by every eval config's job (unless share_task_outputs is False).
+
+    With adaptive_concurrency, the number of jobs running against each model provider is adjusted from observed rate limit errors and latency (see AdaptiveConcurrencyLimiter), up to the concurrency passed to run().
+
+    Model calls are made at eval priority (see CallScheduler): interactive calls are served first, and concurrent eval runs share providers fairly, weighted by priority_weight.
+
+    Results are saved as each job completes. If a write_queue is provided, saves go through it (disk I/O off the event loop) and are flushed before run() completes. Only this runner's saves are waited for, and their errors raised.
     """
 
     def __init__(
@@ -44,6 +83,10 @@ class EvalRunner:
         eval_configs: List[EvalConfig],
         run_configs: List[TaskRunConfig] | None,
         eval_run_type: Literal["eval_config_eval", "task_run_eval"],
+        write_queue: WriteBehindQueue | None = None,
+        share_task_outputs: bool = True,
+        adaptive_concurrency: bool = False,
+        priority_weight: float = 1.0,
     ):
         if len(eval_configs) == 0:
             raise ValueError("Eval runner requires at least one eval config")
@@ -82,156 +125,355 @@ class EvalRunner:
         self.run_configs = run_configs
         self.task = target_task
         self.eval = target_eval
+        self.write_queue = write_queue
+        # This runner's saves, so flushing only waits for (and raises errors from) our own writes, not other runs sharing the queue
+        self._write_batch = write_queue.batch() if write_queue is not None else None
+        # Only task_run_eval jobs generate task outputs. Nothing to share with a single eval config.
+        self.share_task_outputs = (
+            share_task_outputs
+            and eval_run_type == "task_run_eval"
+            and len(eval_configs) > 1
+        )
+        # Shared task outputs, keyed by (dataset item id, run config id). Removed once all jobs using them have run.
+        self._task_outputs: Dict[Tuple[ID_TYPE, ID_TYPE], asyncio.Task[TaskRun]] = {}
+        self._task_output_uses: Dict[Tuple[ID_TYPE, ID_TYPE], int] = {}
+        self.adaptive_concurrency = adaptive_concurrency
+        self.provider_concurrency: ProviderConcurrency | None = None
+        self._running = 0
+        self.priority_weight = priority_weight
+        # Evaluators (and the adapters and HTTP clients they hold) are reused across jobs, keyed by (eval config id, run config id). Cleared when a run completes.
+        self._evaluators: Dict[Tuple[ID_TYPE, ID_TYPE], BaseEval] = {}
 
     def collect_tasks(self) -> List[EvalJob]:
+        return list(self.iter_jobs())
+
+    def iter_jobs(self) -> Iterator[EvalJob]:
+        """
+        Generate the jobs for this run lazily, excluding any that have already been run.
+
+        Dataset items are loaded as jobs are generated, so a run can start before the whole dataset is read. Jobs for the same dataset item are generated together.
+        """
+        for batch in self._iter_job_batches():
+            yield from batch
+
+    def _iter_job_batches(self) -> Iterator[List[EvalJob]]:
+        # All jobs for one dataset item at a time
         if self.eval_run_type == "eval_config_eval":
-            return self.collect_tasks_for_eval_config_eval()
+            return self._iter_job_batches_for_eval_config_eval()
         else:
-            return self.collect_tasks_for_task_run_eval()
+            return self._iter_job_batches_for_task_run_eval()
 
-    def collect_tasks_for_eval_config_eval(self) -> List[EvalJob]:
+    def _iter_job_batches_for_eval_config_eval(self) -> Iterator[List[EvalJob]]:
         """
-        Collect all jobs for this run, excluding any that have already been run.
-
-        This variant is used for mode "eval_config_eval", using existing dataset run data (input/output).
+        Jobs for mode "eval_config_eval", using existing dataset run data (input/output).
 
         The tasks:
         - should be in the eval config set filter
         - should not have already been run for this eval config + dataset item pair
         """
         filter = dataset_filter_from_id(self.eval.eval_configs_filter_id)
+        completed = self._completed_runs()
 
-        # already_run[eval_config_id][dataset_id]
-        already_run: Dict[ID_TYPE, Set[ID_TYPE]] = {}
-        for eval_config in self.eval_configs:
-            already_run[eval_config.id] = set()
-            for run in eval_config.runs(readonly=True):
-                already_run[eval_config.id].add(run.dataset_id)
-
-        return [
-            EvalJob(
-                item=task_run,
-                eval_config=eval_config,
-                type="eval_config_eval",
-            )
-            for task_run in self.task.runs(readonly=True)
-            if filter(task_run)
-            for eval_config in self.eval_configs
-            if task_run.id not in already_run[eval_config.id]
-        ]
-
-    def collect_tasks_for_task_run_eval(self) -> List[EvalJob]:
+        for task_run in self._dataset_items():
+            if not filter(task_run):
+                continue
+            batch = [
+                EvalJob(
+                    item=task_run,
+                    eval_config=eval_config,
+                    type="eval_config_eval",
+                )
+                for eval_config in self.eval_configs
+                if task_run.id not in completed[eval_config.id]
+            ]
+            if batch:
+                yield batch
+
+    def _iter_job_batches_for_task_run_eval(self) -> Iterator[List[EvalJob]]:
         """
-        Collect all jobs for this run, excluding any that have already been run.
-
-        This variant is used for mode "task_run_eval", generating new run output using existing dataset item input.
+        Jobs for mode "task_run_eval", generating new run output using existing dataset item input.
 
         The tasks:
         - should be in the eval set filter
         - should not have already been run for this eval config + run config + dataset item
         """
         filter = dataset_filter_from_id(self.eval.eval_set_filter_id)
+        completed = self._completed_runs()
 
-        # already_run[eval_config_id][run_config_id][dataset_id]
-        already_run: Dict[ID_TYPE, Dict[ID_TYPE, Set[ID_TYPE]]] = {}
+        for task_run in self._dataset_items():
+            if not filter(task_run):
+                continue
+            batch = [
+                EvalJob(
+                    item=task_run,
+                    task_run_config=run_config,
+                    type="task_run_eval",
+                    eval_config=eval_config,
+                )
+                for eval_config in self.eval_configs
+                for run_config in self.run_configs or []
+                if (run_config.id, task_run.id) not in completed[eval_config.id]
+            ]
+            if batch:
+                yield batch
+
+    def _dataset_items(self) -> Iterator[TaskRun]:
+        # One at a time, rather than loading the whole dataset before the first job
+        for path in TaskRun.iterate_children_paths_of_parent_path(self.task.path):
+            yield TaskRun.load_from_file(path, readonly=True)
+
+    def _completed_runs(self) -> Dict[ID_TYPE, Set[Any]]:
+        """Already run jobs for each eval config, from the completion index (no eval runs are loaded unless they are new or changed).
+
+        Eval config evals: dataset IDs. Task run evals: (run config ID, dataset ID) pairs.
+        """
+        completed: Dict[ID_TYPE, Set[Any]] = {}
         for eval_config in self.eval_configs:
-            already_run[eval_config.id] = {}
-            for run_config in self.run_configs or []:
-                already_run[eval_config.id][run_config.id] = set()
-            for run in eval_config.runs(readonly=True):
-                if (
-                    run.task_run_config_id is not None
-                    and run.task_run_config_id in already_run[eval_config.id]
-                ):
-                    already_run[eval_config.id][run.task_run_config_id].add(
-                        run.dataset_id
+            completed[eval_config.id] = set()
+            for summary in eval_run_completion_index.summaries(eval_config.path):
+                if self.eval_run_type == "eval_config_eval":
+                    completed[eval_config.id].add(summary["dataset_id"])
+                elif summary["task_run_config_id"] is not None:
+                    completed[eval_config.id].add(
+                        (summary["task_run_config_id"], summary["dataset_id"])
                     )
+        return completed
 
-        return [
-            EvalJob(
-                item=task_run,
-                task_run_config=run_config,
-                type="task_run_eval",
-                eval_config=eval_config,
-            )
-            for task_run in self.task.runs(readonly=True)
-            if filter(task_run)
-            for eval_config in self.eval_configs
-            for run_config in self.run_configs or []
-            if task_run.id not in already_run[eval_config.id][run_config.id]
-        ]
-
-    async def run(self, concurrency: int = 25) -> AsyncGenerator[EvalProgress, None]:
+    async def run(
+        self, concurrency: int = 25, max_updates_per_second: float | None = None
+    ) -> AsyncGenerator[EvalProgress, None]:
         """
         Runs the configured eval run with parallel workers and yields progress updates.
+
+        Progress is yielded as jobs finish. With max_updates_per_second, updates arriving faster are coalesced: the latest is sent once the interval has passed. The first and final updates are always sent.
         """
-        jobs = self.collect_tasks()
+        if max_updates_per_second is not None and max_updates_per_second <= 0:
+            raise ValueError("max_updates_per_second must be greater than 0")
+        min_interval = 1.0 / max_updates_per_second if max_updates_per_second else 0.0
+
+        if self.adaptive_concurrency:
+            self.provider_concurrency = ProviderConcurrency(
+                initial_limit=min(concurrency, 4), max_limit=concurrency
+            )
 
         complete = 0
         errors = 0
-        total = len(jobs)
+        # Jobs generated so far. Final once generating is False.
+        total = 0
+        generating = True
+        started = time.monotonic()
 
         # Send initial status
-        yield EvalProgress(complete=complete, total=total, errors=errors)
+        yield self._progress(complete, total, errors, started, generating)
+
+        # Bounded: jobs are generated as workers need them, not all up front. None tells a worker to stop.
+        worker_queue: asyncio.Queue[EvalJob | None] = asyncio.Queue(
+            maxsize=max(concurrency, 1) * 2
+        )
+
+        async def enqueue(batch: List[EvalJob]) -> None:
+            nonlocal total
+            if self.share_task_outputs:
+                # Count every use of a shared output before any of them run, so it isn't dropped after the first use
+                for job in batch:
+                    key = self._task_output_key(job)
+                    self._task_output_uses[key] = self._task_output_uses.get(key, 0) + 1
+            total += len(batch)
+            for job in batch:
+                await worker_queue.put(job)
+
+        jobs = self.iter_jobs()
+        read_size = worker_queue.maxsize
+        lookahead: List[EvalJob] = []
+
+        def read_jobs() -> Tuple[List[EvalJob], bool]:
+            # The next jobs, and whether they are the last. Reads one job ahead, so the end is known without another read.
+            chunk = lookahead + list(
+                itertools.islice(jobs, read_size + 1 - len(lookahead))
+            )
+            lookahead[:] = chunk[read_size:]
+            return chunk[:read_size], not lookahead
 
-        worker_queue: asyncio.Queue[EvalJob] = asyncio.Queue()
-        for job in jobs:
-            worker_queue.put_nowait(job)
+        async def generate_jobs() -> None:
+            nonlocal generating
+            cancelled = False
+            try:
+                batch: List[EvalJob] = []
+                last = False
+                while not last:
+                    # Generating jobs loads dataset items and completed runs from disk. Off the event loop, so workers and status updates aren't blocked.
+                    chunk, last = await asyncio.to_thread(read_jobs)
+                    for job in chunk:
+                        if not self.share_task_outputs:
+                            await enqueue([job])
+                            continue
+                        # Jobs for one dataset item are generated together. Queue them as a batch.
+                        if batch and batch[0].item is not job.item:
+                            await enqueue(batch)
+                            batch = []
+                        batch.append(job)
+                await enqueue(batch)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                generating = False
+                # Tell each worker to stop once the queued jobs have run. Not when cancelled: the workers are done (or cancelled too), and waiting to queue sentinels nobody takes would never finish.
+                if not cancelled:
+                    for _ in range(concurrency):
+                        await worker_queue.put(None)
 
-        # simple status queue to return progress. True=success, False=error
-        status_queue: asyncio.Queue[bool] = asyncio.Queue()
+        producer = asyncio.create_task(generate_jobs())
+
+        # Status of each finished job: True=success, False=error. None once all workers are done (after all their statuses).
+        status_queue: asyncio.Queue[bool | None] = asyncio.Queue()
 
         workers = []
         for i in range(concurrency):
             task = asyncio.create_task(self.run_worker(worker_queue, status_queue))
             workers.append(task)
+        running_workers = len(workers)
+
+        def worker_done(_: asyncio.Task) -> None:
+            nonlocal running_workers
+            running_workers -= 1
+            if running_workers == 0:
+                status_queue.put_nowait(None)
+
+        for worker in workers:
+            worker.add_done_callback(worker_done)
+        if not workers:
+            status_queue.put_nowait(None)
+
+        # Send status updates as jobs finish, until the workers are done
+        last_sent = started
+        unsent = False
+        while True:
+            if unsent:
+                # Coalescing: wait for the next status, but no longer than when the unsent update is due
+                due = last_sent + min_interval - time.monotonic()
+                try:
+                    success = await asyncio.wait_for(
+                        status_queue.get(), timeout=max(due, 0)
+                    )
+                except asyncio.TimeoutError:
+                    yield self._progress(complete, total, errors, started, generating)
+                    last_sent = time.monotonic()
+                    unsent = False
+                    continue
+            else:
+                success = await status_queue.get()
+            if success is None:
+                break
+            if success:
+                complete += 1
+            else:
+                errors += 1
 
-        # Send status updates until workers are done, and they are all sent
-        while not status_queue.empty() or not all(worker.done() for worker in workers):
-            try:
-                # Use timeout to prevent hanging if all workers complete
-                # between our while condition check and get()
-                success = await asyncio.wait_for(status_queue.get(), timeout=0.1)
-                if success:
-                    complete += 1
-                else:
-                    errors += 1
-
-                yield EvalProgress(complete=complete, total=total, errors=errors)
-            except asyncio.TimeoutError:
-                # Timeout is expected, just continue to recheck worker status
-                # Don't love this but beats sentinels for reliability
-                continue
+            now = time.monotonic()
+            if now - last_sent >= min_interval:
+                yield self._progress(complete, total, errors, started, generating)
+                last_sent = now
+                unsent = False
+            else:
+                unsent = True
 
-        # These are redundant, but keeping them will catch async errors
+        if unsent:
+            yield self._progress(complete, total, errors, started, generating)
+
+        # Stops generating if no workers are left to run jobs
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        # Raises any worker errors
         await asyncio.gather(*workers)
-        await worker_queue.join()
+        self._evaluators.clear()
+
+        if self._write_batch is not None:
+            # Results are on disk when the run completes
+            await asyncio.to_thread(self._write_batch.flush)
 
     async def run_worker(
-        self, worker_queue: asyncio.Queue[EvalJob], status_queue: asyncio.Queue[bool]
+        self,
+        worker_queue: asyncio.Queue[EvalJob | None],
+        status_queue: asyncio.Queue[bool | None],
     ):
-        while True:
-            try:
-                job = worker_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                # worker can end when the queue is empty
-                break
+        # Each worker is its own task, so this applies to this worker's model calls only. All workers share one fairness group per runner.
+        with call_priority(
+            CallPriority.eval,
+            group=f"eval_runner_{id(self)}",
+            weight=self.priority_weight,
+        ):
+            while True:
+                job = await worker_queue.get()
+                if job is None:
+                    # No more jobs
+                    worker_queue.task_done()
+                    break
+                try:
+                    if self.provider_concurrency is not None:
+                        success = await self.run_job_with_concurrency_limits(
+                            job, self.provider_concurrency
+                        )
+                    else:
+                        success = await self.run_job(job)
+                    await status_queue.put(success)
+                finally:
+                    # Always mark the dequeued task as done, even on exceptions
+                    worker_queue.task_done()
+
+    async def run_job_with_concurrency_limits(
+        self, job: EvalJob, provider_concurrency: ProviderConcurrency
+    ) -> bool:
+        providers = self._job_providers(job)
+        async with provider_concurrency.slots(providers):
+            self._running += 1
+            start = time.monotonic()
             try:
                 success = await self.run_job(job)
-                await status_queue.put(success)
             finally:
-                # Always mark the dequeued task as done, even on exceptions
-                worker_queue.task_done()
+                self._running -= 1
+            if success:
+                provider_concurrency.record_success(providers, time.monotonic() - start)
+        return success
+
+    def _job_providers(self, job: EvalJob) -> List[str]:
+        # The judge model's provider, and the task model's provider if we're running the task
+        providers = [job.eval_config.model_provider]
+        if job.task_run_config is not None:
+            providers.append(
+                job.task_run_config.run_config_properties.model_provider_name
+            )
+        return providers
+
+    def _progress(
+        self,
+        complete: int,
+        total: int,
+        errors: int,
+        started: float,
+        generating: bool = False,
+    ) -> EvalProgress:
+        progress = EvalProgress(complete=complete, total=total, errors=errors)
+        finished = complete + errors
+        elapsed = time.monotonic() - started
+        if finished > 0 and elapsed > 0:
+            progress.items_per_second = finished / elapsed
+            if not generating:
+                # No ETA until we know how many jobs there are
+                progress.eta_seconds = (
+                    max(total - finished, 0) / progress.items_per_second
+                )
+        if self.provider_concurrency is not None:
+            progress.concurrency = self._running
+            progress.concurrency_limits = self.provider_concurrency.limits()
+        return progress
 
     async def run_job(self, job: EvalJob) -> bool:
         try:
-            # Create the evaluator for this eval config/run config pair
-            evaluator = eval_adapter_from_type(job.eval_config.config_type)(
-                job.eval_config,
-                job.task_run_config.run_config() if job.task_run_config else None,
-            )
-            if not isinstance(evaluator, BaseEval):
-                raise ValueError("Not able to create evaluator from eval config")
+            evaluator = self._evaluator(job)
 
             task_output: str | None = None
             scores: EvalScores | None = None
@@ -240,6 +482,13 @@ class EvalRunner:
                 # Eval config eval, we use the saved input from the task run, not invoking the task again
                 scores, intermediate_outputs = await evaluator.run_eval(job.item)
                 task_output = job.item.output.output
+            elif self.share_task_outputs:
+                # Task run eval, sharing one fresh output between all eval configs
+                result_task_run = await self._shared_task_output(job, evaluator)
+                scores, intermediate_outputs = await evaluator.eval_task_output(
+                    result_task_run
+                )
+                task_output = result_task_run.output.output
             else:
                 # Task run eval, we invoke the task again to get a fresh output
                 (
@@ -262,9 +511,61 @@ class EvalRunner:
                 output=task_output,
                 intermediate_outputs=intermediate_outputs,
             )
-            eval_run.save_to_file()
+            if self._write_batch is not None:
+                self._write_batch.save(eval_run)
+            else:
+                eval_run.save_to_file()
+            EvalScoreAggregates.shared().record(eval_run)
 
             return True
         except Exception as e:
             logger.error(f"Error running eval job for dataset item {job.item.id}: {e}")
+            if self.provider_concurrency is not None and is_rate_limit_error(e):
+                self.provider_concurrency.record_rate_limit(self._job_providers(job))
             return False
+        finally:
+            if job.type == "task_run_eval" and self.share_task_outputs:
+                # Even if the job failed before using the shared output (eg, creating its evaluator)
+                self._release_task_output(job)
+
+    def _evaluator(self, job: EvalJob) -> BaseEval:
+        # Get or create the evaluator for this eval config/run config pair
+        key = (
+            job.eval_config.id,
+            job.task_run_config.id if job.task_run_config else None,
+        )
+        evaluator = self._evaluators.get(key)
+        if evaluator is None:
+            evaluator = eval_adapter_from_type(job.eval_config.config_type)(
+                job.eval_config,
+                job.task_run_config.run_config() if job.task_run_config else None,
+            )
+            if not isinstance(evaluator, BaseEval):
+                raise ValueError("Not able to create evaluator from eval config")
+            self._evaluators[key] = evaluator
+        return evaluator
+
+    def _task_output_key(self, job: EvalJob) -> Tuple[ID_TYPE, ID_TYPE]:
+        return (
+            job.item.id,
+            job.task_run_config.id if job.task_run_config else None,
+        )
+
+    async def _shared_task_output(self, job: EvalJob, evaluator: BaseEval) -> TaskRun:
+        # The first job for a dataset item + run config generates the output. Others await the same result (or error).
+        key = self._task_output_key(job)
+        task_output = self._task_outputs.get(key)
+        if task_output is None:
+            task_output = asyncio.create_task(evaluator.run_task(job.item.input))
+            self._task_outputs[key] = task_output
+        return await asyncio.shield(task_output)
+
+    def _release_task_output(self, job: EvalJob) -> None:
+        # One job is done with a shared output. Drop it once all jobs using it are.
+        key = self._task_output_key(job)
+        uses = self._task_output_uses.get(key, 1) - 1
+        if uses <= 0:
+            self._task_output_uses.pop(key, None)
+            self._task_outputs.pop(key, None)
+        else:
+            self._task_output_uses[key] = uses
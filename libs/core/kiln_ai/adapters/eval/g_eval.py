@@ -5,7 +5,11 @@ from openai.types.chat import ChatCompletionTokenLogprob
 
 from kiln_ai.adapters.adapter_registry import adapter_for_task
 from kiln_ai.adapters.eval.base_eval import BaseEval
-from kiln_ai.adapters.model_adapters.base_adapter import AdapterConfig, RunOutput
+from kiln_ai.adapters.model_adapters.base_adapter import (
+    AdapterConfig,
+    BaseAdapter,
+    RunOutput,
+)
 from kiln_ai.adapters.prompt_builders import PromptGenerators
 from kiln_ai.datamodel import Project, Task, TaskRun
 from kiln_ai.datamodel.eval import EvalConfig, EvalConfigType, EvalScores
@@ -98,6 +102,7 @@ class GEval(BaseEval):
         super().__init__(eval_config, run_config)
 
         self.geval_task = GEvalTask(eval_config)
+        self._judge_adapter: BaseAdapter | None = None
 
     async def run_eval(
         self, task_run: TaskRun
@@ -106,26 +111,7 @@ class GEval(BaseEval):
         Run this eval on the given task run.
         """
 
-        model_name, provider = self.model_and_provider()
-
-        # Only fetch logprobs for G-Eval
-        # There are at most 5 valid rating tokens per rating type (five_star being largest), so 10 is more than enough to get to the very very unlikely
-        top_logprobs = (
-            10 if self.eval_config.config_type == EvalConfigType.g_eval else None
-        )
-
-        adapter = adapter_for_task(
-            self.geval_task,
-            model_name,
-            provider,
-            # We always use Simple COT for G-Eval and LLM as Judge
-            prompt_id=PromptGenerators.SIMPLE_CHAIN_OF_THOUGHT,
-            base_adapter_config=AdapterConfig(
-                # Don't save this run into the task_runs. It will be saved into an eval_run where it belongs
-                allow_saving=False,
-                top_logprobs=top_logprobs,
-            ),
-        )
+        adapter = self.judge_adapter()
 
         input = f"""The model was given the following input for the task: 
 <eval_data>
@@ -148,6 +134,35 @@ The model produced the following output for the task:
         else:
             return self.build_g_eval_score(run_output), run_output.intermediate_outputs
 
+    def judge_adapter(self) -> BaseAdapter:
+        """
+        The adapter for the judge model. Created on first use and reused for every item this evaluator scores.
+        """
+        if self._judge_adapter is not None:
+            return self._judge_adapter
+
+        model_name, provider = self.model_and_provider()
+
+        # Only fetch logprobs for G-Eval
+        # There are at most 5 valid rating tokens per rating type (five_star being largest), so 10 is more than enough to get to the very very unlikely
+        top_logprobs = (
+            10 if self.eval_config.config_type == EvalConfigType.g_eval else None
+        )
+
+        self._judge_adapter = adapter_for_task(
+            self.geval_task,
+            model_name,
+            provider,
+            # We always use Simple COT for G-Eval and LLM as Judge
+            prompt_id=PromptGenerators.SIMPLE_CHAIN_OF_THOUGHT,
+            base_adapter_config=AdapterConfig(
+                # Don't save this run into the task_runs. It will be saved into an eval_run where it belongs
+                allow_saving=False,
+                top_logprobs=top_logprobs,
+            ),
+        )
+        return self._judge_adapter
+
     def build_llm_as_judge_score(self, run_output: RunOutput) -> EvalScores:
         """
         Build the LLM as Judge score for the given run and run output.
@@ -0,0 +1,219 @@
+"""
+Running score aggregates for eval configs.
+
+Eval result pages summarize every eval run of an eval config, and the UI polls them while an eval is running. Rather than loading every eval run on each request, EvalScoreAggregates keeps aggregates for each eval config in memory, and updates them incrementally:
+
+ - EvalRunner records each eval run as it's saved.
+ - On read, the eval config's runs folder listing (cached by ModelCache) is checked for runs saved elsewhere. Only new runs are loaded. If runs were deleted, the eval config's aggregates are rebuilt.
+ - Aggregates are kept per run config (None for eval config evals) and score: count, sum and sum of squares. Each dataset item's scores are kept too: they are needed to exclude items which have left the dataset filter, and to compare against human ratings (which can change at any time).
+ - The first eval run for a dataset item and run config counts. Later duplicates are ignored.
+
+Eval runs aren't edited after they are saved: changes to an existing eval run file aren't picked up.
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from kiln_ai.datamodel.basemodel import ID_TYPE
+from kiln_ai.datamodel.eval import EvalConfig, EvalRun, EvalScores
+from kiln_ai.datamodel.model_cache import ModelCache
+
+
+@dataclass
+class ScoreStats:
+    count: int = 0
+    total: float = 0.0
+    total_squares: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.total_squares += value * value
+
+    def remove(self, value: float) -> None:
+        self.count -= 1
+        self.total -= value
+        self.total_squares -= value * value
+
+    def mean(self) -> float | None:
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def variance(self) -> float | None:
+        """Population variance."""
+        mean = self.mean()
+        if mean is None:
+            return None
+        # Clamp float error on near constant scores
+        return max(self.total_squares / self.count - mean * mean, 0.0)
+
+    def std_dev(self) -> float | None:
+        variance = self.variance()
+        return math.sqrt(variance) if variance is not None else None
+
+
+@dataclass
+class ScoreAggregate:
+    """Scores of a set of dataset items, with running stats for each score."""
+
+    # dataset id -> scores of the first eval run for that item
+    items: Dict[ID_TYPE, EvalScores] = field(default_factory=dict)
+    # score key -> stats over items
+    stats: Dict[str, ScoreStats] = field(default_factory=dict)
+    # Items missing one or more of the eval's output scores
+    incomplete: Set[ID_TYPE] = field(default_factory=set)
+
+    def add(
+        self, dataset_id: ID_TYPE, scores: EvalScores, score_keys: Tuple[str, ...]
+    ) -> bool:
+        """Add an item's scores. Returns False (ignoring them) if the item was already added."""
+        if dataset_id in self.items:
+            return False
+        self.items[dataset_id] = scores
+        for key, value in scores.items():
+            self.stats.setdefault(key, ScoreStats()).add(value)
+        if any(key not in scores for key in score_keys):
+            self.incomplete.add(dataset_id)
+        return True
+
+    def within(self, dataset_ids: Set[ID_TYPE]) -> "ScoreAggregate":
+        """The aggregate of only the items in dataset_ids (eg, the current dataset filter).
+
+        Cost is proportional to the items which aren't in dataset_ids, normally none.
+        """
+        excluded = self.items.keys() - dataset_ids
+        if not excluded:
+            return self
+        stats = {key: replace(value) for key, value in self.stats.items()}
+        for dataset_id in excluded:
+            for key, value in self.items[dataset_id].items():
+                stats[key].remove(value)
+        return ScoreAggregate(
+            items={
+                dataset_id: scores
+                for dataset_id, scores in self.items.items()
+                if dataset_id not in excluded
+            },
+            stats=stats,
+            incomplete=self.incomplete - excluded,
+        )
+
+
+@dataclass
+class EvalConfigScores:
+    """Aggregated scores of an eval config's runs. Shared: don't modify."""
+
+    score_keys: Tuple[str, ...]
+    # task run config id (None for eval config evals) -> aggregate
+    by_run_config: Dict[ID_TYPE, ScoreAggregate] = field(default_factory=dict)
+    # All runs, whatever their run config, by dataset item. Used when comparing eval configs to human ratings.
+    by_dataset_item: ScoreAggregate = field(default_factory=ScoreAggregate)
+
+    def add(self, eval_run: EvalRun) -> None:
+        aggregate = self.by_run_config.setdefault(
+            eval_run.task_run_config_id, ScoreAggregate()
+        )
+        aggregate.add(eval_run.dataset_id, eval_run.scores, self.score_keys)
+        self.by_dataset_item.add(eval_run.dataset_id, eval_run.scores, self.score_keys)
+
+
+@dataclass
+class _Entry:
+    scores: EvalConfigScores
+    # Run files counted, which we've seen in a folder listing
+    listed: Set[Path] = field(default_factory=set)
+    # Run files counted when saved, which may not be written yet (write behind)
+    recorded: Set[Path] = field(default_factory=set)
+    # The cached folder listing last checked. Listings are replaced (never mutated) on change, so identity tells us if there's anything new.
+    listing: List[Path] | None = None
+
+
+class EvalScoreAggregates:
+    """Process-wide running score aggregates for eval configs, kept up to date incrementally."""
+
+    _shared_instance = None
+
+    def __init__(self):
+        # eval config file path -> aggregates
+        self._entries: Dict[Path, _Entry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+        return cls._shared_instance
+
+    def scores(
+        self, eval_config: EvalConfig, score_keys: List[str]
+    ) -> EvalConfigScores:
+        """Aggregated scores of all the eval config's runs, updated with any runs saved since the last call.
+
+        Args:
+            eval_config: The eval config
+            score_keys: JSON keys of the eval's output scores. Runs missing any are incomplete.
+        """
+        keys = tuple(score_keys)
+        if eval_config.path is None:
+            # Not saved, nothing to key a cache on
+            scores = EvalConfigScores(score_keys=keys)
+            for eval_run in eval_config.runs(readonly=True):
+                scores.add(eval_run)
+            return scores
+
+        runs_folder = eval_config.path.parent / EvalRun.relationship_name()
+        with self._lock:
+            entry = self._entries.get(eval_config.path)
+            if entry is None or entry.scores.score_keys != keys:
+                entry = _Entry(scores=EvalConfigScores(score_keys=keys))
+                self._entries[eval_config.path] = entry
+
+            listing = ModelCache.shared().get_children_paths(runs_folder)
+            if listing is not None and listing is entry.listing:
+                # Nothing saved or deleted since we last checked
+                return entry.scores
+            if listing is None:
+                listing = list(
+                    EvalRun.iterate_children_paths_of_parent_path(eval_config.path)
+                )
+
+            listed = set(listing)
+            if entry.listed - listed:
+                # Runs were deleted: start over
+                entry = _Entry(scores=EvalConfigScores(score_keys=keys))
+                self._entries[eval_config.path] = entry
+
+            for path in listing:
+                if path in entry.listed:
+                    continue
+                entry.listed.add(path)
+                if path in entry.recorded:
+                    entry.recorded.discard(path)
+                    continue
+                entry.scores.add(EvalRun.load_from_file(path, readonly=True))
+            entry.listing = listing
+            return entry.scores
+
+    def record(self, eval_run: EvalRun) -> None:
+        """Count a newly saved (or queued to be saved) eval run, without reloading it from disk."""
+        eval_config = eval_run.parent_eval_config()
+        if eval_config is None or eval_config.path is None:
+            return
+        path = eval_run.build_path()
+        if path is None:
+            return
+        with self._lock:
+            entry = self._entries.get(eval_config.path)
+            # Nothing to update until someone reads this eval config's scores
+            if entry is None or path in entry.listed or path in entry.recorded:
+                return
+            entry.recorded.add(path)
+            entry.scores.add(eval_run)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
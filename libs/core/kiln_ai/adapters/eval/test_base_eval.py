@@ -1,4 +1,5 @@
 import json
+from unittest.mock import patch
 
 import pytest
 
@@ -6,6 +7,7 @@ from kiln_ai.adapters.eval.base_eval import BaseEval
 from kiln_ai.datamodel import BasePrompt, DataSource, DataSourceType
 from kiln_ai.datamodel.eval import Eval, EvalConfig, EvalOutputScore
 from kiln_ai.datamodel.task import (
+    RunConfig,
     RunConfigProperties,
     Task,
     TaskOutputRatingType,
@@ -323,3 +325,76 @@ async def test_run_method():
 
     # Verify schema validation worked (these keys should exist per schema)
     assert set(eval_scores.keys()) == {"overall_rating", "quality"}
+
+
+class ScoreEval(BaseEval):
+    def __init__(self, eval_config, run_config, scores):
+        super().__init__(eval_config, run_config)
+        self.scores = scores
+
+    async def run_eval(self, task_run):
+        return self.scores, {"thinking": "thoughts"}
+
+
+@pytest.fixture
+def score_eval_config():
+    task = Task(name="Test Task", instruction="Test instruction")
+    eval = Eval(
+        name="Test Eval",
+        parent=task,
+        eval_set_filter_id="all",
+        eval_configs_filter_id="all",
+        output_scores=[
+            EvalOutputScore(
+                name="Quality",
+                instruction="Rate quality",
+                type=TaskOutputRatingType.five_star,
+            ),
+        ],
+    )
+    return EvalConfig(
+        name="Test Eval Config",
+        model_name="gpt-4o",
+        model_provider="openai",
+        parent=eval,
+        properties={"eval_steps": ["test_step"]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_eval_task_output(score_eval_config):
+    evaluator = ScoreEval(score_eval_config, None, {"quality": 4})
+    scores, intermediate_outputs = await evaluator.eval_task_output(None)
+    assert scores == {"quality": 4}
+    assert intermediate_outputs == {"thinking": "thoughts"}
+
+    # Scores are validated against the score schema
+    evaluator = ScoreEval(score_eval_config, None, {"quality": 7})
+    with pytest.raises(ValueError, match="didn't meet the schema"):
+        await evaluator.eval_task_output(None)
+
+
+@pytest.mark.asyncio
+async def test_run_task_requires_run_config(score_eval_config):
+    evaluator = ScoreEval(score_eval_config, None, {"quality": 4})
+    with pytest.raises(ValueError, match="Run config is required"):
+        await evaluator.run_task("input")
+
+
+def test_task_adapter_reused(score_eval_config):
+    task = score_eval_config.parent_eval().parent_task()
+    run_config = RunConfig(
+        task=task,
+        model_name="gpt_4o",
+        model_provider_name="openai",
+        prompt_id="simple_prompt_builder",
+    )
+    evaluator = ScoreEval(score_eval_config, run_config, {"quality": 4})
+
+    with patch("kiln_ai.adapters.eval.base_eval.adapter_for_task") as mock_factory:
+        first = evaluator.task_adapter()
+        second = evaluator.task_adapter()
+
+    assert first is second
+    mock_factory.assert_called_once()
+    assert mock_factory.call_args.kwargs["base_adapter_config"].allow_saving is False
@@ -1,8 +1,11 @@
+import asyncio
+import threading
 from typing import Dict
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from kiln_ai.adapters.call_scheduler import CallPriority, current_call_context
 from kiln_ai.adapters.eval.base_eval import BaseEval
 from kiln_ai.adapters.eval.eval_runner import EvalJob, EvalRunner
 from kiln_ai.datamodel import (
@@ -21,6 +24,7 @@ from kiln_ai.datamodel.eval import (
     EvalScores,
 )
 from kiln_ai.datamodel.task import RunConfigProperties, TaskRunConfig
+from kiln_ai.datamodel.write_behind import WriteBehindQueue
 
 
 @pytest.fixture
@@ -120,27 +124,146 @@ async def test_async_eval_runner_status_updates(mock_eval_runner, concurrency):
     # Job objects are not the right type, but since we're mocking run_job, it doesn't matter
     jobs = [{} for _ in range(job_count)]
 
-    # Mock collect_tasks to return our fake jobs
-    mock_eval_runner.collect_tasks = lambda: jobs
+    # Mock iter_jobs to return our fake jobs
+    mock_eval_runner.iter_jobs = lambda: iter(jobs)
 
     # Mock run_job to return True immediately
     mock_eval_runner.run_job = AsyncMock(return_value=True)
 
     # Expect the status updates in order, and 1 for each job
     expected_compelted_count = 0
+    last_total = 0
     async for progress in mock_eval_runner.run(concurrency=concurrency):
         assert progress.complete == expected_compelted_count
         expected_compelted_count += 1
         assert progress.errors == 0
-        assert progress.total == job_count
+        # Jobs are generated lazily: the total grows as they are queued
+        assert last_total <= progress.total <= job_count
+        assert progress.complete <= progress.total
+        last_total = progress.total
 
     # Verify last status update was complete
     assert expected_compelted_count == job_count + 1
+    assert last_total == job_count
 
     # Verify run_job was called for each job
     assert mock_eval_runner.run_job.call_count == job_count
 
 
+async def test_status_updates_throughput_and_eta(mock_eval_runner):
+    mock_eval_runner.iter_jobs = lambda: iter([{} for _ in range(4)])
+    mock_eval_runner.run_job = AsyncMock(side_effect=[True, False, True, True])
+
+    # Enough workers that all jobs are generated before the first finishes
+    progress = [p async for p in mock_eval_runner.run(concurrency=4)]
+
+    # Unknown until a job finishes
+    assert progress[0].items_per_second is None
+    assert progress[0].eta_seconds is None
+    assert all(p.items_per_second > 0 for p in progress[1:])
+    # ETA counts down to 0 as jobs (complete or errored) finish
+    etas = [p.eta_seconds for p in progress[1:]]
+    assert etas[-1] == 0
+    assert all(eta > 0 for eta in etas[:-1])
+    assert progress[-1].complete == 3
+    assert progress[-1].errors == 1
+
+
+async def test_status_updates_coalesced(mock_eval_runner):
+    job_count = 50
+    mock_eval_runner.iter_jobs = lambda: iter([{} for _ in range(job_count)])
+
+    async def run_job(job):
+        await asyncio.sleep(0.001)
+        return True
+
+    mock_eval_runner.run_job = run_job
+
+    progress = [
+        p async for p in mock_eval_runner.run(concurrency=5, max_updates_per_second=2)
+    ]
+
+    # Far fewer updates than jobs, still in order, and always ending with the final status
+    assert len(progress) < 10
+    assert [p.complete for p in progress] == sorted(p.complete for p in progress)
+    assert progress[0].complete == 0
+    assert progress[-1].complete == job_count
+
+
+async def test_status_updates_coalesced_sends_latest_when_due(mock_eval_runner):
+    mock_eval_runner.iter_jobs = lambda: iter([{} for _ in range(3)])
+    release_last = asyncio.Event()
+    received = []
+    calls = 0
+
+    async def run_job(job):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            await release_last.wait()
+        return True
+
+    mock_eval_runner.run_job = run_job
+
+    async for p in mock_eval_runner.run(concurrency=1, max_updates_per_second=20):
+        received.append(p.complete)
+        if p.complete == 2:
+            # The coalesced update for job 2 was sent without waiting for job 3
+            release_last.set()
+
+    assert received[-1] == 3
+    assert 2 in received
+
+
+async def test_run_no_jobs(mock_eval_runner):
+    mock_eval_runner.iter_jobs = lambda: iter([])
+    progress = [p async for p in mock_eval_runner.run(concurrency=0)]
+    assert len(progress) == 1
+    assert progress[0].total == 0
+
+
+async def test_run_worker_error_does_not_hang(mock_eval_runner):
+    # More jobs than the worker queue holds, so the producer is blocked when the worker fails
+    mock_eval_runner.iter_jobs = lambda: iter([{} for _ in range(20)])
+    mock_eval_runner.run_job = AsyncMock(side_effect=RuntimeError("worker failed"))
+
+    async def run():
+        return [p async for p in mock_eval_runner.run(concurrency=1)]
+
+    task = asyncio.create_task(run())
+    done, _ = await asyncio.wait([task], timeout=2)
+    if not done:
+        task.cancel()
+    assert task in done
+    with pytest.raises(RuntimeError, match="worker failed"):
+        task.result()
+
+
+async def test_run_generates_jobs_off_event_loop(mock_eval_runner):
+    loop_thread = threading.get_ident()
+    generating_threads = set()
+
+    def iter_jobs():
+        for _ in range(3):
+            generating_threads.add(threading.get_ident())
+            yield {}
+
+    mock_eval_runner.iter_jobs = iter_jobs
+    mock_eval_runner.run_job = AsyncMock(return_value=True)
+    progress = [p async for p in mock_eval_runner.run(concurrency=1)]
+
+    assert progress[-1].complete == 3
+    assert generating_threads and loop_thread not in generating_threads
+
+
+async def test_run_invalid_max_updates_per_second(mock_eval_runner):
+    with pytest.raises(
+        ValueError, match="max_updates_per_second must be greater than 0"
+    ):
+        async for _ in mock_eval_runner.run(max_updates_per_second=0):
+            pass
+
+
 def test_collect_tasks_filtering(
     mock_eval,
     mock_eval_runner,
@@ -341,6 +464,99 @@ def test_collect_tasks_excludes_already_run_task_run_eval(
     assert len(jobs) == 0
 
 
+def test_completed_runs_read_from_index(
+    mock_eval_runner, mock_task, data_source, mock_eval_config, mock_run_config
+):
+    task_runs = []
+    for i in range(3):
+        task_run = TaskRun(
+            parent=mock_task,
+            input=f"input {i}",
+            input_source=data_source,
+            output=TaskOutput(output=f"output {i}"),
+        )
+        task_run.save_to_file()
+        task_runs.append(task_run)
+    EvalRun(
+        parent=mock_eval_config,
+        dataset_id=task_runs[0].id,
+        task_run_config_id=mock_run_config.id,
+        input="input 0",
+        output="output 0",
+        scores={"accuracy": 1.0},
+    ).save_to_file()
+
+    # First run builds the index
+    assert len(mock_eval_runner.collect_tasks()) == 2
+
+    # Resuming doesn't load existing eval runs
+    with (
+        patch.object(
+            EvalRun, "load_from_file", side_effect=AssertionError("loaded eval run")
+        ),
+        patch.object(
+            EvalRun,
+            "load_partial_from_file",
+            side_effect=AssertionError("loaded eval run"),
+        ),
+    ):
+        jobs = mock_eval_runner.collect_tasks()
+    assert {job.item.id for job in jobs} == {task_runs[1].id, task_runs[2].id}
+
+    # New eval runs are picked up
+    EvalRun(
+        parent=mock_eval_config,
+        dataset_id=task_runs[1].id,
+        task_run_config_id=mock_run_config.id,
+        input="input 1",
+        output="output 1",
+        scores={"accuracy": 1.0},
+    ).save_to_file()
+    jobs = mock_eval_runner.collect_tasks()
+    assert [job.item.id for job in jobs] == [task_runs[2].id]
+
+
+async def test_run_generates_jobs_lazily(mock_eval_runner):
+    generated = 0
+
+    def iter_jobs():
+        nonlocal generated
+        for _ in range(100):
+            generated += 1
+            yield {}
+
+    generated_at_first_job = None
+
+    async def run_job(job):
+        nonlocal generated_at_first_job
+        if generated_at_first_job is None:
+            generated_at_first_job = generated
+        return True
+
+    mock_eval_runner.iter_jobs = iter_jobs
+    mock_eval_runner.run_job = run_job
+
+    progress = [p async for p in mock_eval_runner.run(concurrency=2)]
+
+    # Jobs started before the rest were generated, and all ran
+    assert generated_at_first_job < 10
+    assert progress[-1].complete == 100
+    assert progress[-1].total == 100
+
+
+async def test_run_job_generation_error(mock_eval_runner):
+    def iter_jobs():
+        yield {}
+        raise ValueError("Bad filter")
+
+    mock_eval_runner.iter_jobs = iter_jobs
+    mock_eval_runner.run_job = AsyncMock(return_value=True)
+
+    with pytest.raises(ValueError, match="Bad filter"):
+        async for _ in mock_eval_runner.run(concurrency=2):
+            pass
+
+
 def test_collect_tasks_excludes_already_run_eval_config_eval(
     mock_task, data_source, mock_eval_config, mock_eval, mock_run_config
 ):
@@ -559,9 +775,14 @@ async def test_run_job_success_eval_config_eval(
         ) -> tuple[EvalScores, Dict[str, str] | None]:
             return mock_scores, {"intermediate_output": "intermediate output"}
 
-    with patch(
-        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
-        return_value=lambda *args: MockEvaluator(*args),
+    with (
+        patch(
+            "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+            return_value=lambda *args: MockEvaluator(*args),
+        ),
+        patch(
+            "kiln_ai.adapters.eval.eval_runner.EvalScoreAggregates.shared"
+        ) as mock_aggregates,
     ):
         success = await mock_eval_runner.run_job(job)
 
@@ -571,6 +792,9 @@ async def test_run_job_success_eval_config_eval(
     eval_runs = mock_eval_config.runs()
     assert len(eval_runs) == 1
     saved_run = eval_runs[0]
+    # And counted in the running score aggregates
+    recorded_run = mock_aggregates.return_value.record.call_args.args[0]
+    assert recorded_run.id == saved_run.id
     assert saved_run.dataset_id == task_run.id
     assert saved_run.task_run_config_id is None
     assert saved_run.scores == mock_scores
@@ -580,6 +804,294 @@ async def test_run_job_success_eval_config_eval(
     assert saved_run.eval_config_eval is True
 
 
+@pytest.mark.asyncio
+async def test_run_with_write_queue(
+    mock_eval, mock_task, data_source, mock_eval_config
+):
+    task_run = TaskRun(
+        parent=mock_task,
+        input="test input",
+        input_source=data_source,
+        output=TaskOutput(output="test output"),
+    )
+    task_run.save_to_file()
+    write_queue = WriteBehindQueue()
+    eval_runner = EvalRunner(
+        eval_configs=[mock_eval_config],
+        run_configs=None,
+        eval_run_type="eval_config_eval",
+        write_queue=write_queue,
+    )
+
+    class MockEvaluator(BaseEval):
+        async def run_task_and_eval(self, input_text):
+            raise ValueError("Attempted to run task and eval for a config eval")
+
+        async def run_eval(
+            self, task_run: TaskRun
+        ) -> tuple[EvalScores, Dict[str, str] | None]:
+            return {"accuracy": 0.95}, None
+
+    with (
+        patch(
+            "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+            return_value=lambda *args: MockEvaluator(*args),
+        ),
+        patch.object(write_queue, "save", wraps=write_queue.save) as mock_save,
+    ):
+        async for _ in eval_runner.run():
+            pass
+
+    mock_save.assert_called_once()
+    # Flushed before the run completes
+    assert write_queue.pending_count() == 0
+    eval_runs = mock_eval_config.runs()
+    assert len(eval_runs) == 1
+    assert eval_runs[0].dataset_id == task_run.id
+    write_queue.shutdown()
+
+
+@pytest.fixture
+def shared_output_runner(mock_eval, mock_task, data_source, mock_run_config):
+    # 3 eval configs, 1 run config, 2 dataset items
+    eval_configs = []
+    for i in range(3):
+        eval_config = EvalConfig(
+            name=f"config {i}",
+            model_name="gpt-4",
+            model_provider="openai",
+            parent=mock_eval,
+            properties={"eval_steps": ["step1"]},
+        )
+        eval_config.save_to_file()
+        eval_configs.append(eval_config)
+    for i in range(2):
+        TaskRun(
+            parent=mock_task,
+            input=f"input {i}",
+            input_source=data_source,
+            output=TaskOutput(output=f"output {i}"),
+        ).save_to_file()
+
+    def build(share_task_outputs=True):
+        return EvalRunner(
+            eval_configs=eval_configs,
+            run_configs=[mock_run_config],
+            eval_run_type="task_run_eval",
+            share_task_outputs=share_task_outputs,
+        )
+
+    return eval_configs, build
+
+
+def counting_evaluator(task_inputs, fail_input=None):
+    class CountingEvaluator(BaseEval):
+        async def run_task(self, input):
+            task_inputs.append(input)
+            await asyncio.sleep(0.01)
+            if input == fail_input:
+                raise ValueError("Task failed")
+            return TaskRun(
+                input=input,
+                input_source=DataSource(
+                    type=DataSourceType.human, properties={"created_by": "Tester"}
+                ),
+                output=TaskOutput(output=f"generated for {input}"),
+            )
+
+        async def run_eval(self, task_run):
+            return {"accuracy": 1.0}, None
+
+    return CountingEvaluator
+
+
+@pytest.mark.parametrize("concurrency", [1, 25])
+@pytest.mark.asyncio
+async def test_run_shares_task_output_between_eval_configs(
+    shared_output_runner, concurrency
+):
+    eval_configs, build = shared_output_runner
+    eval_runner = build()
+    task_inputs = []
+    evaluator_class = counting_evaluator(task_inputs)
+
+    with patch(
+        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+        return_value=lambda *args: evaluator_class(*args),
+    ):
+        progress = [p async for p in eval_runner.run(concurrency=concurrency)]
+
+    assert progress[-1].complete == 6
+    assert progress[-1].errors == 0
+    # Task invoked once per dataset item, not once per eval config
+    assert sorted(task_inputs) == ["input 0", "input 1"]
+    for eval_config in eval_configs:
+        outputs = sorted(run.output for run in eval_config.runs())
+        assert outputs == ["generated for input 0", "generated for input 1"]
+    # Shared outputs released after use
+    assert eval_runner._task_outputs == {}
+    assert eval_runner._task_output_uses == {}
+
+
+@pytest.mark.asyncio
+async def test_run_shared_task_output_error(shared_output_runner):
+    eval_configs, build = shared_output_runner
+    eval_runner = build()
+    task_inputs = []
+    evaluator_class = counting_evaluator(task_inputs, fail_input="input 0")
+
+    with patch(
+        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+        return_value=lambda *args: evaluator_class(*args),
+    ):
+        progress = [p async for p in eval_runner.run()]
+
+    # All eval configs fail for the failed item, without retrying the task
+    assert progress[-1].complete == 3
+    assert progress[-1].errors == 3
+    assert sorted(task_inputs) == ["input 0", "input 1"]
+
+
+@pytest.mark.asyncio
+async def test_run_shared_task_output_evaluator_creation_error(shared_output_runner):
+    eval_configs, build = shared_output_runner
+    eval_runner = build()
+    task_inputs = []
+    evaluator_class = counting_evaluator(task_inputs)
+
+    def create_evaluator(eval_config, *args):
+        if eval_config.id == eval_configs[0].id:
+            raise ValueError("Invalid eval config")
+        return evaluator_class(eval_config, *args)
+
+    with patch(
+        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+        return_value=create_evaluator,
+    ):
+        progress = [p async for p in eval_runner.run()]
+
+    # The failed eval config's jobs error, the rest share the task outputs
+    assert progress[-1].complete == 4
+    assert progress[-1].errors == 2
+    assert sorted(task_inputs) == ["input 0", "input 1"]
+    # Failed jobs release their uses of the shared outputs too
+    assert eval_runner._task_output_uses == {}
+    assert eval_runner._task_outputs == {}
+
+
+@pytest.mark.asyncio
+async def test_run_without_sharing_task_outputs(shared_output_runner):
+    eval_configs, build = shared_output_runner
+    eval_runner = build(share_task_outputs=False)
+    task_inputs = []
+    evaluator_class = counting_evaluator(task_inputs)
+
+    with patch(
+        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+        return_value=lambda *args: evaluator_class(*args),
+    ):
+        progress = [p async for p in eval_runner.run()]
+
+    assert progress[-1].complete == 6
+    assert len(task_inputs) == 6
+
+
+@pytest.mark.asyncio
+async def test_run_adaptive_concurrency(
+    mock_eval, mock_task, data_source, mock_eval_config
+):
+    for i in range(6):
+        TaskRun(
+            parent=mock_task,
+            input=f"input {i}",
+            input_source=data_source,
+            output=TaskOutput(output=f"output {i}"),
+        ).save_to_file()
+    eval_runner = EvalRunner(
+        eval_configs=[mock_eval_config],
+        run_configs=None,
+        eval_run_type="eval_config_eval",
+        adaptive_concurrency=True,
+    )
+
+    class RateLimitedEvaluator(BaseEval):
+        async def run_eval(self, task_run):
+            if task_run.input == "input 0":
+                raise RateLimitError("Rate limit reached")
+            await asyncio.sleep(0.01)
+            return {"accuracy": 1.0}, None
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+    with patch(
+        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+        return_value=lambda *args: RateLimitedEvaluator(*args),
+    ):
+        progress = [p async for p in eval_runner.run(concurrency=10)]
+
+    assert progress[-1].complete == 5
+    assert progress[-1].errors == 1
+    assert all(p.concurrency is not None for p in progress)
+    assert all(p.concurrency_limits is not None for p in progress)
+    limiter = eval_runner.provider_concurrency.limiter("openai")
+    assert limiter.rate_limits == 1
+    assert limiter.successes == 5
+    assert limiter.active == 0
+    assert progress[-1].concurrency_limits == {"openai": limiter.limit}
+
+
+def test_run_adaptive_concurrency_providers(
+    mock_eval_runner, mock_eval_config, mock_run_config
+):
+    mock_run_config.run_config_properties.model_provider_name = "groq"
+    job = EvalJob(
+        item=TaskRun(
+            input="input",
+            input_source=DataSource(
+                type=DataSourceType.human, properties={"created_by": "Tester"}
+            ),
+            output=TaskOutput(output="output"),
+        ),
+        type="task_run_eval",
+        eval_config=mock_eval_config,
+        task_run_config=mock_run_config,
+    )
+    assert mock_eval_runner._job_providers(job) == ["openai", "groq"]
+
+
+def test_share_task_outputs_single_eval_config(mock_eval_runner):
+    # Nothing to share with a single eval config
+    assert mock_eval_runner.share_task_outputs is False
+
+
+@pytest.mark.asyncio
+async def test_run_eval_config_eval_does_not_share_task_outputs(shared_output_runner):
+    eval_configs, _ = shared_output_runner
+    eval_runner = EvalRunner(
+        eval_configs=eval_configs,
+        run_configs=None,
+        eval_run_type="eval_config_eval",
+    )
+    # Task outputs are only generated (and shared) in task_run_eval mode
+    assert eval_runner.share_task_outputs is False
+
+    class Evaluator(BaseEval):
+        async def run_eval(self, task_run):
+            return {"accuracy": 1.0}, None
+
+    with patch(
+        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+        return_value=lambda *args: Evaluator(*args),
+    ):
+        progress = [p async for p in eval_runner.run()]
+
+    assert progress[-1].complete > 0
+    assert progress[-1].errors == 0
+    assert eval_runner._task_output_uses == {}
+    assert eval_runner._task_outputs == {}
+
+
 @pytest.mark.asyncio
 async def test_run_job_invalid_evaluator(
     mock_eval_runner, mock_task, data_source, mock_run_config, mock_eval_config
@@ -639,3 +1151,64 @@ async def test_run_job_evaluator_error(
 
     assert success is False
     assert len(mock_eval_config.runs()) == 0
+
+
+async def test_run_jobs_at_eval_priority(
+    mock_eval, mock_task, data_source, mock_eval_config
+):
+    for i in range(3):
+        TaskRun(
+            parent=mock_task,
+            input=f"test input {i}",
+            input_source=data_source,
+            output=TaskOutput(output="test output"),
+        ).save_to_file()
+    eval_runner = EvalRunner(
+        eval_configs=[mock_eval_config],
+        run_configs=None,
+        eval_run_type="eval_config_eval",
+        priority_weight=2.0,
+    )
+    contexts = []
+
+    async def run_job(job):
+        contexts.append(current_call_context())
+        return True
+
+    with patch.object(eval_runner, "run_job", side_effect=run_job):
+        async for _ in eval_runner.run(concurrency=2):
+            pass
+
+    assert len(contexts) == 3
+    # One fairness group for the whole run, across workers
+    assert {context.priority for context in contexts} == {CallPriority.eval}
+    assert len({context.group for context in contexts}) == 1
+    assert {context.weight for context in contexts} == {2.0}
+    # Not leaked to the caller
+    assert current_call_context().priority == CallPriority.interactive
+
+
+@pytest.mark.asyncio
+async def test_run_reuses_evaluators(shared_output_runner):
+    eval_configs, build = shared_output_runner
+    eval_runner = build(share_task_outputs=False)
+    task_inputs = []
+    evaluator_class = counting_evaluator(task_inputs)
+    created = []
+
+    def create(*args):
+        created.append((args[0].id, args[1]))
+        return evaluator_class(*args)
+
+    with patch(
+        "kiln_ai.adapters.eval.eval_runner.eval_adapter_from_type",
+        return_value=create,
+    ):
+        progress = [p async for p in eval_runner.run()]
+
+    assert progress[-1].complete == 6
+    # One evaluator per eval config (3) and run config (1) pair, not one per job
+    assert len(created) == 3
+    assert len({eval_config_id for eval_config_id, _ in created}) == 3
+    # Released when the run completes
+    assert eval_runner._evaluators == {}
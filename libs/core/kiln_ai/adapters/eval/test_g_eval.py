@@ -1,5 +1,6 @@
 import math
 import pickle
+from unittest.mock import patch
 
 import pytest
 
@@ -496,3 +497,18 @@ async def test_all_built_in_models_logprobs_geval(
         model_name,
         provider_name.value,
     )
+
+
+def test_judge_adapter_reused(test_eval_config, test_run_config):
+    g_eval = GEval(test_eval_config, test_run_config)
+
+    with patch("kiln_ai.adapters.eval.g_eval.adapter_for_task") as mock_factory:
+        first = g_eval.judge_adapter()
+        second = g_eval.judge_adapter()
+
+    assert first is second
+    mock_factory.assert_called_once()
+    base_adapter_config = mock_factory.call_args.kwargs["base_adapter_config"]
+    assert base_adapter_config.allow_saving is False
+    # G-Eval needs logprobs
+    assert base_adapter_config.top_logprobs == 10
@@ -0,0 +1,216 @@
+import shutil
+from unittest.mock import Mock, patch
+
+import pytest
+
+from kiln_ai.adapters.eval.score_aggregates import (
+    EvalScoreAggregates,
+    ScoreAggregate,
+    ScoreStats,
+)
+from kiln_ai.datamodel import Task, TaskOutputRatingType
+from kiln_ai.datamodel.eval import Eval, EvalConfig, EvalOutputScore, EvalRun
+
+
+@pytest.fixture
+def eval_config(tmp_path):
+    task = Task(
+        name="test",
+        instruction="do the thing",
+        path=tmp_path / "task.kiln",
+    )
+    task.save_to_file()
+    eval = Eval(
+        name="test",
+        eval_set_filter_id="all",
+        eval_configs_filter_id="all",
+        output_scores=[
+            EvalOutputScore(name="accuracy", type=TaskOutputRatingType.five_star),
+            EvalOutputScore(name="relevance", type=TaskOutputRatingType.five_star),
+        ],
+        parent=task,
+    )
+    eval.save_to_file()
+    eval_config = EvalConfig(
+        name="test",
+        model_name="gpt-4",
+        model_provider="openai",
+        parent=eval,
+        properties={"eval_steps": ["step1"]},
+    )
+    eval_config.save_to_file()
+    return eval_config
+
+
+def eval_run(eval_config, dataset_id, scores, run_config_id="rc1", save=True):
+    run = EvalRun(
+        parent=eval_config,
+        dataset_id=dataset_id,
+        task_run_config_id=run_config_id,
+        input="input",
+        output="output",
+        scores=scores,
+    )
+    if save:
+        run.save_to_file()
+    return run
+
+
+SCORE_KEYS = ["accuracy", "relevance"]
+
+
+def test_score_stats():
+    stats = ScoreStats()
+    assert stats.mean() is None
+    assert stats.variance() is None
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        stats.add(value)
+    assert stats.count == 4
+    assert stats.mean() == 2.5
+    assert stats.variance() == pytest.approx(1.25)
+    assert stats.std_dev() == pytest.approx(1.25**0.5)
+
+    stats.remove(4.0)
+    assert stats.mean() == 2.0
+    assert stats.variance() == pytest.approx(2 / 3)
+
+
+def test_score_aggregate_dedupes_and_tracks_incomplete():
+    aggregate = ScoreAggregate()
+    keys = ("accuracy", "relevance")
+    assert aggregate.add("a", {"accuracy": 4.0, "relevance": 5.0}, keys)
+    assert aggregate.add("b", {"accuracy": 2.0}, keys)
+    # First run for an item counts
+    assert not aggregate.add("a", {"accuracy": 1.0, "relevance": 1.0}, keys)
+
+    assert aggregate.stats["accuracy"].mean() == 3.0
+    assert aggregate.stats["relevance"].count == 1
+    assert aggregate.incomplete == {"b"}
+
+
+def test_score_aggregate_within():
+    aggregate = ScoreAggregate()
+    keys = ("accuracy",)
+    aggregate.add("a", {"accuracy": 4.0}, keys)
+    aggregate.add("b", {"other": 1.0}, keys)
+    aggregate.add("c", {"accuracy": 2.0}, keys)
+
+    # Nothing excluded: no copy
+    assert aggregate.within({"a", "b", "c", "d"}) is aggregate
+
+    within = aggregate.within({"a", "b"})
+    assert set(within.items) == {"a", "b"}
+    assert within.stats["accuracy"].mean() == 4.0
+    assert within.incomplete == {"b"}
+    # Original unchanged
+    assert aggregate.stats["accuracy"].mean() == 3.0
+    assert len(aggregate.items) == 3
+
+
+def test_scores(eval_config):
+    eval_run(eval_config, "d1", {"accuracy": 4.0, "relevance": 5.0})
+    eval_run(eval_config, "d2", {"accuracy": 2.0, "relevance": 3.0})
+    eval_run(eval_config, "d1", {"accuracy": 1.0, "relevance": 1.0}, "rc2")
+
+    scores = EvalScoreAggregates().scores(eval_config, SCORE_KEYS)
+
+    rc1 = scores.by_run_config["rc1"]
+    assert rc1.stats["accuracy"].mean() == 3.0
+    assert rc1.stats["relevance"].mean() == 4.0
+    assert rc1.incomplete == set()
+    assert scores.by_run_config["rc2"].stats["accuracy"].mean() == 1.0
+    # By dataset item: one run per item, whatever the run config
+    assert set(scores.by_dataset_item.items) == {"d1", "d2"}
+
+
+def test_scores_incremental(eval_config):
+    aggregates = EvalScoreAggregates()
+    eval_run(eval_config, "d1", {"accuracy": 4.0, "relevance": 5.0})
+    scores = aggregates.scores(eval_config, SCORE_KEYS)
+    assert scores.by_run_config["rc1"].stats["accuracy"].count == 1
+
+    # Only new runs are loaded
+    eval_run(eval_config, "d2", {"accuracy": 2.0, "relevance": 3.0})
+    with patch.object(
+        EvalRun, "load_from_file", wraps=EvalRun.load_from_file
+    ) as load_from_file:
+        scores = aggregates.scores(eval_config, SCORE_KEYS)
+    assert load_from_file.call_count == 1
+    assert scores.by_run_config["rc1"].stats["accuracy"].mean() == 3.0
+
+    # Unchanged: nothing loaded
+    with patch.object(EvalRun, "load_from_file") as load_from_file:
+        aggregates.scores(eval_config, SCORE_KEYS)
+    load_from_file.assert_not_called()
+
+
+def test_scores_rebuilt_on_delete(eval_config):
+    aggregates = EvalScoreAggregates()
+    eval_run(eval_config, "d1", {"accuracy": 4.0, "relevance": 5.0})
+    deleted = eval_run(eval_config, "d2", {"accuracy": 2.0, "relevance": 3.0})
+    assert aggregates.scores(eval_config, SCORE_KEYS).by_run_config["rc1"].stats[
+        "accuracy"
+    ].mean() == pytest.approx(3.0)
+
+    shutil.rmtree(deleted.path.parent)
+    scores = aggregates.scores(eval_config, SCORE_KEYS)
+    assert scores.by_run_config["rc1"].stats["accuracy"].mean() == 4.0
+    assert set(scores.by_run_config["rc1"].items) == {"d1"}
+
+
+def test_scores_rebuilt_when_score_keys_change(eval_config):
+    aggregates = EvalScoreAggregates()
+    eval_run(eval_config, "d1", {"accuracy": 4.0, "relevance": 5.0})
+    scores = aggregates.scores(eval_config, SCORE_KEYS + ["missing"])
+    assert scores.by_run_config["rc1"].incomplete == {"d1"}
+    scores = aggregates.scores(eval_config, SCORE_KEYS)
+    assert scores.by_run_config["rc1"].incomplete == set()
+
+
+def test_record(eval_config):
+    aggregates = EvalScoreAggregates()
+    aggregates.scores(eval_config, SCORE_KEYS)
+
+    # Queued to save (write behind): counted right away
+    run = eval_run(eval_config, "d1", {"accuracy": 4.0, "relevance": 5.0}, save=False)
+    aggregates.record(run)
+    aggregates.record(run)
+    scores = aggregates.scores(eval_config, SCORE_KEYS)
+    assert scores.by_run_config["rc1"].stats["accuracy"].count == 1
+
+    # Once written, it isn't loaded or counted again
+    run.save_to_file()
+    with patch.object(EvalRun, "load_from_file") as load_from_file:
+        scores = aggregates.scores(eval_config, SCORE_KEYS)
+    load_from_file.assert_not_called()
+    assert scores.by_run_config["rc1"].stats["accuracy"].count == 1
+
+
+def test_record_before_read_ignored(eval_config):
+    aggregates = EvalScoreAggregates()
+    run = eval_run(eval_config, "d1", {"accuracy": 4.0, "relevance": 5.0})
+    # Nobody has read this eval config's scores yet: picked up from disk on first read
+    aggregates.record(run)
+    scores = aggregates.scores(eval_config, SCORE_KEYS)
+    assert scores.by_run_config["rc1"].stats["accuracy"].count == 1
+
+
+def test_scores_unsaved_eval_config():
+    eval_config = Mock(spec=EvalConfig)
+    eval_config.path = None
+    eval_config.runs.return_value = [
+        EvalRun(
+            dataset_id="d1",
+            task_run_config_id="rc1",
+            input="input",
+            output="output",
+            scores={"accuracy": 4.0},
+        )
+    ]
+    scores = EvalScoreAggregates().scores(eval_config, SCORE_KEYS)
+    assert scores.by_run_config["rc1"].stats["accuracy"].mean() == 4.0
+    eval_config.runs.assert_called_once_with(readonly=True)
+
+
+def test_shared():
+    assert EvalScoreAggregates.shared() is EvalScoreAggregates.shared()
@@ -0,0 +1,191 @@
+"""
+An index of the task runs usable as prompt examples, so multi-shot prompts don't load and sort every run of a task.
+
+Multi-shot prompt builders want repaired runs first (in run folder order), then the highest rated of the high quality runs. ExampleIndex keeps both lists, in order, for each task:
+
+ - Built from a summary per run (repaired, and the rating if it's high quality), read from a persistent ChildSummaryIndex. A cold build only loads runs the summary index hasn't seen.
+ - Kept up to date incrementally: runs saved or deleted by this process are reported by ModelCache (changes_since), and only those runs are re-read.
+ - Runs added or removed by another process change the runs folder mtime, and the task's index is rebuilt. Ratings edited by another process aren't seen until the next rebuild.
+ - Picking the first k examples is O(k), plus loading those k runs.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from kiln_ai.datamodel import Task, TaskRun
+from kiln_ai.datamodel.model_cache import ModelCache
+from kiln_ai.datamodel.summary_index import ChildSummaryIndex
+
+
+def example_summary(run: TaskRun) -> Dict[str, Any]:
+    rating = run.output.rating
+    high_quality_rating = (
+        rating.value
+        if rating is not None and rating.value is not None and rating.is_high_quality()
+        else None
+    )
+    return {
+        "repaired": run.repaired_output is not None,
+        "rating": high_quality_rating,
+    }
+
+
+# Bump the version if example_summary changes, to rebuild existing indexes.
+example_summary_index = ChildSummaryIndex(
+    TaskRun,
+    name="prompt_examples",
+    summarize=example_summary,
+    version=1,
+    # Not needed for summaries, and can be large. Skip parsing/validating them.
+    deferred_fields={"intermediate_outputs"},
+)
+
+
+@dataclass
+class _Example:
+    # Order of the run's folder in the summary index, to break ties like a stable sort would
+    position: int
+    repaired: bool
+    rating: float | None
+
+
+@dataclass
+class _TaskExamples:
+    examples: Dict[Path, _Example] = field(default_factory=dict)
+    # Repaired runs: (position, path), sorted
+    repaired: List[Tuple[int, Path]] = field(default_factory=list)
+    # High quality, unrepaired runs: (-rating, position, path), sorted (highest rating first)
+    rated: List[Tuple[float, int, Path]] = field(default_factory=list)
+    next_position: int = 0
+    # ModelCache revision and mtime of the runs folder this reflects
+    revision: int = 0
+    mtime_ns: int | None = None
+
+    def set(self, path: Path, summary: Dict[str, Any]) -> bool:
+        """Add or update a run's summary. Returns True if the run is new."""
+        previous = self.remove(path)
+        if previous is not None:
+            position = previous.position
+        else:
+            position = self.next_position
+            self.next_position += 1
+        example = _Example(
+            position=position,
+            repaired=summary["repaired"],
+            rating=summary["rating"],
+        )
+        self.examples[path] = example
+        if example.repaired:
+            insort(self.repaired, (position, path))
+        elif example.rating is not None:
+            insort(self.rated, (-example.rating, position, path))
+        return previous is None
+
+    def remove(self, path: Path) -> _Example | None:
+        example = self.examples.pop(path, None)
+        if example is None:
+            return None
+        if example.repaired:
+            _remove_sorted(self.repaired, (example.position, path))
+        elif example.rating is not None:
+            _remove_sorted(self.rated, (-example.rating, example.position, path))
+        return example
+
+    def first(self, count: int) -> List[Path]:
+        paths = [path for _, path in self.repaired[:count]]
+        remaining = count - len(paths)
+        if remaining > 0:
+            paths.extend(path for _, _, path in self.rated[:remaining])
+        return paths
+
+
+def _remove_sorted(items: List, item: Any) -> None:
+    index = bisect_left(items, item)
+    if index < len(items) and items[index] == item:
+        del items[index]
+
+
+class ExampleIndex:
+    """Process-wide index of each task's prompt example candidates: repaired runs, and high quality runs by rating."""
+
+    _shared_instance = None
+
+    def __init__(self):
+        # runs folder -> examples
+        self._tasks: Dict[Path, _TaskExamples] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+        return cls._shared_instance
+
+    def examples(self, task: Task, count: int) -> List[TaskRun]:
+        """The task's best `count` runs to use as examples: repaired runs first (in run folder order), then high quality runs, highest rated first.
+
+        Returned runs are readonly (cached instances, not safe to mutate).
+        """
+        return [
+            TaskRun.load_from_file(path, readonly=True)
+            for path in self.example_paths(task, count)
+        ]
+
+    def example_paths(self, task: Task, count: int) -> List[Path]:
+        """Like examples, but the paths of the runs' files."""
+        if task.path is None or count <= 0:
+            # Runs are disk based. If not saved, there are none
+            return []
+        runs_folder = task.path.parent / TaskRun.relationship_name()
+        with self._lock:
+            return self._refresh(task.path, runs_folder).first(count)
+
+    def _refresh(self, task_path: Path, runs_folder: Path) -> _TaskExamples:
+        # Caller must hold the lock.
+        # Read before updating: changes made while we update are picked up next time.
+        cache = ModelCache.shared()
+        revision = cache.revision(runs_folder)
+        try:
+            mtime_ns: int | None = runs_folder.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+
+        examples = self._tasks.get(runs_folder)
+        if examples is not None:
+            if examples.revision == revision and examples.mtime_ns == mtime_ns:
+                return examples
+            changes = cache.changes_since(runs_folder, examples.revision)
+            if changes is not None:
+                added_or_removed = self._apply_changes(examples, changes)
+                # If the runs folder changed without us adding or removing a run, another process did: rebuild
+                if mtime_ns == examples.mtime_ns or added_or_removed:
+                    examples.revision = revision
+                    examples.mtime_ns = mtime_ns
+                    return examples
+
+        examples = _TaskExamples(revision=revision, mtime_ns=mtime_ns)
+        for path, summary in example_summary_index.summaries_with_paths(task_path):
+            examples.set(path, summary)
+        self._tasks[runs_folder] = examples
+        return examples
+
+    def _apply_changes(self, examples: _TaskExamples, changes: List[Path]) -> bool:
+        # Returns True if any runs were added or removed
+        added_or_removed = False
+        for path in changes:
+            if path.name != TaskRun.base_filename():
+                continue
+            try:
+                run = TaskRun.load_from_file(path, readonly=True)
+            except FileNotFoundError:
+                added_or_removed |= examples.remove(path) is not None
+                continue
+            added_or_removed |= examples.set(path, example_summary(run))
+        return added_or_removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tasks.clear()
@@ -1,8 +1,6 @@
 from typing import Tuple
 from uuid import uuid4
 
-import httpx
-
 from kiln_ai.adapters.fine_tune.base_finetune import (
     BaseFinetuneAdapter,
     FineTuneParameter,
@@ -12,6 +10,9 @@ from kiln_ai.adapters.fine_tune.base_finetune import (
 from kiln_ai.adapters.fine_tune.dataset_formatter import DatasetFormat, DatasetFormatter
 from kiln_ai.datamodel import DatasetSplit, StructuredOutputMode, Task
 from kiln_ai.utils.config import Config
+from kiln_ai.utils.http_client import HttpClientPool
+
+FIREWORKS_BASE_URL = "https://api.fireworks.ai"
 
 
 class FireworksFinetune(BaseFinetuneAdapter):
@@ -54,7 +55,9 @@ class FireworksFinetune(BaseFinetuneAdapter):
             url = f"https://api.fireworks.ai/v1/{fine_tuning_job_id}"
             headers = {"Authorization": f"Bearer {api_key}"}
 
-            async with httpx.AsyncClient() as client:
+            async with HttpClientPool.shared().async_client(
+                FIREWORKS_BASE_URL
+            ) as client:
                 response = await client.get(url, headers=headers, timeout=15.0)
 
             if response.status_code != 200:
@@ -143,7 +146,7 @@ class FireworksFinetune(BaseFinetuneAdapter):
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
-        async with httpx.AsyncClient() as client:
+        async with HttpClientPool.shared().async_client(FIREWORKS_BASE_URL) as client:
             response = await client.post(url, json=payload, headers=headers)
         if response.status_code != 200:
             raise ValueError(
@@ -194,7 +197,7 @@ class FireworksFinetune(BaseFinetuneAdapter):
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
-        async with httpx.AsyncClient() as client:
+        async with HttpClientPool.shared().async_client(FIREWORKS_BASE_URL) as client:
             create_dataset_response = await client.post(
                 url, json=payload, headers=headers
             )
@@ -208,7 +211,7 @@ class FireworksFinetune(BaseFinetuneAdapter):
         headers = {
             "Authorization": f"Bearer {api_key}",
         }
-        async with httpx.AsyncClient() as client:
+        async with HttpClientPool.shared().async_client(FIREWORKS_BASE_URL) as client:
             with open(path, "rb") as f:
                 files = {"file": f}
                 upload_dataset_response = await client.post(
@@ -223,7 +226,7 @@ class FireworksFinetune(BaseFinetuneAdapter):
 
         # Third call checks it's "READY"
         url = f"https://api.fireworks.ai/v1/accounts/{account_id}/datasets/{dataset_id}"
-        async with httpx.AsyncClient() as client:
+        async with HttpClientPool.shared().async_client(FIREWORKS_BASE_URL) as client:
             response = await client.get(url, headers=headers)
         if response.status_code != 200:
             raise ValueError(
@@ -308,7 +311,7 @@ class FireworksFinetune(BaseFinetuneAdapter):
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
-        async with httpx.AsyncClient() as client:
+        async with HttpClientPool.shared().async_client(FIREWORKS_BASE_URL) as client:
             response = await client.post(url, json=payload, headers=headers)
 
         # Fresh deploy worked (200) or already deployed (code=9)
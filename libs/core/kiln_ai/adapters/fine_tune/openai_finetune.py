@@ -12,9 +12,13 @@ from kiln_ai.adapters.fine_tune.base_finetune import (
 from kiln_ai.adapters.fine_tune.dataset_formatter import DatasetFormat, DatasetFormatter
 from kiln_ai.datamodel import DatasetSplit, StructuredOutputMode, Task
 from kiln_ai.utils.config import Config
+from kiln_ai.utils.http_client import HttpClientPool
 
 oai_client = openai.AsyncOpenAI(
     api_key=Config.shared().open_ai_api_key or "",
+    http_client=openai.DefaultAsyncHttpxClient(
+        transport=HttpClientPool.shared().transport("https://api.openai.com")
+    ),
 )
 
 
@@ -1,13 +1,22 @@
+import copy
 import json
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, Literal, Tuple
+from typing import Any, Dict, Literal, Tuple
 
+from kiln_ai.adapters.call_scheduler import CallScheduler
 from kiln_ai.adapters.ml_model_list import KilnModelProvider, StructuredOutputMode
 from kiln_ai.adapters.parsers.parser_registry import model_parser_from_id
 from kiln_ai.adapters.prompt_builders import prompt_builder_from_id
 from kiln_ai.adapters.provider_tools import kiln_model_provider_from
+from kiln_ai.adapters.rate_limiter import ProviderRateLimiter, estimate_tokens
+from kiln_ai.adapters.response_cache import (
+    ResponseCache,
+    run_output_from_json,
+    run_output_to_json,
+)
 from kiln_ai.adapters.run_output import RunOutput
+from kiln_ai.adapters.single_flight import SingleFlight
 from kiln_ai.datamodel import (
     DataSource,
     DataSourceType,
@@ -35,6 +44,9 @@ class AdapterConfig:
 
 COT_FINAL_ANSWER_PROMPT = "Considering the above, return a final result."
 
+# Model calls in flight, keyed by request. Identical concurrent invocations share one call.
+_in_flight_calls: SingleFlight[Tuple[RunOutput, RunOutput]] = SingleFlight()
+
 
 class BaseAdapter(metaclass=ABCMeta):
     """Base class for AI model adapters that handle task execution.
@@ -115,8 +127,62 @@ class BaseAdapter(metaclass=ABCMeta):
                 raise ValueError(f"structured input is not a dict: {input}")
             validate_schema(input, self.input_schema)
 
-        # Run
-        run_output = await self._run(input)
+        # Identical requests (by response_cache_request) can share a cached response, or a call already in flight
+        cache_enabled = ResponseCache.enabled()
+        coalesce = Config.shared().coalesce_requests
+        request_key: str | None = None
+        if cache_enabled or coalesce:
+            cache_request = await self.response_cache_request(input)
+            if cache_request is not None:
+                request_key = ResponseCache.key(cache_request)
+        cache_key = request_key if cache_enabled else None
+
+        if coalesce and request_key is not None:
+            (run_output, parsed_output), shared = await _in_flight_calls.do(
+                request_key, lambda: self._run_and_parse(input, cache_key)
+            )
+            if shared:
+                # Another caller's result: copy so callers can't see each other's changes
+                run_output = copy.deepcopy(run_output)
+                parsed_output = copy.deepcopy(parsed_output)
+        else:
+            run_output, parsed_output = await self._run_and_parse(input, cache_key)
+
+        # Generate the run and output
+        run = self.generate_run(input, input_source, parsed_output)
+
+        # Save the run if configured to do so, and we have a path to save to
+        if (
+            self.base_adapter_config.allow_saving
+            and Config.shared().autosave_runs
+            and self.task().path is not None
+        ):
+            run.save_to_file()
+        else:
+            # Clear the ID to indicate it's not persisted
+            run.id = None
+
+        return run, run_output
+
+    async def _run_and_parse(
+        self, input: Dict | str, cache_key: str | None
+    ) -> Tuple[RunOutput, RunOutput]:
+        # Returns the raw and parsed model output, from the response cache if cache_key is set and cached
+        run_output: RunOutput | None = None
+        if cache_key is not None:
+            cached = await ResponseCache.shared().get_async(cache_key)
+            if cached is not None:
+                run_output = run_output_from_json(cached)
+
+        if run_output is None:
+            # Wait for our share of the provider's rate limit, then a call slot (served by priority), then run.
+            # Rate limit first: waiting for budget while holding a slot would block calls to other models of this provider.
+            await self.acquire_rate_limit(input)
+            async with CallScheduler.shared().slot(self.run_config.model_provider_name):
+                run_output = await self._run(input)
+        else:
+            # Cached, no need to cache again
+            cache_key = None
 
         # Parse
         provider = self.model_provider()
@@ -138,21 +204,55 @@ class BaseAdapter(metaclass=ABCMeta):
                     f"response is not a string for non-structured task: {parsed_output.output}"
                 )
 
-        # Generate the run and output
-        run = self.generate_run(input, input_source, parsed_output)
+        # Only cache responses which parse and validate, so a bad response isn't repeated
+        if cache_key is not None:
+            await ResponseCache.shared().set_async(
+                cache_key, run_output_to_json(run_output)
+            )
 
-        # Save the run if configured to do so, and we have a path to save to
-        if (
-            self.base_adapter_config.allow_saving
-            and Config.shared().autosave_runs
-            and self.task().path is not None
-        ):
-            run.save_to_file()
-        else:
-            # Clear the ID to indicate it's not persisted
-            run.id = None
+        return run_output, parsed_output
 
-        return run, run_output
+    async def acquire_rate_limit(self, input: Dict | str) -> None:
+        """Wait for budget from the process-wide provider rate limiter, if this provider/model has a limit configured."""
+        provider_name = self.run_config.model_provider_name
+        model_name = self.run_config.model_name
+        limiter = ProviderRateLimiter.shared()
+        if not limiter.is_limited(provider_name, model_name):
+            return
+
+        # Estimate tokens from the prompt. Two call COT sends the prompt twice (plus the thinking, which we can't know yet).
+        input_str = (
+            json.dumps(input, ensure_ascii=False) if isinstance(input, dict) else input
+        )
+        requests = 2 if self.run_strategy()[0] == "cot_two_call" else 1
+        tokens = estimate_tokens(self.build_prompt() + input_str) * requests
+        await limiter.acquire(
+            provider_name, model_name, tokens=tokens, requests=requests
+        )
+
+    async def response_cache_request(self, input: Dict | str) -> Dict[str, Any] | None:
+        """Everything which determines the model's response to this input, used as the response cache key. None if this adapter's responses can't be cached.
+
+        Adapters which support caching extend base_response_cache_request with their provider specific request options.
+        """
+        return None
+
+    def base_response_cache_request(self, input: Dict | str) -> Dict[str, Any]:
+        run_strategy, cot_prompt = self.run_strategy()
+        return {
+            "adapter": self.adapter_name(),
+            "provider": self.run_config.model_provider_name,
+            "model": self.run_config.model_name,
+            "system_prompt": self.build_prompt(),
+            "user_message": self.prompt_builder.build_user_message(input),
+            "run_strategy": run_strategy,
+            "cot_prompt": cot_prompt,
+            "cot_final_answer_prompt": COT_FINAL_ANSWER_PROMPT
+            if run_strategy == "cot_two_call"
+            else None,
+            "output_schema": self.output_schema,
+            "top_logprobs": self.base_adapter_config.top_logprobs,
+        }
 
     def has_structured_output(self) -> bool:
         return self.output_schema is not None
@@ -49,6 +49,8 @@ class LangchainAdapter(BaseAdapter):
         prompt_id: PromptId | None = None,
         base_adapter_config: AdapterConfig | None = None,
     ):
+        # We can't tell what a custom model will send, so can't cache its responses
+        self.custom_model = custom_model is not None
         if custom_model is not None:
             self._model = custom_model
 
@@ -204,6 +206,19 @@ class LangchainAdapter(BaseAdapter):
     def adapter_name(self) -> str:
         return "kiln_langchain_adapter"
 
+    async def response_cache_request(self, input: Dict | str) -> Dict[str, Any] | None:
+        if self.custom_model:
+            return None
+        provider = self.model_provider()
+        return {
+            **self.base_response_cache_request(input),
+            "provider_options": provider.provider_options,
+            "structured_output_mode": provider.structured_output_mode,
+            "structured_output_options": self.get_structured_output_options(
+                self.run_config.model_name, self.run_config.model_provider_name
+            ),
+        }
+
     def _munge_response(self, response: Dict) -> Dict:
         # Mistral Large tool calling format is a bit different. Convert to standard format.
         if (
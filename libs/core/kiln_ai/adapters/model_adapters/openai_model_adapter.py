@@ -1,6 +1,6 @@
 from typing import Any, Dict
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from openai.types.chat import (
     ChatCompletion,
     ChatCompletionAssistantMessageParam,
@@ -27,6 +27,7 @@ from kiln_ai.adapters.parsers.json_parser import parse_json_string
 from kiln_ai.datamodel import PromptGenerators, PromptId
 from kiln_ai.datamodel.task import RunConfig
 from kiln_ai.utils.exhaustive_error import raise_exhaustive_enum_error
+from kiln_ai.utils.http_client import HttpClientPool
 
 
 class OpenAICompatibleAdapter(BaseAdapter):
@@ -42,6 +43,10 @@ class OpenAICompatibleAdapter(BaseAdapter):
             api_key=config.api_key,
             base_url=config.base_url,
             default_headers=config.default_headers,
+            # Share keep-alive connections with every other adapter calling this base URL
+            http_client=DefaultAsyncHttpxClient(
+                transport=HttpClientPool.shared().transport(config.base_url)
+            ),
         )
 
         run_config = RunConfig(
@@ -181,6 +186,16 @@ class OpenAICompatibleAdapter(BaseAdapter):
     def adapter_name(self) -> str:
         return "kiln_openai_compatible_adapter"
 
+    async def response_cache_request(self, input: Dict | str) -> Dict[str, Any]:
+        provider = self.model_provider()
+        return {
+            **self.base_response_cache_request(input),
+            "base_url": self.config.base_url,
+            "api_model": provider.provider_options["model"],
+            "extra_body": self.build_extra_body(provider),
+            "response_format_options": await self.response_format_options(),
+        }
+
     async def response_format_options(self) -> dict[str, Any]:
         # Unstructured if task isn't structured
         if not self.has_structured_output():
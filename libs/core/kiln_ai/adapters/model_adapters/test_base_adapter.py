@@ -1,9 +1,13 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from kiln_ai.adapters.call_scheduler import CallScheduler
 from kiln_ai.adapters.ml_model_list import KilnModelProvider, StructuredOutputMode
 from kiln_ai.adapters.model_adapters.base_adapter import BaseAdapter
+from kiln_ai.adapters.response_cache import ResponseCache
+from kiln_ai.adapters.run_output import RunOutput
 from kiln_ai.datamodel import Task
 from kiln_ai.datamodel.task import RunConfig
 
@@ -197,3 +201,232 @@ async def test_run_strategy(
     # Test
     result = adapter.run_strategy()
     assert result == expected
+
+
+async def test_acquire_rate_limit_not_limited(adapter):
+    limiter = MagicMock()
+    limiter.is_limited.return_value = False
+    limiter.acquire = AsyncMock()
+    adapter.build_prompt = MagicMock()
+    with patch(
+        "kiln_ai.adapters.model_adapters.base_adapter.ProviderRateLimiter.shared",
+        return_value=limiter,
+    ):
+        await adapter.acquire_rate_limit("input")
+
+    limiter.is_limited.assert_called_once_with("test_provider", "test_model")
+    limiter.acquire.assert_not_called()
+    # No prompt building to estimate tokens if not limited
+    adapter.build_prompt.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "run_strategy,expected_requests",
+    [("basic", 1), ("cot_as_message", 1), ("cot_two_call", 2)],
+)
+async def test_acquire_rate_limit(adapter, run_strategy, expected_requests):
+    limiter = MagicMock()
+    limiter.is_limited.return_value = True
+    limiter.acquire = AsyncMock()
+    adapter.build_prompt = MagicMock(return_value="p" * 396)
+    adapter.run_strategy = MagicMock(return_value=(run_strategy, None))
+    with patch(
+        "kiln_ai.adapters.model_adapters.base_adapter.ProviderRateLimiter.shared",
+        return_value=limiter,
+    ):
+        await adapter.acquire_rate_limit({"a": 1})
+
+    # 396 prompt chars + 8 input chars = 101 tokens, per request
+    limiter.acquire.assert_awaited_once_with(
+        "test_provider",
+        "test_model",
+        tokens=101 * expected_requests,
+        requests=expected_requests,
+    )
+
+
+async def test_invoke_acquires_rate_limit_before_run(adapter):
+    calls = []
+    adapter.acquire_rate_limit = AsyncMock(
+        side_effect=lambda input: calls.append("acquire")
+    )
+
+    async def run(input):
+        calls.append("run")
+        raise RuntimeError("stop")
+
+    async def acquire_slot(provider):
+        calls.append("slot")
+
+    adapter._run = run
+    scheduler = CallScheduler(max_concurrency=1)
+    with (
+        patch.object(CallScheduler, "shared", return_value=scheduler),
+        patch.object(scheduler, "acquire", side_effect=acquire_slot),
+        patch.object(scheduler, "release"),
+    ):
+        with pytest.raises(RuntimeError, match="stop"):
+            await adapter.invoke("input")
+    adapter.acquire_rate_limit.assert_awaited_once_with("input")
+    # Rate limit budget before the call slot, so waiting for budget doesn't hold a slot
+    assert calls == ["acquire", "slot", "run"]
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    cache = ResponseCache(tmp_path / "response_cache.sqlite")
+    with (
+        patch.object(ResponseCache, "enabled", return_value=True),
+        patch.object(ResponseCache, "shared", return_value=cache),
+    ):
+        yield cache
+
+
+@pytest.fixture
+def cacheable_adapter(adapter, mock_provider):
+    adapter._model_provider = mock_provider
+    adapter.acquire_rate_limit = AsyncMock()
+
+    async def response_cache_request(input):
+        return {"input": input}
+
+    adapter.response_cache_request = response_cache_request
+    adapter._run = AsyncMock(
+        return_value=RunOutput(output="model output", intermediate_outputs=None)
+    )
+    return adapter
+
+
+async def test_response_cache_hit_skips_model_call(cacheable_adapter, response_cache):
+    first = await cacheable_adapter.invoke("input")
+    assert first.output.output == "model output"
+    assert cacheable_adapter._run.await_count == 1
+
+    with patch.object(CallScheduler, "shared") as mock_scheduler:
+        second = await cacheable_adapter.invoke("input")
+    assert second.output.output == "model output"
+    # Served from the cache: no model call, call slot or rate limit budget
+    assert cacheable_adapter._run.await_count == 1
+    mock_scheduler.assert_not_called()
+    assert cacheable_adapter.acquire_rate_limit.await_count == 1
+
+    # Different request, different entry
+    await cacheable_adapter.invoke("other input")
+    assert cacheable_adapter._run.await_count == 2
+
+    stats = response_cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 2)
+
+
+async def test_response_cache_skips_invalid_output(cacheable_adapter, response_cache):
+    cacheable_adapter._run.return_value = RunOutput(
+        output={"not": "a string"}, intermediate_outputs=None
+    )
+    with pytest.raises(RuntimeError, match="response is not a string"):
+        await cacheable_adapter.invoke("input")
+    assert response_cache.stats().entries == 0
+
+
+async def test_response_cache_not_cacheable(adapter, mock_provider, response_cache):
+    # Base adapters aren't cacheable unless they describe their request
+    adapter._model_provider = mock_provider
+    adapter._run = AsyncMock(
+        return_value=RunOutput(output="model output", intermediate_outputs=None)
+    )
+    await adapter.invoke("input")
+    await adapter.invoke("input")
+    assert adapter._run.await_count == 2
+    assert response_cache.stats().entries == 0
+
+
+async def test_response_cache_disabled(cacheable_adapter, tmp_path):
+    with patch.object(ResponseCache, "shared") as mock_shared:
+        await cacheable_adapter.invoke("input")
+        await cacheable_adapter.invoke("input")
+    assert cacheable_adapter._run.await_count == 2
+    mock_shared.assert_not_called()
+
+
+def test_base_response_cache_request(adapter, mock_provider):
+    adapter._model_provider = mock_provider
+    adapter.base_adapter_config.top_logprobs = 3
+    request = adapter.base_response_cache_request({"a": 1})
+    assert request["adapter"] == "test"
+    assert request["provider"] == "test_provider"
+    assert request["model"] == "test_model"
+    assert "test_instruction" in request["system_prompt"]
+    assert request["user_message"] == adapter.prompt_builder.build_user_message(
+        {"a": 1}
+    )
+    assert request["run_strategy"] == "basic"
+    assert request["top_logprobs"] == 3
+
+
+async def test_concurrent_identical_invokes_share_call(cacheable_adapter):
+    release = asyncio.Event()
+
+    async def run(input):
+        await release.wait()
+        return RunOutput(output="model output", intermediate_outputs=None)
+
+    cacheable_adapter._run = AsyncMock(side_effect=run)
+    with patch(
+        "kiln_ai.adapters.model_adapters.base_adapter.Config.shared"
+    ) as mock_shared:
+        mock_shared.return_value.coalesce_requests = True
+        mock_shared.return_value.response_cache = False
+        mock_shared.return_value.autosave_runs = False
+        mock_shared.return_value.user_id = "test_user"
+        mock_shared.return_value.provider_max_concurrency = None
+        tasks = [
+            asyncio.create_task(cacheable_adapter.invoke_returning_run_output("input"))
+            for _ in range(3)
+        ]
+        other = asyncio.create_task(cacheable_adapter.invoke("other input"))
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        await other
+
+    # One model call for the 3 identical requests, one for the other
+    assert cacheable_adapter._run.await_count == 2
+    # Each caller gets its own run, and its own copy of the output
+    runs = [run for run, _ in results]
+    assert all(run.output.output == "model output" for run in runs)
+    assert len({id(run) for run in runs}) == 3
+    assert len({id(run_output) for _, run_output in results}) == 3
+
+
+async def test_concurrent_invokes_not_shared_by_default(cacheable_adapter):
+    async def run(input):
+        await asyncio.sleep(0.01)
+        return RunOutput(output="model output", intermediate_outputs=None)
+
+    cacheable_adapter._run = AsyncMock(side_effect=run)
+    cacheable_adapter.response_cache_request = AsyncMock(return_value={"a": 1})
+    await asyncio.gather(
+        cacheable_adapter.invoke("input"), cacheable_adapter.invoke("input")
+    )
+    assert cacheable_adapter._run.await_count == 2
+    # Neither the response cache nor coalescing is on, so no request key is built
+    cacheable_adapter.response_cache_request.assert_not_called()
+
+
+async def test_concurrent_invokes_not_shared_when_disabled(cacheable_adapter):
+    async def run(input):
+        await asyncio.sleep(0.01)
+        return RunOutput(output="model output", intermediate_outputs=None)
+
+    cacheable_adapter._run = AsyncMock(side_effect=run)
+    with patch(
+        "kiln_ai.adapters.model_adapters.base_adapter.Config.shared"
+    ) as mock_shared:
+        mock_shared.return_value.coalesce_requests = False
+        mock_shared.return_value.response_cache = False
+        mock_shared.return_value.autosave_runs = False
+        mock_shared.return_value.user_id = "test_user"
+        mock_shared.return_value.provider_max_concurrency = None
+        await asyncio.gather(
+            cacheable_adapter.invoke("input"), cacheable_adapter.invoke("input")
+        )
+    assert cacheable_adapter._run.await_count == 2
@@ -341,3 +341,19 @@ async def test_langchain_model_from_provider_unsupported_providers(provider_name
     # Assert unsupported providers raise an error
     with pytest.raises(ValueError):
         await langchain_model_from_provider(provider, "test-model")
+
+
+async def test_response_cache_request(mock_adapter):
+    request = await mock_adapter.response_cache_request("input")
+    assert request["adapter"] == "kiln_langchain_adapter"
+    assert request["provider"] == "ollama"
+    assert request["model"] == "llama_3_1_8b"
+    assert request["provider_options"] == mock_adapter.model_provider().provider_options
+    assert request["structured_output_options"] == {"method": "json_schema"}
+
+
+async def test_response_cache_request_custom_model(tmp_path):
+    custom = ChatGroq(model="llama-3.1-8b-instant", groq_api_key="test")
+    adapter = LangchainAdapter(kiln_task=build_test_task(tmp_path), custom_model=custom)
+    # Can't know what a custom model sends, so not cacheable
+    assert await adapter.response_cache_request("input") is None
@@ -11,6 +11,7 @@ from kiln_ai.adapters.model_adapters.openai_compatible_config import (
 )
 from kiln_ai.adapters.model_adapters.openai_model_adapter import OpenAICompatibleAdapter
 from kiln_ai.datamodel import Project, Task
+from kiln_ai.utils.http_client import HttpClientPool
 
 
 @pytest.fixture
@@ -65,6 +66,15 @@ def test_initialization(config, mock_task):
     assert adapter.run_config.model_provider_name == config.provider_name
 
 
+def test_uses_shared_connection_pool(config, mock_task):
+    adapter = OpenAICompatibleAdapter(config=config, kiln_task=mock_task)
+    other = OpenAICompatibleAdapter(config=config, kiln_task=mock_task)
+
+    transport = HttpClientPool.shared().transport(config.base_url)
+    assert adapter.client._client._transport is transport
+    assert other.client._client._transport is transport
+
+
 def test_adapter_info(config, mock_task):
     adapter = OpenAICompatibleAdapter(config=config, kiln_task=mock_task)
 
@@ -214,3 +224,31 @@ def test_tool_call_params_strict(config, mock_task):
             "function": {"name": "task_response"},
         },
     }
+
+
+async def test_response_cache_request(config, mock_task):
+    adapter = OpenAICompatibleAdapter(
+        config=config,
+        kiln_task=mock_task,
+        prompt_id="simple_prompt_builder",
+    )
+    with patch.object(adapter, "model_provider") as mock_provider:
+        mock_provider.return_value = Mock(
+            structured_output_mode=StructuredOutputMode.json_mode,
+            provider_options={"model": "api-model-id"},
+            thinking_level=None,
+            require_openrouter_reasoning=False,
+            r1_openrouter_options=False,
+            logprobs_openrouter_options=False,
+            openrouter_skip_required_parameters=False,
+            reasoning_capable=False,
+        )
+        request = await adapter.response_cache_request({"test": "input"})
+
+    assert request["adapter"] == "kiln_openai_compatible_adapter"
+    assert request["base_url"] == "https://api.test.com"
+    assert request["api_model"] == "api-model-id"
+    assert request["response_format_options"] == {
+        "response_format": {"type": "json_object"}
+    }
+    assert "Test instruction" in request["system_prompt"]
@@ -166,6 +166,8 @@ async def test_autosave_false(test_task, adapter):
         mock_config = mock_shared.return_value
         mock_config.autosave_runs = False
         mock_config.user_id = "test_user"
+        mock_config.provider_max_concurrency = None
+        mock_config.response_cache = False
 
         input_data = "Test input"
 
@@ -184,6 +186,8 @@ async def test_autosave_true_with_disabled(test_task, adapter):
         mock_config = mock_shared.return_value
         mock_config.autosave_runs = True
         mock_config.user_id = "test_user"
+        mock_config.provider_max_concurrency = None
+        mock_config.response_cache = False
 
         input_data = "Test input"
 
@@ -203,6 +207,8 @@ async def test_autosave_true(test_task, adapter):
         mock_config = mock_shared.return_value
         mock_config.autosave_runs = True
         mock_config.user_id = "test_user"
+        mock_config.provider_max_concurrency = None
+        mock_config.response_cache = False
 
         input_data = "Test input"
 
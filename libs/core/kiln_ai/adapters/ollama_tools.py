@@ -1,11 +1,11 @@
 from typing import Any, List
 
 import httpx
-import requests
 from pydantic import BaseModel, Field
 
 from kiln_ai.adapters.ml_model_list import ModelProviderName, built_in_models
 from kiln_ai.utils.config import Config
+from kiln_ai.utils.http_client import HttpClientPool
 
 
 def ollama_base_url() -> str:
@@ -29,8 +29,10 @@ async def ollama_online() -> bool:
     Returns:
         True if Ollama is available and responding, False otherwise
     """
+    base_url = ollama_base_url()
     try:
-        httpx.get(ollama_base_url() + "/api/tags")
+        async with HttpClientPool.shared().async_client(base_url) as client:
+            await client.get("/api/tags")
     except httpx.RequestError:
         return False
     return True
@@ -101,8 +103,11 @@ async def get_ollama_connection() -> OllamaConnection | None:
     """
     Gets the connection status for Ollama.
     """
+    base_url = ollama_base_url()
     try:
-        tags = requests.get(ollama_base_url() + "/api/tags", timeout=5).json()
+        async with HttpClientPool.shared().async_client(base_url) as client:
+            response = await client.get("/api/tags", timeout=5)
+        tags = response.json()
 
     except Exception:
         return None
@@ -1,8 +1,10 @@
 import json
 from abc import ABCMeta, abstractmethod
-from typing import Dict
+from typing import Any, Dict, Tuple
 
+from kiln_ai.adapters.example_index import ExampleIndex
 from kiln_ai.datamodel import PromptGenerators, PromptId, Task, TaskRun
+from kiln_ai.datamodel.model_cache import ModelCache
 from kiln_ai.utils.exhaustive_error import raise_exhaustive_enum_error
 
 
@@ -19,6 +21,8 @@ class BasePromptBuilder(metaclass=ABCMeta):
             task (Task): The task containing instructions and requirements.
         """
         self.task = task
+        # include_json_instructions -> (prompt_cache_key, built prompt)
+        self._prompt_cache: Dict[bool, Tuple[Any, str]] = {}
 
     def prompt_id(self) -> str | None:
         """Returns the ID of the prompt, scoped to this builder.
@@ -31,9 +35,31 @@ class BasePromptBuilder(metaclass=ABCMeta):
     def build_prompt(self, include_json_instructions) -> str:
         """Build and return the complete prompt string.
 
+        The built prompt is reused until its prompt_cache_key changes.
+
         Returns:
             str: The constructed prompt.
         """
+        key = self.prompt_cache_key()
+        cached = self._prompt_cache.get(include_json_instructions)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        prompt = self.build_prompt_uncached(include_json_instructions)
+        self._prompt_cache[include_json_instructions] = (key, prompt)
+        return prompt
+
+    def prompt_cache_key(self) -> Any:
+        """Everything the built prompt depends on which can change: the parts of the task used to build it. Must be cheap, it's checked on every build.
+
+        Builders using more than the task's instruction, requirements and output schema should extend it.
+        """
+        return (
+            self.task.instruction,
+            tuple(requirement.instruction for requirement in self.task.requirements),
+            self.task.output_json_schema,
+        )
+
+    def build_prompt_uncached(self, include_json_instructions) -> str:
         prompt = self.build_base_prompt()
 
         if include_json_instructions and self.task.output_schema():
@@ -150,41 +176,19 @@ class MultiShotPromptBuilder(BasePromptBuilder):
 
         return base_prompt
 
+    def prompt_cache_key(self) -> Any:
+        # Examples come from the task's runs: rebuild when they change
+        return (super().prompt_cache_key(), runs_revision(self.task))
+
     def prompt_section_for_example(self, index: int, example: TaskRun) -> str:
         # Prefer repaired output if it exists, otherwise use the regular output
         output = example.repaired_output or example.output
         return f"## Example {index + 1}\n\nInput: {example.input}\nOutput: {output.output}\n\n"
 
     def collect_examples(self) -> list[TaskRun]:
-        valid_examples: list[TaskRun] = []
-        runs = self.task.runs(readonly=True)
-
-        # first pass, we look for repaired outputs. These are the best examples.
-        for run in runs:
-            if len(valid_examples) >= self.__class__.example_count():
-                break
-            if run.repaired_output is not None:
-                valid_examples.append(run)
-
-        # second pass, we look for high quality outputs (rating based)
-        # Minimum is "high_quality" (4 star in star rating scale), then sort by rating
-        # exclude repaired outputs as they were used above
-        runs_with_rating = [
-            run
-            for run in runs
-            if run.output.rating is not None
-            and run.output.rating.value is not None
-            and run.output.rating.is_high_quality()
-            and run.repaired_output is None
-        ]
-        runs_with_rating.sort(
-            key=lambda x: (x.output.rating and x.output.rating.value) or 0, reverse=True
-        )
-        for run in runs_with_rating:
-            if len(valid_examples) >= self.__class__.example_count():
-                break
-            valid_examples.append(run)
-        return valid_examples
+        # Repaired outputs are the best examples, then high quality outputs (rating based, minimum is "high_quality": 4 star in star rating scale) by rating.
+        # Picked from a maintained index of the task's runs, rather than loading and sorting them all.
+        return ExampleIndex.shared().examples(self.task, self.__class__.example_count())
 
 
 class FewShotPromptBuilder(MultiShotPromptBuilder):
@@ -222,6 +226,21 @@ class RepairsPromptBuilder(MultiShotPromptBuilder):
         return prompt_section
 
 
+def runs_revision(task: Task) -> Tuple[int, int] | None:
+    """A token which changes when the task's runs change: added, removed or edited. None if the task isn't saved (so it has no runs).
+
+    Edits by this process are counted by ModelCache. Runs added or removed by other processes change the runs folder's mtime.
+    """
+    if task.path is None:
+        return None
+    runs_folder = task.path.parent / TaskRun.relationship_name()
+    try:
+        mtime_ns = runs_folder.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = 0
+    return ModelCache.shared().revision(runs_folder), mtime_ns
+
+
 def chain_of_thought_prompt(task: Task) -> str:
     """Standard implementation to build and return the chain of thought prompt string.
 
@@ -0,0 +1,151 @@
+"""
+Process-wide rate limits for calls to model providers.
+
+Eval runs, data generation, repairs and interactive runs all call the same providers, and share the same provider quota. Without a shared budget, a large background job can use the whole quota, starving interactive calls or triggering provider rate limits (and in the worst case, bans).
+
+ - Limits are configured in the `provider_rate_limits` setting, keyed by provider ("openai") or provider and model ("openai/gpt_4o_mini"). A call must satisfy every limit which applies to it.
+ - Each limit can set requests_per_minute and/or tokens_per_minute.
+ - Each budget is a token bucket: it holds up to one minute of budget, and refills continuously.
+ - Callers reserve capacity up front and wait until their reservation is covered. Reservations are served in the order made, so a large job queueing many calls can't starve a call made after it: the new call waits behind the calls already reserved, not behind the whole job.
+ - Tokens are estimated before the call (we don't know the response length yet), from the prompt length.
+ - Thread safe and not tied to an event loop, so one shared limiter serves the whole process.
+
+Providers with no configured limit aren't limited, and cost nothing.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from kiln_ai.utils.config import Config
+
+# Rough average for English text with common tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+class TokenBucket:
+    """A token bucket allowing `per_minute` units per minute, with bursts of up to one minute's budget.
+
+    Reservations can drive the level negative: the reserving caller waits until the bucket refills back to zero. This keeps reservations first come, first served.
+    """
+
+    def __init__(self, per_minute: float):
+        if per_minute <= 0:
+            raise ValueError("Rate limit must be greater than 0")
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated:
+            return
+        self._level = min(
+            self.capacity, self._level + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Reserve amount units. Returns the seconds until the reservation is covered (0 if available now). Caller must hold the limiter lock."""
+        self._refill(now)
+        self._level -= amount
+        if self._level >= 0:
+            return 0.0
+        return -self._level / self.rate
+
+    def refund(self, amount: float, now: float) -> None:
+        """Return a reservation which was never used (eg, the caller was cancelled while waiting)."""
+        self._refill(now)
+        self._level = min(self.capacity, self._level + amount)
+
+
+class ProviderRateLimiter:
+    """Requests per minute and tokens per minute budgets, shared by all calls to a provider/model in this process."""
+
+    _shared_instance = None
+
+    def __init__(self, limits: Dict[str, Dict[str, Any]] | None = None):
+        # If limits aren't passed, read from the provider_rate_limits setting on each call, so changes apply without a restart
+        self._limits = limits
+        # (limit key, "requests" or "tokens") -> bucket
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+        return cls._shared_instance
+
+    def limits(self) -> Dict[str, Dict[str, Any]]:
+        if self._limits is not None:
+            return self._limits
+        return Config.shared().provider_rate_limits
+
+    def is_limited(self, provider: str, model: str) -> bool:
+        limits = self.limits()
+        return provider in limits or f"{provider}/{model}" in limits
+
+    async def acquire(
+        self, provider: str, model: str, tokens: int = 0, requests: int = 1
+    ) -> None:
+        """Wait until the provider/model budgets allow a call of `requests` requests using `tokens` tokens, and use that budget."""
+        reservations = self._reserve(provider, model, tokens, requests)
+        if not reservations:
+            return
+        wait, reserved = reservations
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._refund(reserved)
+            raise
+
+    def _reserve(
+        self, provider: str, model: str, tokens: int, requests: int
+    ) -> Tuple[float, List[Tuple[TokenBucket, float]]] | None:
+        limits = self.limits()
+        keys = [key for key in (provider, f"{provider}/{model}") if key in limits]
+        if not keys:
+            return None
+
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            reserved: List[Tuple[TokenBucket, float]] = []
+            for key in keys:
+                limit = limits[key] or {}
+                for kind, amount in (
+                    ("requests", requests),
+                    ("tokens", tokens),
+                ):
+                    per_minute = limit.get(f"{kind}_per_minute")
+                    if not per_minute or amount <= 0:
+                        continue
+                    bucket = self._bucket(key, kind, per_minute)
+                    wait = max(wait, bucket.reserve(amount, now))
+                    reserved.append((bucket, amount))
+            return wait, reserved
+
+    def _bucket(self, key: str, kind: str, per_minute: float) -> TokenBucket:
+        # Caller must hold the lock
+        bucket = self._buckets.get((key, kind))
+        if bucket is None or bucket.per_minute != per_minute:
+            # New, or the limit was changed
+            bucket = TokenBucket(per_minute)
+            self._buckets[(key, kind)] = bucket
+        return bucket
+
+    def _refund(self, reserved: List[Tuple[TokenBucket, float]]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            for bucket, amount in reserved:
+                bucket.refund(amount, now)
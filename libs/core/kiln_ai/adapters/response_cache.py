@@ -0,0 +1,217 @@
+"""
+An opt-in, on-disk cache of model responses.
+
+Re-running an eval after changing only the scoring logic, or regenerating a data gen preview, repeats the exact same model requests. With the `response_cache` setting enabled, adapters check this cache before calling the provider (and before waiting for a call slot or rate limit budget).
+
+ - Content addressed: keyed by a hash of the fully built request (adapter, provider, model, prompts and messages, structured output options, logprobs settings, etc). Any change to the request is a different key. See BaseAdapter.response_cache_request.
+ - Caches the result of a whole run (RunOutput), including two-call chain of thought.
+ - Only responses which parse and validate are cached.
+ - Stored in a sqlite file in the Kiln settings directory, shared by all projects.
+ - Least recently used entries are evicted once the cache exceeds `response_cache_max_bytes`.
+ - Hit/miss counts (since process start) and size are available from stats().
+
+Responses are cached, not sampled: with the cache on, repeating a request returns the same output, even at temperature > 0. Leave it off when you want fresh samples.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+from openai.types.chat.chat_completion import ChoiceLogprobs
+
+from kiln_ai.adapters.run_output import RunOutput
+from kiln_ai.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "response_cache.sqlite"
+# Bump to invalidate every cached response (eg, if the cached format changes)
+CACHE_VERSION = 1
+
+
+@dataclass
+class ResponseCacheStats:
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+
+
+class ResponseCache:
+    _shared_instance = None
+
+    def __init__(self, path: Path, max_bytes: int | None = None):
+        self.path = path
+        # If not passed, read from the response_cache_max_bytes setting
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Total size of cached values, loaded on first write
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = cls(Path(Config.settings_dir()) / CACHE_FILENAME)
+        return cls._shared_instance
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return Config.shared().response_cache
+
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return Config.shared().response_cache_max_bytes
+
+    @staticmethod
+    def key(request: Dict[str, Any]) -> str:
+        """A stable hash of a request. Request values must be JSON serializable (anything else is serialized by str())."""
+        canonical = json.dumps(
+            {"version": CACHE_VERSION, "request": request},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        try:
+            with closing(self._connect()) as connection, connection:
+                row = connection.execute(
+                    "SELECT value FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE responses SET last_used = ? WHERE key = ?",
+                        (time.time(), key),
+                    )
+        except sqlite3.Error as e:
+            # A cache, never a reason to fail a run
+            logger.warning(f"Response cache unavailable: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        try:
+            with closing(self._connect()) as connection, connection:
+                existing = connection.execute(
+                    "SELECT size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time()),
+                )
+                with self._lock:
+                    if self._size is None:
+                        self._size = self._stored_size(connection)
+                    else:
+                        self._size += size - (existing[0] if existing else 0)
+                    over_limit = self._size > self.max_bytes()
+                if over_limit:
+                    self._evict(connection)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache unavailable: {e}")
+
+    async def get_async(self, key: str) -> str | None:
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    def stats(self) -> ResponseCacheStats:
+        entries, size = 0, 0
+        if self.path.exists():
+            try:
+                with closing(self._connect()) as connection:
+                    entries, size = connection.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache unavailable: {e}")
+        with self._lock:
+            return ResponseCacheStats(
+                hits=self.hits, misses=self.misses, entries=entries, size_bytes=size
+            )
+
+    def clear(self) -> None:
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM responses")
+        with self._lock:
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        return connection
+
+    def _stored_size(self, connection: sqlite3.Connection) -> int:
+        return connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        # Evict least recently used down to 90% of the limit, so we aren't evicting on every write
+        target = int(self.max_bytes() * 0.9)
+        size = self._stored_size(connection)
+        removed = []
+        for key, entry_size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ).fetchall():
+            if size <= target:
+                break
+            removed.append((key,))
+            size -= entry_size
+        connection.executemany("DELETE FROM responses WHERE key = ?", removed)
+        with self._lock:
+            self._size = size
+
+
+def run_output_to_json(run_output: RunOutput) -> str:
+    return json.dumps(
+        {
+            "output": run_output.output,
+            "intermediate_outputs": run_output.intermediate_outputs,
+            "output_logprobs": run_output.output_logprobs.model_dump(mode="json")
+            if run_output.output_logprobs is not None
+            else None,
+        },
+        ensure_ascii=False,
+    )
+
+
+def run_output_from_json(data: str) -> RunOutput:
+    parsed = json.loads(data)
+    logprobs = parsed.get("output_logprobs")
+    return RunOutput(
+        output=parsed["output"],
+        intermediate_outputs=parsed.get("intermediate_outputs"),
+        output_logprobs=ChoiceLogprobs.model_validate(logprobs)
+        if logprobs is not None
+        else None,
+    )
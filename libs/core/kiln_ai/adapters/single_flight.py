@@ -0,0 +1,78 @@
+"""
+Coalescing of concurrent identical calls ("single flight").
+
+When several callers make the same request at the same moment (parallel eval workers over a duplicated dataset item, a preview regenerated from two tabs), only the first actually runs it. The rest wait for, and share, its result or error.
+
+ - Only calls in flight at the same time are coalesced. Once a call completes, the next identical call runs again (see ResponseCache to reuse completed calls).
+ - The shared call keeps running while anyone is waiting for it: cancelling the first caller doesn't fail the others. It's cancelled once every caller has cancelled.
+ - Calls are coalesced per event loop.
+ - The shared call runs at the highest priority of the callers waiting for it (see SharedCallPriority), not just the first caller's.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, Tuple, TypeVar
+
+from kiln_ai.adapters.call_scheduler import (
+    SharedCallPriority,
+    current_call_context,
+    shared_call_priority,
+)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    task: asyncio.Task[T]
+    priority: SharedCallPriority
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self):
+        # (event loop id, key) -> call in flight
+        self._calls: Dict[Tuple[int, str], _Call[T]] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run fn, unless a call with the same key is already in flight, in which case wait for its result.
+
+        Returns:
+            The result, and True if it was shared from another caller's call
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        call = self._calls.get(call_key)
+        shared = call is not None
+        if call is None:
+            priority = SharedCallPriority(current_call_context())
+            # The task copies the context, so its model calls use the shared priority
+            with shared_call_priority(priority):
+                task = loop.create_task(_await(fn))
+            call = _Call(task=task, priority=priority)
+            self._calls[call_key] = call
+            call.task.add_done_callback(lambda _: self._forget(call_key, call))
+        else:
+            call.priority.join(current_call_context())
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if not call.task.done() and call.waiters == 1:
+                # Last one waiting: nobody wants the result
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, call_key: Tuple[int, str], call: _Call[T]) -> None:
+        if self._calls.get(call_key) is call:
+            del self._calls[call_key]
+
+
+async def _await(fn: Callable[[], Awaitable[T]]) -> T:
+    return await fn()
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from kiln_ai.adapters.adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+    ProviderConcurrency,
+    is_rate_limit_error,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"Error {status_code}")
+        self.status_code = status_code
+
+
+class FakeResponse:
+    status_code = 429
+
+
+class ResponseError(Exception):
+    response = FakeResponse()
+
+
+class RateLimitError(Exception):
+    pass
+
+
+@pytest.mark.parametrize(
+    "error,expected",
+    [
+        (StatusError(429), True),
+        (StatusError(500), False),
+        (ResponseError("error"), True),
+        (RateLimitError("error"), True),
+        (ValueError("Rate limit reached for requests"), True),
+        (ValueError("429 Too Many Requests"), True),
+        (ValueError("Something else"), False),
+    ],
+)
+def test_is_rate_limit_error(error, expected):
+    assert is_rate_limit_error(error) is expected
+
+
+def test_is_rate_limit_error_cause():
+    try:
+        try:
+            raise StatusError(429)
+        except StatusError as e:
+            raise ValueError("Wrapped") from e
+    except ValueError as wrapped:
+        assert is_rate_limit_error(wrapped)
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(min_limit=0)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(min_limit=5, max_limit=4)
+
+
+def test_initial_limit_clamped():
+    assert AdaptiveConcurrencyLimiter(initial_limit=100, max_limit=10).limit == 10
+    assert AdaptiveConcurrencyLimiter(initial_limit=0, min_limit=2).limit == 2
+
+
+def test_slow_start_then_additive_increase():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=100, cooldown=0)
+    for _ in range(4):
+        limiter.record_success(1.0)
+    # Slow start: +1 per success
+    assert limiter.limit == 6
+
+    limiter.record_rate_limit()
+    assert limiter.limit == 3
+    # Additive: about +1 per limit's worth of successes
+    for _ in range(3):
+        limiter.record_success(1.0)
+    assert limiter.limit == 3
+    limiter.record_success(1.0)
+    assert limiter.limit == 4
+
+
+def test_limit_bounds():
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=2, min_limit=2, max_limit=3, cooldown=0
+    )
+    for _ in range(10):
+        limiter.record_success(1.0)
+    assert limiter.limit == 3
+    for _ in range(10):
+        limiter.record_rate_limit()
+    assert limiter.limit == 2
+    assert limiter.rate_limits == 10
+    assert limiter.successes == 10
+
+
+def test_rate_limit_cooldown():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, cooldown=60)
+    limiter.record_rate_limit()
+    limiter.record_rate_limit()
+    limiter.record_rate_limit()
+    # Errors from the same window only count once
+    assert limiter.limit == 8
+
+
+def test_high_latency_decreases():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, cooldown=0)
+    limiter.record_success(1.0)
+    assert limiter.limit == 11
+    limiter.record_success(5.0)
+    assert limiter.limit == 9
+
+
+@pytest.mark.asyncio
+async def test_acquire_respects_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+    running = 0
+    max_running = 0
+
+    async def work():
+        nonlocal running, max_running
+        async with limiter.slot():
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(work() for _ in range(10)))
+    assert max_running == 2
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_provider_concurrency_slots():
+    concurrency = ProviderConcurrency(initial_limit=1, max_limit=4)
+    order = []
+
+    async def work(name, providers):
+        async with concurrency.slots(providers):
+            order.append(f"start {name}")
+            await asyncio.sleep(0.01)
+            order.append(f"end {name}")
+
+    # Both need openai, so they can't overlap. Opposite orders don't deadlock.
+    await asyncio.gather(
+        work("a", ["openai", "groq"]),
+        work("b", ["groq", "openai"]),
+    )
+    assert order in (
+        ["start a", "end a", "start b", "end b"],
+        ["start b", "end b", "start a", "end a"],
+    )
+    assert concurrency.limits() == {"groq": 1, "openai": 1}
+
+    concurrency.record_success(["openai"], 1.0)
+    concurrency.record_rate_limit(["groq"])
+    assert concurrency.limits() == {"groq": 1, "openai": 2}
@@ -0,0 +1,304 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from kiln_ai.adapters.call_scheduler import (
+    CallPriority,
+    CallScheduler,
+    call_priority,
+    current_call_context,
+)
+from kiln_ai.adapters.single_flight import SingleFlight
+
+
+async def settle():
+    # Let granted waiters wake and run
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def hold(scheduler, provider, order, name, release_event):
+    async with scheduler.slot(provider):
+        order.append(name)
+        await release_event.wait()
+
+
+def test_call_priority_context():
+    assert current_call_context().priority == CallPriority.interactive
+    with call_priority(CallPriority.eval, group="run_1", weight=2.0) as context:
+        assert current_call_context() is context
+        assert context.priority == CallPriority.eval
+        assert context.group == "run_1"
+        assert context.weight == 2.0
+    assert current_call_context().priority == CallPriority.interactive
+
+
+def test_call_priority_invalid_weight():
+    with pytest.raises(ValueError, match="Weight must be greater than 0"):
+        with call_priority(CallPriority.eval, weight=0):
+            pass
+
+
+async def test_call_priority_inherited_by_tasks():
+    async def priority():
+        return current_call_context().priority
+
+    with call_priority(CallPriority.batch):
+        task = asyncio.create_task(priority())
+    assert await task == CallPriority.batch
+
+
+def test_max_concurrency_from_config():
+    with patch("kiln_ai.adapters.call_scheduler.Config.shared") as mock_shared:
+        mock_shared.return_value.provider_max_concurrency = 5
+        assert CallScheduler().max_concurrency() == 5
+
+    # Unset by default: no limit
+    assert CallScheduler().max_concurrency() is None
+    assert CallScheduler(max_concurrency=2).max_concurrency() == 2
+
+
+async def test_slot_unlimited_by_default():
+    scheduler = CallScheduler()
+    order = []
+    done = asyncio.Event()
+    tasks = [
+        asyncio.create_task(hold(scheduler, "openai", order, i, done))
+        for i in range(50)
+    ]
+    await settle()
+    assert order == list(range(50))
+    assert scheduler.active("openai") == 50
+    assert scheduler.waiting("openai") == 0
+
+    done.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.active("openai") == 0
+
+
+async def test_slot_limits_concurrency():
+    scheduler = CallScheduler(max_concurrency=2)
+    order = []
+    done = asyncio.Event()
+    tasks = [
+        asyncio.create_task(hold(scheduler, "openai", order, i, done)) for i in range(4)
+    ]
+    await settle()
+    assert order == [0, 1]
+    assert scheduler.active("openai") == 2
+    assert scheduler.waiting("openai") == 2
+
+    # Other providers have their own slots
+    async with scheduler.slot("groq"):
+        assert scheduler.active("groq") == 1
+
+    done.set()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2, 3]
+    assert scheduler.active("openai") == 0
+    assert scheduler.waiting("openai") == 0
+
+
+async def test_slot_priority_order():
+    scheduler = CallScheduler(max_concurrency=1)
+    order = []
+    blocker_done = asyncio.Event()
+    done = asyncio.Event()
+    done.set()
+
+    blocker = asyncio.create_task(
+        hold(scheduler, "openai", order, "blocker", blocker_done)
+    )
+    await settle()
+
+    tasks = []
+    for name, priority in [
+        ("batch", CallPriority.batch),
+        ("eval_1", CallPriority.eval),
+        ("data_gen", CallPriority.data_gen),
+        ("eval_2", CallPriority.eval),
+        ("interactive", CallPriority.interactive),
+    ]:
+        with call_priority(priority):
+            tasks.append(
+                asyncio.create_task(hold(scheduler, "openai", order, name, done))
+            )
+        await settle()
+
+    blocker_done.set()
+    await asyncio.gather(blocker, *tasks)
+    # Interactive jumps the queue. FIFO within a priority.
+    assert order == ["blocker", "interactive", "eval_1", "eval_2", "data_gen", "batch"]
+
+
+async def test_shared_call_runs_at_highest_caller_priority():
+    scheduler = CallScheduler(max_concurrency=1)
+    single_flight = SingleFlight()
+    order = []
+    blocker_done = asyncio.Event()
+    done = asyncio.Event()
+    done.set()
+    blocker = asyncio.create_task(
+        hold(scheduler, "openai", order, "blocker", blocker_done)
+    )
+    await settle()
+
+    with call_priority(CallPriority.batch):
+        first = asyncio.create_task(
+            single_flight.do(
+                "key", lambda: hold(scheduler, "openai", order, "shared", done)
+            )
+        )
+    await settle()
+    with call_priority(CallPriority.eval):
+        eval_call = asyncio.create_task(hold(scheduler, "openai", order, "eval", done))
+    await settle()
+    # An interactive caller joins the shared call, already queued at batch priority
+    with call_priority(CallPriority.interactive):
+        joined = asyncio.create_task(single_flight.do("key", lambda: None))
+    await settle()
+
+    blocker_done.set()
+    await asyncio.gather(blocker, first, eval_call, joined)
+    assert order == ["blocker", "shared", "eval"]
+    assert scheduler.waiting("openai") == 0
+
+
+async def test_shared_call_priority_not_lowered():
+    scheduler = CallScheduler(max_concurrency=1)
+    single_flight = SingleFlight()
+    order = []
+    blocker_done = asyncio.Event()
+    done = asyncio.Event()
+    done.set()
+    blocker = asyncio.create_task(
+        hold(scheduler, "openai", order, "blocker", blocker_done)
+    )
+    await settle()
+
+    with call_priority(CallPriority.eval):
+        first = asyncio.create_task(
+            single_flight.do(
+                "key", lambda: hold(scheduler, "openai", order, "shared", done)
+            )
+        )
+        await settle()
+        eval_call = asyncio.create_task(hold(scheduler, "openai", order, "eval", done))
+    await settle()
+    # A batch caller joining doesn't move the shared call behind the eval call
+    with call_priority(CallPriority.batch):
+        joined = asyncio.create_task(single_flight.do("key", lambda: None))
+    await settle()
+
+    blocker_done.set()
+    await asyncio.gather(blocker, first, eval_call, joined)
+    assert order == ["blocker", "shared", "eval"]
+
+
+async def test_slot_fair_between_groups():
+    scheduler = CallScheduler(max_concurrency=1)
+    order = []
+    blocker_done = asyncio.Event()
+    done = asyncio.Event()
+    done.set()
+    blocker = asyncio.create_task(
+        hold(scheduler, "openai", order, "blocker", blocker_done)
+    )
+    await settle()
+
+    # Run A queues all its jobs before run B queues any
+    tasks = []
+    for group, count in [("a", 4), ("b", 2)]:
+        with call_priority(CallPriority.eval, group=group):
+            for i in range(count):
+                tasks.append(
+                    asyncio.create_task(
+                        hold(scheduler, "openai", order, f"{group}{i}", done)
+                    )
+                )
+        await settle()
+
+    blocker_done.set()
+    await asyncio.gather(blocker, *tasks)
+    # Alternates between runs, rather than running all of A first
+    assert order == ["blocker", "a0", "b0", "a1", "b1", "a2", "a3"]
+
+
+async def test_slot_weighted_groups():
+    scheduler = CallScheduler(max_concurrency=1)
+    order = []
+    blocker_done = asyncio.Event()
+    done = asyncio.Event()
+    done.set()
+    blocker = asyncio.create_task(
+        hold(scheduler, "openai", order, "blocker", blocker_done)
+    )
+    await settle()
+
+    tasks = []
+    for group, weight in [("heavy", 2.0), ("light", 1.0)]:
+        with call_priority(CallPriority.eval, group=group, weight=weight):
+            for i in range(4):
+                tasks.append(
+                    asyncio.create_task(hold(scheduler, "openai", order, group, done))
+                )
+        await settle()
+
+    blocker_done.set()
+    await asyncio.gather(blocker, *tasks)
+    # Heavy gets twice the share while both are waiting
+    assert order[1:7].count("heavy") == 4
+    assert order[1:7].count("light") == 2
+
+
+async def test_cancelled_waiter_removed():
+    scheduler = CallScheduler(max_concurrency=1)
+    order = []
+    blocker_done = asyncio.Event()
+    done = asyncio.Event()
+    done.set()
+    blocker = asyncio.create_task(
+        hold(scheduler, "openai", order, "blocker", blocker_done)
+    )
+    await settle()
+
+    cancelled = asyncio.create_task(hold(scheduler, "openai", order, "cancelled", done))
+    waiting = asyncio.create_task(hold(scheduler, "openai", order, "waiting", done))
+    await settle()
+    assert scheduler.waiting("openai") == 2
+
+    cancelled.cancel()
+    await settle()
+    assert scheduler.waiting("openai") == 1
+
+    blocker_done.set()
+    await asyncio.gather(blocker, waiting)
+    assert order == ["blocker", "waiting"]
+    assert scheduler.active("openai") == 0
+
+
+async def test_cancelled_after_grant_passes_slot_on():
+    scheduler = CallScheduler(max_concurrency=1)
+    order = []
+    done = asyncio.Event()
+    done.set()
+    await scheduler.acquire("openai")
+
+    cancelled = asyncio.create_task(hold(scheduler, "openai", order, "cancelled", done))
+    waiting = asyncio.create_task(hold(scheduler, "openai", order, "waiting", done))
+    await settle()
+
+    # Grant to the first waiter, and cancel it before it wakes
+    scheduler.release("openai")
+    cancelled.cancel()
+    await asyncio.gather(waiting)
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    assert order == ["waiting"]
+    assert scheduler.active("openai") == 0
+
+
+def test_shared():
+    assert CallScheduler.shared() is CallScheduler.shared()
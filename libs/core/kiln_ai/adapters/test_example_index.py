@@ -0,0 +1,192 @@
+from unittest.mock import patch
+
+import pytest
+
+from kiln_ai.adapters.example_index import (
+    ExampleIndex,
+    example_summary,
+    example_summary_index,
+)
+from kiln_ai.datamodel import (
+    DataSource,
+    DataSourceType,
+    Project,
+    Task,
+    TaskOutput,
+    TaskOutputRating,
+    TaskRun,
+)
+from kiln_ai.datamodel.basemodel import write_file_atomic
+from kiln_ai.datamodel.model_cache import ModelCache
+
+
+@pytest.fixture
+def task(tmp_path):
+    project = Project(name="Test Project", path=tmp_path / "project.kiln")
+    project.save_to_file()
+    task = Task(name="Test Task", instruction="Tell a joke", parent=project)
+    task.save_to_file()
+    return task
+
+
+def make_run(task, name, rating=None, repaired=False, save=True):
+    source = DataSource(type=DataSourceType.human, properties={"created_by": "jo"})
+    run = TaskRun(
+        input=f"input {name}",
+        input_source=source,
+        parent=task,
+        output=TaskOutput(
+            output=name,
+            source=source,
+            rating=TaskOutputRating(value=rating) if rating is not None else None,
+        ),
+        repair_instructions="Fix it" if repaired else None,
+        repaired_output=TaskOutput(output=f"repaired {name}", source=source)
+        if repaired
+        else None,
+    )
+    if save:
+        run.save_to_file()
+    return run
+
+
+def example_names(task, count):
+    return [run.output.output for run in ExampleIndex().examples(task, count)]
+
+
+def test_example_summary(task):
+    assert example_summary(make_run(task, "a", save=False)) == {
+        "repaired": False,
+        "rating": None,
+    }
+    assert example_summary(make_run(task, "b", rating=3, save=False)) == {
+        "repaired": False,
+        "rating": None,
+    }
+    assert example_summary(make_run(task, "c", rating=4, save=False)) == {
+        "repaired": False,
+        "rating": 4.0,
+    }
+    assert example_summary(make_run(task, "d", repaired=True, save=False)) == {
+        "repaired": True,
+        "rating": None,
+    }
+
+
+def test_examples_order(task):
+    make_run(task, "unrated")
+    make_run(task, "low", rating=2)
+    make_run(task, "good", rating=4)
+    make_run(task, "best", rating=5)
+    make_run(task, "repaired", rating=5, repaired=True)
+
+    # Repaired first, then by rating. Unrated and low rated runs are never examples.
+    assert example_names(task, 10) == ["repaired", "best", "good"]
+    assert example_names(task, 2) == ["repaired", "best"]
+    assert example_names(task, 0) == []
+
+
+def test_examples_ties_in_run_folder_order(task):
+    for name in ["a", "b", "c", "d"]:
+        make_run(task, name, rating=5)
+    for name in ["r1", "r2"]:
+        make_run(task, name, repaired=True)
+
+    runs = sorted(task.runs(readonly=True), key=lambda run: run.path.parent.name)
+    run_order = [run.output.output for run in runs]
+    examples = example_names(task, 10)
+    assert examples[:2] == [name for name in run_order if name.startswith("r")]
+    assert examples[2:] == [name for name in run_order if not name.startswith("r")]
+
+
+def test_unsaved_task():
+    task = Task(name="Test Task", instruction="Tell a joke")
+    assert ExampleIndex().examples(task, 4) == []
+
+
+def test_updated_incrementally(task):
+    index = ExampleIndex()
+    make_run(task, "good", rating=4)
+    low = make_run(task, "low", rating=2)
+    assert [run.output.output for run in index.examples(task, 4)] == ["good"]
+
+    with (
+        patch.object(
+            example_summary_index,
+            "summaries_with_paths",
+            wraps=example_summary_index.summaries_with_paths,
+        ) as summaries_with_paths,
+        patch.object(
+            TaskRun, "load_from_file", wraps=TaskRun.load_from_file
+        ) as load_from_file,
+    ):
+        # Unchanged: nothing loaded but the examples
+        assert len(index.examples(task, 4)) == 1
+        assert load_from_file.call_count == 1
+
+        # New run
+        make_run(task, "best", rating=5)
+        assert [run.output.output for run in index.examples(task, 4)] == [
+            "best",
+            "good",
+        ]
+
+        # Rating edited. Keeps its place in run order, ahead of the newer run on a tie.
+        low.output.rating = TaskOutputRating(value=5)
+        low.save_to_file()
+        assert [run.output.output for run in index.examples(task, 4)] == [
+            "low",
+            "best",
+            "good",
+        ]
+
+        # Deleted
+        low.delete()
+        assert [run.output.output for run in index.examples(task, 4)] == [
+            "best",
+            "good",
+        ]
+
+        summaries_with_paths.assert_not_called()
+
+
+def test_rebuilt_on_external_changes(task):
+    index = ExampleIndex()
+    make_run(task, "good", rating=4)
+    assert len(index.examples(task, 4)) == 1
+
+    # Another process adds a run: written without going through this process's datamodel
+    run = make_run(task, "external", rating=5, save=False)
+    path = run.build_path()
+    path.parent.mkdir(parents=True)
+    write_file_atomic(path, run.model_dump_json(exclude={"path"}))
+
+    assert [run.output.output for run in index.examples(task, 4)] == [
+        "external",
+        "good",
+    ]
+
+
+def test_rebuilt_when_changes_unknown(task):
+    index = ExampleIndex()
+    make_run(task, "good", rating=4)
+    assert len(index.examples(task, 4)) == 1
+
+    make_run(task, "best", rating=5)
+    with (
+        patch.object(ModelCache.shared(), "changes_since", return_value=None),
+        patch.object(
+            example_summary_index,
+            "summaries_with_paths",
+            wraps=example_summary_index.summaries_with_paths,
+        ) as summaries_with_paths,
+    ):
+        assert [run.output.output for run in index.examples(task, 4)] == [
+            "best",
+            "good",
+        ]
+    summaries_with_paths.assert_called_once()
+
+
+def test_shared():
+    assert ExampleIndex.shared() is ExampleIndex.shared()
@@ -1,5 +1,6 @@
 import json
 import logging
+from unittest.mock import patch
 
 import pytest
 
@@ -224,6 +225,66 @@ def test_multi_shot_prompt_builder(task_with_examples):
     )
 
 
+def test_built_prompt_cached_until_runs_change(task_with_examples):
+    task = task_with_examples
+    prompt_builder = MultiShotPromptBuilder(task=task)
+    prompt = prompt_builder.build_prompt(include_json_instructions=False)
+
+    with patch.object(
+        MultiShotPromptBuilder,
+        "collect_examples",
+        wraps=prompt_builder.collect_examples,
+    ) as collect_examples:
+        # Unchanged: reused
+        assert prompt_builder.build_prompt(include_json_instructions=False) == prompt
+        collect_examples.assert_not_called()
+
+        # Cached separately with JSON instructions
+        with_json = prompt_builder.build_prompt(include_json_instructions=True)
+        assert "# Format Instructions" in with_json
+        assert collect_examples.call_count == 1
+        prompt_builder.build_prompt(include_json_instructions=True)
+        assert collect_examples.call_count == 1
+
+        # Editing a run's rating rebuilds
+        run = next(run for run in task.runs() if "Why did the dog" in run.output.output)
+        run.output.rating = TaskOutputRating(value=1)
+        run.save_to_file()
+        prompt = prompt_builder.build_prompt(include_json_instructions=False)
+        assert collect_examples.call_count == 2
+        assert "Why did the dog" not in prompt
+
+        # Deleting a run rebuilds
+        run.delete()
+        prompt_builder.build_prompt(include_json_instructions=False)
+        assert collect_examples.call_count == 3
+
+
+def test_built_prompt_cached_until_task_changes(tmp_path):
+    task = build_test_task(tmp_path)
+    prompt_builder = SimplePromptBuilder(task=task)
+    prompt = prompt_builder.build_prompt(include_json_instructions=False)
+    assert task.instruction in prompt
+
+    with patch.object(
+        SimplePromptBuilder,
+        "build_base_prompt",
+        wraps=prompt_builder.build_base_prompt,
+    ) as build_base_prompt:
+        assert prompt_builder.build_prompt(include_json_instructions=False) == prompt
+        build_base_prompt.assert_not_called()
+
+        task.instruction = "A new instruction"
+        assert "A new instruction" in prompt_builder.build_prompt(
+            include_json_instructions=False
+        )
+        task.requirements[0].instruction = "A new requirement"
+        assert "A new requirement" in prompt_builder.build_prompt(
+            include_json_instructions=False
+        )
+        assert build_base_prompt.call_count == 2
+
+
 # Add a new test for the FewShotPromptBuilder
 def test_few_shot_prompt_builder(tmp_path):
     # Create a project and task hierarchy (similar to test_multi_shot_prompt_builder)
@@ -0,0 +1,168 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from kiln_ai.adapters.rate_limiter import (
+    ProviderRateLimiter,
+    TokenBucket,
+    estimate_tokens,
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+    assert estimate_tokens("a" * 400) == 100
+
+
+def test_token_bucket_invalid_limit():
+    with pytest.raises(ValueError, match="greater than 0"):
+        TokenBucket(0)
+
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket(60)  # 1 per second
+    now = bucket._updated
+
+    # A full minute of budget is available up front
+    for _ in range(60):
+        assert bucket.reserve(1, now) == 0
+    # Then each reservation waits behind the ones before it
+    assert bucket.reserve(1, now) == pytest.approx(1.0)
+    assert bucket.reserve(1, now) == pytest.approx(2.0)
+
+    # Refills over time: 10s later, the 2 over budget are covered with 8 to spare
+    assert bucket.reserve(8, now + 10) == 0
+    assert bucket.reserve(1, now + 10) == pytest.approx(1.0)
+
+
+def test_token_bucket_refill_capped():
+    bucket = TokenBucket(60)
+    now = bucket._updated
+    bucket.reserve(30, now)
+    # Long idle doesn't bank more than one minute of budget
+    assert bucket.reserve(60, now + 1000) == 0
+    assert bucket.reserve(1, now + 1000) == pytest.approx(1.0)
+
+
+def test_token_bucket_refund():
+    bucket = TokenBucket(60)
+    now = bucket._updated
+    bucket.reserve(60, now)
+    assert bucket.reserve(10, now) == pytest.approx(10.0)
+    bucket.refund(10, now)
+    assert bucket.reserve(1, now) == pytest.approx(1.0)
+
+
+async def test_acquire_unlimited_provider():
+    limiter = ProviderRateLimiter({"openai": {"requests_per_minute": 1}})
+    assert not limiter.is_limited("groq", "llama")
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        for _ in range(10):
+            await limiter.acquire("groq", "llama", tokens=1000)
+    mock_sleep.assert_not_called()
+    assert limiter._buckets == {}
+
+
+async def test_acquire_requests_per_minute():
+    limiter = ProviderRateLimiter({"openai": {"requests_per_minute": 2}})
+    assert limiter.is_limited("openai", "gpt_4o")
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await limiter.acquire("openai", "gpt_4o")
+        await limiter.acquire("openai", "gpt_4o_mini")
+        mock_sleep.assert_not_called()
+
+        # Provider wide limit, shared across models
+        await limiter.acquire("openai", "gpt_4o")
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args[0][0] == pytest.approx(30.0, abs=0.1)
+
+
+async def test_acquire_tokens_per_minute():
+    limiter = ProviderRateLimiter({"openai": {"tokens_per_minute": 1000}})
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await limiter.acquire("openai", "gpt_4o", tokens=900)
+        mock_sleep.assert_not_called()
+        await limiter.acquire("openai", "gpt_4o", tokens=600)
+        # 500 tokens over budget, at 1000/min
+        assert mock_sleep.call_args[0][0] == pytest.approx(30.0, abs=0.1)
+
+
+async def test_acquire_model_limit():
+    limiter = ProviderRateLimiter(
+        {
+            "openai": {"requests_per_minute": 100},
+            "openai/gpt_4o": {"requests_per_minute": 1},
+        }
+    )
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        await limiter.acquire("openai", "gpt_4o")
+        await limiter.acquire("openai", "gpt_4o_mini")
+        mock_sleep.assert_not_called()
+
+        # Model limit applies along with the provider limit
+        await limiter.acquire("openai", "gpt_4o")
+        assert mock_sleep.call_args[0][0] == pytest.approx(60.0, abs=0.1)
+    assert set(limiter._buckets.keys()) == {
+        ("openai", "requests"),
+        ("openai/gpt_4o", "requests"),
+    }
+
+
+async def test_acquire_waits_in_order():
+    limiter = ProviderRateLimiter({"openai": {"requests_per_minute": 60}})
+    waits = []
+
+    async def record_sleep(seconds):
+        waits.append(seconds)
+
+    with patch("asyncio.sleep", side_effect=record_sleep):
+        for _ in range(63):
+            await limiter.acquire("openai", "gpt_4o")
+
+    # Later reservations wait behind earlier ones, one second apart
+    assert waits == pytest.approx([1.0, 2.0, 3.0], abs=0.1)
+
+
+async def test_acquire_cancelled_refunds():
+    limiter = ProviderRateLimiter({"openai": {"requests_per_minute": 1}})
+    await limiter.acquire("openai", "gpt_4o")
+
+    task = asyncio.create_task(limiter.acquire("openai", "gpt_4o"))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The cancelled reservation was returned, so the next waits one period, not two
+    bucket = limiter._buckets[("openai", "requests")]
+    assert bucket.reserve(1, bucket._updated) == pytest.approx(60.0, abs=0.1)
+
+
+def test_limit_change_replaces_bucket():
+    limits = {"openai": {"requests_per_minute": 1}}
+    limiter = ProviderRateLimiter(limits)
+    limiter._reserve("openai", "gpt_4o", tokens=0, requests=1)
+    first = limiter._buckets[("openai", "requests")]
+
+    limits["openai"]["requests_per_minute"] = 100
+    limiter._reserve("openai", "gpt_4o", tokens=0, requests=1)
+    second = limiter._buckets[("openai", "requests")]
+    assert second is not first
+    assert second.per_minute == 100
+
+
+def test_limits_from_config():
+    with patch("kiln_ai.adapters.rate_limiter.Config.shared") as mock_shared:
+        mock_shared.return_value.provider_rate_limits = {
+            "groq": {"requests_per_minute": 30}
+        }
+        limiter = ProviderRateLimiter()
+        assert limiter.is_limited("groq", "llama")
+        assert not limiter.is_limited("openai", "gpt_4o")
+
+
+def test_shared():
+    assert ProviderRateLimiter.shared() is ProviderRateLimiter.shared()
@@ -0,0 +1,130 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+from openai.types.chat.chat_completion import ChoiceLogprobs
+from openai.types.chat.chat_completion_token_logprob import ChatCompletionTokenLogprob
+
+from kiln_ai.adapters.response_cache import (
+    CACHE_FILENAME,
+    ResponseCache,
+    run_output_from_json,
+    run_output_to_json,
+)
+from kiln_ai.adapters.run_output import RunOutput
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / CACHE_FILENAME, max_bytes=1000)
+
+
+def test_key_stable_and_content_addressed():
+    request = {"model": "gpt_4o", "messages": [{"role": "user", "content": "hi"}]}
+    # Dict order doesn't matter
+    reordered = {"messages": [{"role": "user", "content": "hi"}], "model": "gpt_4o"}
+    assert ResponseCache.key(request) == ResponseCache.key(reordered)
+    assert len(ResponseCache.key(request)) == 64
+
+    changed = {"model": "gpt_4o", "messages": [{"role": "user", "content": "hey"}]}
+    assert ResponseCache.key(request) != ResponseCache.key(changed)
+
+
+def test_get_set(cache):
+    key = ResponseCache.key({"a": 1})
+    assert cache.get(key) is None
+    cache.set(key, '{"output": "hello"}')
+    assert cache.get(key) == '{"output": "hello"}'
+
+    # Persistent, across instances
+    other = ResponseCache(cache.path)
+    assert other.get(key) == '{"output": "hello"}'
+
+
+def test_stats(cache):
+    assert cache.stats().entries == 0
+    cache.get("missing")
+    cache.set("key", "12345")
+    cache.set("key", "1234567890")
+    cache.get("key")
+    cache.get("key")
+
+    stats = cache.stats()
+    assert stats.hits == 2
+    assert stats.misses == 1
+    assert stats.entries == 1
+    assert stats.size_bytes == 10
+
+    cache.clear()
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries, stats.size_bytes) == (0, 0, 0, 0)
+
+
+def test_evicts_least_recently_used(cache):
+    with patch("kiln_ai.adapters.response_cache.time.time") as mock_time:
+        for i in range(3):
+            mock_time.return_value = float(i)
+            cache.set(f"key_{i}", "x" * 300)
+        # Use key_0, so key_1 is least recently used
+        mock_time.return_value = 10.0
+        assert cache.get("key_0") is not None
+
+        # 1200 bytes > 1000 limit: evict down to 900
+        mock_time.return_value = 11.0
+        cache.set("key_3", "x" * 300)
+
+    assert cache.stats().size_bytes == 900
+    assert cache.get("key_1") is None
+    for key in ["key_0", "key_2", "key_3"]:
+        assert cache.get(key) is not None
+
+
+def test_unavailable_cache_is_a_miss(cache):
+    with patch.object(
+        ResponseCache, "_connect", side_effect=sqlite3.OperationalError("locked")
+    ):
+        cache.set("key", "value")
+        assert cache.get("key") is None
+    assert cache.stats().misses == 1
+
+
+async def test_async_wrappers(cache):
+    await cache.set_async("key", "value")
+    assert await cache.get_async("key") == "value"
+
+
+def test_enabled_and_max_bytes_from_config(tmp_path):
+    with patch("kiln_ai.adapters.response_cache.Config.shared") as mock_shared:
+        mock_shared.return_value.response_cache = True
+        mock_shared.return_value.response_cache_max_bytes = 5000
+        assert ResponseCache.enabled()
+        assert ResponseCache(tmp_path / CACHE_FILENAME).max_bytes() == 5000
+
+        mock_shared.return_value.response_cache = False
+        assert not ResponseCache.enabled()
+
+    # Off by default, with a 256MB limit
+    assert not ResponseCache.enabled()
+    assert ResponseCache(tmp_path / CACHE_FILENAME).max_bytes() == 256 * 1024 * 1024
+
+
+def test_run_output_round_trip():
+    run_output = RunOutput(
+        output={"answer": "42"},
+        intermediate_outputs={"chain_of_thought": "thinking"},
+    )
+    assert run_output_from_json(run_output_to_json(run_output)) == run_output
+
+    logprobs = ChoiceLogprobs(
+        content=[
+            ChatCompletionTokenLogprob(
+                token="42", logprob=-0.1, bytes=[52, 50], top_logprobs=[]
+            )
+        ]
+    )
+    run_output = RunOutput(
+        output="42", intermediate_outputs=None, output_logprobs=logprobs
+    )
+    restored = run_output_from_json(run_output_to_json(run_output))
+    assert restored == run_output
+    assert isinstance(restored.output_logprobs, ChoiceLogprobs)
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from kiln_ai.adapters.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_call():
+    single_flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "result"
+
+    tasks = [asyncio.create_task(single_flight.do("key", fn)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert single_flight.in_flight() == 1
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert [result for result, _ in results] == ["result"] * 5
+    # First caller ran it, the rest shared it
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert single_flight.in_flight() == 0
+
+
+async def test_different_keys_not_shared():
+    single_flight = SingleFlight()
+
+    async def fn_for(value):
+        async def fn():
+            await asyncio.sleep(0)
+            return value
+
+        return fn
+
+    results = await asyncio.gather(
+        single_flight.do("a", await fn_for("a")),
+        single_flight.do("b", await fn_for("b")),
+    )
+    assert results == [("a", False), ("b", False)]
+
+
+async def test_sequential_calls_not_shared():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await single_flight.do("key", fn) == (1, False)
+    assert await single_flight.do("key", fn) == (2, False)
+
+
+async def test_error_shared():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn():
+        await release.wait()
+        raise ValueError("failed")
+
+    tasks = [asyncio.create_task(single_flight.do("key", fn)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert single_flight.in_flight() == 0
+
+
+async def test_cancel_first_caller_others_still_get_result():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn():
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(single_flight.do("key", fn))
+    second = asyncio.create_task(single_flight.do("key", fn))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == ("result", True)
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_cancel_all_callers_cancels_call():
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def fn():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    task = asyncio.create_task(single_flight.do("key", fn))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert single_flight.in_flight() == 0
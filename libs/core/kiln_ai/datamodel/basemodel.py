@@ -1,17 +1,28 @@
+import atexit
+import contextlib
+import copy
 import json
+import math
+import multiprocessing
 import os
 import re
 import shutil
+import stat
+import threading
 import uuid
 from abc import ABCMeta
 from builtins import classmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from enum import Enum
 from pathlib import Path
 from typing import (
     Any,
     Dict,
     List,
     Optional,
+    Set,
+    Tuple,
     Type,
     TypeVar,
 )
@@ -42,6 +53,32 @@ T = TypeVar("T", bound="KilnBaseModel")
 PT = TypeVar("PT", bound="KilnParentedModel")
 
 
+class _DeferredField:
+    # Placeholder for a field skipped by a partial load. Intentionally not serializable: a partial model must load its deferred fields before being dumped.
+    def __repr__(self) -> str:
+        return "<deferred>"
+
+
+DEFERRED_FIELD = _DeferredField()
+
+
+# Every field name which has been shared by a copy-on-write copy. Lets attribute access skip the shared check for all other names.
+_COPY_ON_WRITE_FIELDS: Set[str] = set()
+
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None), datetime, Path)
+
+
+def _is_immutable(value: Any) -> bool:
+    return isinstance(value, _IMMUTABLE_TYPES) or isinstance(value, Enum)
+
+
+def _private_without_shared(model: BaseModel) -> Dict[str, Any] | None:
+    private = model.__pydantic_private__
+    if not private or "_shared_fields" not in private:
+        return private
+    return {name: value for name, value in private.items() if name != "_shared_fields"}
+
+
 # Naming conventions:
 # 1) Names are filename safe as they may be used as file names. They are informational and not to be used in prompts/training/validation.
 # 2) Descrptions are for Kiln users to describe/understanding the purpose of this object. They must never be used in prompts/training/validation. Use "instruction/requirements" instead.
@@ -91,6 +128,8 @@ class KilnBaseModel(BaseModel):
     created_by: str = Field(default_factory=lambda: Config.shared().user_id)
 
     _loaded_from_file: bool = False
+    # Fields skipped when partially loaded. Loaded from disk on first access, see KilnParentedModel.load_partial_from_file.
+    _deferred_fields: Set[str] | None = None
 
     @computed_field()
     def model_type(self) -> str:
@@ -139,15 +178,76 @@ class KilnBaseModel(BaseModel):
         cached_model = ModelCache.shared().get_model(path, cls, readonly=readonly)
         if cached_model is not None:
             return cached_model
+        m, mtime_ns, size = cls._load_from_file_uncached(path)
+        ModelCache.shared().set_model(path, m, mtime_ns, size)
+        return m
+
+    def load_deferred_fields(self) -> None:
+        """Load any fields deferred by load_partial_from_file from disk."""
+        deferred = self._deferred_fields
+        if not deferred:
+            return
+        # Clear first: validators run below may access the deferred fields
+        self._deferred_fields = None
+        if self.path is None:
+            raise ValueError("Cannot load deferred fields because path is not set")
+        with open(self.path, "r", encoding="utf-8") as file:
+            parsed_json = json.loads(file.read())
+        remaining = set(deferred)
+        for field_name in deferred:
+            remaining.discard(field_name)
+            if field_name in parsed_json:
+                # Validate as a load, with the fields not yet set still marked as deferred
+                self.__pydantic_validator__.validate_assignment(
+                    self,
+                    field_name,
+                    parsed_json[field_name],
+                    context={
+                        "loading_from_file": True,
+                        "deferred_fields": set(remaining),
+                    },
+                )
+
+    def deferring_field(self, field_name: str, info: ValidationInfo | None) -> bool:
+        """True if field_name is deferred (not yet loaded) by a partial load. Validators should skip checks using it, as accessing it triggers a load."""
+        if (
+            info is not None
+            and info.context is not None
+            and field_name in info.context.get("deferred_fields", ())
+        ):
+            return True
+        return field_name in (self._deferred_fields or ())
+
+    @classmethod
+    def _load_from_file_uncached(
+        cls: Type[T], path: Path, deferred_fields: Set[str] | None = None
+    ) -> Tuple[T, int, int]:
+        """Read, parse and validate a model file, without using the cache.
+
+        Returns:
+            Tuple[T, int, int]: The model, the file mtime_ns and the file size in bytes
+        """
         with open(path, "r", encoding="utf-8") as file:
             # modified time of file for cache invalidation. From file descriptor so it's atomic w read.
-            mtime_ns = os.fstat(file.fileno()).st_mtime_ns
+            file_stat = os.fstat(file.fileno())
+            mtime_ns = file_stat.st_mtime_ns
             file_data = file.read()
             parsed_json = json.loads(file_data)
-            m = cls.model_validate(parsed_json, context={"loading_from_file": True})
+            context: Dict[str, Any] = {"loading_from_file": True}
+            skipped: Set[str] = set()
+            if deferred_fields:
+                skipped = {name for name in deferred_fields if name in parsed_json}
+                context["deferred_fields"] = skipped
+                parsed_json = {k: v for k, v in parsed_json.items() if k not in skipped}
+            m = cls.model_validate(parsed_json, context=context)
             if not isinstance(m, cls):
                 raise ValueError(f"Loaded model is not of type {cls.__name__}")
             m._loaded_from_file = True
+            if skipped:
+                m._deferred_fields = skipped
+                # Placeholder values, replaced on first access (see KilnParentedModel.__getattribute__)
+                for field_name in skipped:
+                    m.__dict__[field_name] = DEFERRED_FIELD
             file_data = None
         m.path = path
         if m.v > m.max_schema_version():
@@ -162,8 +262,7 @@ class KilnBaseModel(BaseModel):
                 f"Class: {m.__class__.__name__}, id: {getattr(m, 'id', None)}, path: {path}, "
                 f"version: {m.v}, max version: {m.max_schema_version()}"
             )
-        ModelCache.shared().set_model(path, m, mtime_ns)
-        return m
+        return m, mtime_ns, file_stat.st_size
 
     def loaded_from_file(self, info: ValidationInfo | None = None) -> bool:
         # Two methods of indicated it's loaded from file:
@@ -187,6 +286,20 @@ class KilnBaseModel(BaseModel):
     def save_to_file(self) -> None:
         """Save the model instance to a file.
 
+        Raises:
+            ValueError: If the path is not set
+        """
+        path, json_data = self.serialize_for_save()
+        write_model_file(path, json_data)
+
+    def serialize_for_save(self) -> Tuple[Path, str]:
+        """Build the path and file contents for saving the model, without writing anything.
+
+        Sets the model's path, so it keeps its location even if something like the name changes. Use write_model_file to write the result.
+
+        Returns:
+            Tuple[Path, str]: The file path and JSON contents
+
         Raises:
             ValueError: If the path is not set
         """
@@ -196,15 +309,12 @@ class KilnBaseModel(BaseModel):
                 f"Cannot save to file because 'path' is not set. Class: {self.__class__.__name__}, "
                 f"id: {getattr(self, 'id', None)}, path: {path}"
             )
-        path.parent.mkdir(parents=True, exist_ok=True)
+        # Don't overwrite deferred fields with defaults
+        self.load_deferred_fields()
         json_data = self.model_dump_json(indent=2, exclude={"path"})
-        with open(path, "w", encoding="utf-8") as file:
-            file.write(json_data)
         # save the path so even if something like name changes, the file doesn't move
         self.path = path
-        # We could save, but invalidating will trigger load on next use.
-        # This ensures everything in cache is loaded from disk, and the cache perfectly reflects what's on disk
-        ModelCache.shared().invalidate(path)
+        return path, json_data
 
     def delete(self) -> None:
         if self.path is None:
@@ -214,6 +324,7 @@ class KilnBaseModel(BaseModel):
             raise ValueError("Cannot delete model because path is not set")
         shutil.rmtree(dir_path)
         ModelCache.shared().invalidate(self.path)
+        ModelCache.shared().invalidate_children_paths(dir_path.parent)
         self.path = None
 
     def build_path(self) -> Path | None:
@@ -226,6 +337,46 @@ class KilnBaseModel(BaseModel):
         return 1
 
 
+def write_file_atomic(path: Path, data: str, fsync: bool = False) -> None:
+    """Write a file via a temp file and rename, so readers (and crashes) never see a partially written file.
+
+    Args:
+        path (Path): Destination path. The parent folder must exist.
+        data (str): File contents
+        fsync (bool): Flush the file to disk before the rename, so the write is durable if the machine crashes (slower)
+    """
+    # Temp file in the same folder, so the rename is atomic (same filesystem). Hidden and not a folder, so never listed as a child.
+    # Created with open (not mkstemp), so it gets the usual permissions like a file written in place.
+    temp_path = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, "x", encoding="utf-8") as file:
+            file.write(data)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        with contextlib.suppress(FileNotFoundError):
+            # Keep the permissions of the file we're replacing
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+
+def write_model_file(path: Path, json_data: str, fsync: bool = False) -> None:
+    """Write a model file (see KilnBaseModel.serialize_for_save) atomically, and invalidate cached state for it."""
+    is_new_file = not path.exists()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_file_atomic(path, json_data, fsync=fsync)
+    # We could save, but invalidating will trigger load on next use.
+    # This ensures everything in cache is loaded from disk, and the cache perfectly reflects what's on disk
+    ModelCache.shared().invalidate(path)
+    if is_new_file:
+        # New child: the listing of the relationship folder (path/../..) is stale
+        ModelCache.shared().invalidate_children_paths(path.parent.parent)
+
+
 class KilnParentedModel(KilnBaseModel, metaclass=ABCMeta):
     """Base model for Kiln models that have a parent-child relationship. This base class is for child models.
 
@@ -240,13 +391,130 @@ class KilnParentedModel(KilnBaseModel, metaclass=ABCMeta):
     # We don't persist the parent reference to disk. See the accessors below for how we make it a clean api (parent accessor will lazy load from disk)
     parent: Optional[KilnBaseModel] = Field(default=None, exclude=True)
 
+    # Mutable fields (and the parent) still shared with the cached instance this was copied from, see copy_on_write.
+    # Bookkeeping, not part of the model's value: ignored by __eq__.
+    _shared_fields: Set[str] | None = None
+
     def __getattribute__(self, name: str) -> Any:
+        # Hot path, keep it cheap
         if name == "parent":
             return self.load_parent()
-        return super().__getattribute__(name)
+        value = object.__getattribute__(self, name)
+        if value is DEFERRED_FIELD:
+            self.load_deferred_fields()
+            return object.__getattribute__(self, name)
+        if name in _COPY_ON_WRITE_FIELDS:
+            private = object.__getattribute__(self, "__pydantic_private__")
+            shared = private.get("_shared_fields") if private else None
+            if shared and name in shared:
+                # First access to a shared mutable value: take our own copy, as the caller may mutate it
+                shared.discard(name)
+                value = copy.deepcopy(value)
+                object.__getattribute__(self, "__dict__")[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        shared = self._shared_fields
+        if shared:
+            # Replaced, no longer shared
+            shared.discard(name)
+        super().__setattr__(name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, KilnParentedModel):
+            return super().__eq__(other)
+        # Same as pydantic's equality, without the copy-on-write bookkeeping
+        return (
+            type(self) is type(other)
+            and _private_without_shared(self) == _private_without_shared(other)
+            and self.__pydantic_extra__ == other.__pydantic_extra__
+            and self.__dict__ == other.__dict__
+        )
+
+    def __copy__(self) -> Self:
+        m = super().__copy__()
+        shared = self._shared_fields
+        if shared:
+            # Values shared with the cache are shared with the new copy too. Each tracks its own copies.
+            m._shared_fields = set(shared)
+        return m
+
+    def __deepcopy__(self, memo: Dict[int, Any] | None = None) -> Self:
+        m = super().__deepcopy__(memo)
+        # Everything was copied, nothing is shared
+        m._shared_fields = None
+        return m
+
+    def copy_on_write(self) -> Self:
+        """A copy which is safe to mutate, without the cost of a deep copy.
+
+        The copy shares field values with this instance. Mutable values (lists, dicts, nested models) are deep copied the first time they are accessed on the copy, so mutating the copy never changes this instance.
+        The parent is copied (copy-on-write too) the first time it's accessed on the copy.
+        Used by ModelCache to return copies of cached models.
+
+        Returns:
+            Self: The copy
+        """
+        m = self.model_copy()
+        shared = {
+            name
+            for name, value in self.__dict__.items()
+            if name != "parent" and not _is_immutable(value)
+        }
+        _COPY_ON_WRITE_FIELDS.update(shared)
+        if object.__getattribute__(self, "parent") is not None:
+            shared.add("parent")
+        m._shared_fields = shared or None
+        return m
+
+    @classmethod
+    def load_partial_from_file(
+        cls: Type[PT], path: Path | str, deferred_fields: Set[str]
+    ) -> PT:
+        """Load a model instance, skipping validation of some (typically large) fields.
+
+        Useful for listings which only need a few summary fields. Deferred fields are loaded from disk on first access.
+        Partial models are not cached. If the full model is already cached, the cached instance is returned (not safe to mutate).
+
+        Note: deferred fields must be loaded before serializing (model_dump raises/warns on the placeholder). Call load_deferred_fields() first, save_to_file does this for you.
+
+        Args:
+            path (Path): Path to the model file
+            deferred_fields (Set[str]): Names of fields to skip. Must be optional fields (have a default).
+
+        Returns:
+            PT: Instance of the model
+        """
+        if isinstance(path, str):
+            path = Path(path)
+        for field_name in deferred_fields:
+            field = cls.model_fields.get(field_name)
+            if field is None or field.is_required():
+                raise ValueError(
+                    f"Can only defer optional fields. Class: {cls.__name__}, field: {field_name}"
+                )
+        cached_model = ModelCache.shared().get_model(path, cls, readonly=True)
+        if cached_model is not None:
+            return cached_model
+        m, _, _ = cls._load_from_file_uncached(path, deferred_fields)
+        return m
 
     def cached_parent(self) -> Optional[KilnBaseModel]:
-        return object.__getattribute__(self, "parent")
+        parent = object.__getattribute__(self, "parent")
+        if parent is not None:
+            private = object.__getattribute__(self, "__pydantic_private__")
+            shared = private.get("_shared_fields") if private else None
+            if shared and "parent" in shared:
+                # First access to a parent shared with the cached instance: take our own copy, as the caller may mutate it
+                shared.discard("parent")
+                copy_on_write = getattr(parent, "copy_on_write", None)
+                parent = (
+                    copy_on_write()
+                    if copy_on_write is not None
+                    else parent.model_copy(deep=True)
+                )
+                object.__getattribute__(self, "__dict__")["parent"] = parent
+        return parent
 
     def load_parent(self) -> Optional[KilnBaseModel]:
         """Get the parent model instance, loading it from disk if necessary.
@@ -346,47 +614,125 @@ class KilnParentedModel(KilnBaseModel, metaclass=ABCMeta):
         # Ignore type error: this is abstract base class, but children must implement relationship_name
         relationship_folder = parent_folder / Path(cls.relationship_name())  # type: ignore
 
-        if not relationship_folder.exists() or not relationship_folder.is_dir():
-            return []
+        # Cached listing, validated with a single stat of the relationship folder (or none when polling)
+        cached_paths = ModelCache.shared().get_children_paths(relationship_folder)
+        if cached_paths is not None:
+            yield from cached_paths
+            return
+
+        try:
+            # mtime before listing, so changes made during the listing are caught on next use
+            folder_stat = relationship_folder.stat()
+        except FileNotFoundError:
+            return
+        if not stat.S_ISDIR(folder_stat.st_mode):
+            return
 
         # Collect all /relationship/{id}/{base_filename.kiln} files in the relationship folder
         # manual code instead of glob for performance (5x speedup over glob)
 
         base_filename = cls.base_filename()
+        child_paths: List[Path] = []
+        pending_paths: List[Path] = []
         # Iterate through immediate subdirectories using scandir for better performance
         # Benchmark: scandir is 10x faster than glob, so worth the extra code
         with os.scandir(relationship_folder) as entries:
             for entry in entries:
-                if not entry.is_dir():
+                # Hidden folders are staging folders, not children (see validate_and_save_with_subrelations)
+                if not entry.is_dir() or entry.name.startswith("."):
                     continue
 
                 child_file = Path(entry.path) / base_filename
                 if child_file.is_file():
+                    child_paths.append(child_file)
                     yield child_file
+                else:
+                    pending_paths.append(child_file)
+
+        ModelCache.shared().set_children_paths(
+            relationship_folder, child_paths, pending_paths, folder_stat.st_mtime_ns
+        )
 
     @classmethod
     def all_children_of_parent_path(
-        cls: Type[PT], parent_path: Path | None, readonly: bool = False
+        cls: Type[PT],
+        parent_path: Path | None,
+        readonly: bool = False,
+        max_workers: int | None = None,
     ) -> list[PT]:
+        """Load all children of a parent.
+
+        Args:
+            parent_path (Path): Path to the parent model file
+            readonly (bool): If True, return cached instances (not copies, not safe to mutate)
+            max_workers (int, optional): Parse uncached files across this many processes. Defaults to the model_load_workers setting (0 or 1 for serial loading).
+        """
+        child_paths = list(cls.iterate_children_paths_of_parent_path(parent_path))
+
+        preloaded: Dict[Path, PT] = {}
+        # Not worth the IPC overhead for a handful of files
+        if len(child_paths) >= PARALLEL_LOAD_MIN_FILES:
+            if max_workers is None:
+                max_workers = Config.shared().model_load_workers or 0
+            if max_workers > 1:
+                preloaded = cls._parallel_load_uncached(child_paths, max_workers)
+
         children = []
-        for child_path in cls.iterate_children_paths_of_parent_path(parent_path):
-            item = cls.load_from_file(child_path, readonly=readonly)
+        for child_path in child_paths:
+            item = preloaded.get(child_path)
+            if item is None:
+                item = cls.load_from_file(child_path, readonly=readonly)
+            elif not readonly:
+                # Preloaded models are the cached instances. Copy, so edits don't change the cache.
+                item = ModelCache.editable_copy(item)
             children.append(item)
         return children
 
+    @classmethod
+    def _parallel_load_uncached(
+        cls: Type[PT], child_paths: List[Path], max_workers: int
+    ) -> Dict[Path, PT]:
+        # Cold loads are CPU bound in pydantic validation. Parse files which aren't cached across a process pool, and populate the cache with the results.
+        cache = ModelCache.shared()
+        uncached = [
+            path
+            for path in child_paths
+            if cache.get_model(path, cls, readonly=True) is None
+        ]
+        if len(uncached) < PARALLEL_LOAD_MIN_FILES:
+            return {}
+
+        # A few chunks per worker balances load without too much IPC overhead
+        chunk_size = math.ceil(len(uncached) / (max_workers * 4))
+        chunks = [
+            uncached[i : i + chunk_size] for i in range(0, len(uncached), chunk_size)
+        ]
+        executor = _model_load_executor(max_workers)
+        loaded: Dict[Path, PT] = {}
+        for results in executor.map(_load_files_uncached, [cls] * len(chunks), chunks):
+            for path, model, mtime_ns, size in results:
+                cache.set_model(path, model, mtime_ns, size)
+                loaded[path] = model
+        return loaded
+
     @classmethod
     def from_id_and_parent_path(
         cls: Type[PT], id: str, parent_path: Path | None
     ) -> PT | None:
         """
-        Fast search by ID using the cache. Avoids the model_copy overhead on all but the exact match.
+        Fast search by ID using the cache.
 
-        Uses cache so still slow on first load.
+        Child folder names start with the ID, so with a cached listing we can go straight to the matching file (constant time). The in-file ID is still the source of truth: we verify it, and fall back to checking the in-file ID of every child (folders renamed or copied by hand, no cached listing).
         """
         if parent_path is None:
             return None
 
-        # Note: we're using the in-file ID. We could make this faster using the path-ID if this becomes perf bottleneck, but it's better to have 1 source of truth.
+        child_path = cls._child_path_by_id(id, parent_path)
+        if child_path is not None:
+            child = cls.load_from_file(child_path)
+            if child.id == id:
+                return child
+
         for child_path in cls.iterate_children_paths_of_parent_path(parent_path):
             child_id = ModelCache.shared().get_model_id(child_path, cls)
             if child_id == id:
@@ -397,6 +743,73 @@ class KilnParentedModel(KilnBaseModel, metaclass=ABCMeta):
                     return child
         return None
 
+    @classmethod
+    def _child_path_by_id(cls, id: str, parent_path: Path) -> Path | None:
+        parent_folder = parent_path.parent if parent_path.is_file() else parent_path
+        relationship_folder = parent_folder / cls.relationship_name()
+        cache = ModelCache.shared()
+        child_path = cache.get_child_path_by_id(relationship_folder, id)
+        if child_path is None and cache.get_children_paths(relationship_folder) is None:
+            # List (without loading) to populate the cached listing, then try again
+            for _ in cls.iterate_children_paths_of_parent_path(parent_path):
+                pass
+            child_path = cache.get_child_path_by_id(relationship_folder, id)
+        return child_path
+
+
+# Minimum number of uncached files before we use the process pool to load children
+PARALLEL_LOAD_MIN_FILES = 64
+
+_model_load_pool: ProcessPoolExecutor | None = None
+_model_load_pool_workers = 0
+_model_load_pool_lock = threading.Lock()
+_model_load_pool_atexit_registered = False
+
+
+def _model_load_executor(max_workers: int) -> ProcessPoolExecutor:
+    # Shared pool, so we only pay process startup once. Shut down at exit (or by the app, see shutdown_model_load_pool).
+    # Workers are spawned, not forked: the server process has threads, which aren't safe to fork. Spawned workers re-import
+    # the main module, so apps must guard their entry point with `if __name__ == "__main__"`, and frozen apps (PyInstaller)
+    # must call multiprocessing.freeze_support() first thing.
+    global \
+        _model_load_pool, \
+        _model_load_pool_workers, \
+        _model_load_pool_atexit_registered
+    with _model_load_pool_lock:
+        if _model_load_pool is None or _model_load_pool_workers != max_workers:
+            if _model_load_pool is not None:
+                _model_load_pool.shutdown(wait=False)
+            _model_load_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _model_load_pool_workers = max_workers
+            if not _model_load_pool_atexit_registered:
+                atexit.register(shutdown_model_load_pool)
+                _model_load_pool_atexit_registered = True
+        return _model_load_pool
+
+
+def shutdown_model_load_pool() -> None:
+    """Stop the worker processes used for parallel loading (see model_load_workers), if started. They're restarted if needed."""
+    global _model_load_pool, _model_load_pool_workers
+    with _model_load_pool_lock:
+        if _model_load_pool is not None:
+            _model_load_pool.shutdown(wait=True, cancel_futures=True)
+        _model_load_pool = None
+        _model_load_pool_workers = 0
+
+
+def _load_files_uncached(
+    model_class: Type[KilnBaseModel], paths: List[Path]
+) -> List[Tuple[Path, KilnBaseModel, int, int]]:
+    # Runs in a worker process. Skips the (worker local) cache, the parent process populates its cache with the results.
+    results: List[Tuple[Path, KilnBaseModel, int, int]] = []
+    for path in paths:
+        model, mtime_ns, size = model_class._load_from_file_uncached(path)
+        results.append((path, model, mtime_ns, size))
+    return results
+
 
 # Parent create methods for all child relationships
 # You must pass in parent_of in the subclass definition, defining the child relationships
@@ -453,13 +866,18 @@ class KilnParentModel(KilnBaseModel, metaclass=ABCMeta):
         data: Dict[str, Any],
         path: Path | None = None,
         parent: KilnBaseModel | None = None,
+        max_workers: int = 1,
     ):
         """Validate and save a model instance along with all its nested child relationships.
 
+        The whole tree is validated once, then written to a hidden staging folder, then moved into place. Nothing is written if validation fails.
+        Creating a new tree (the usual case, eg importing a task) is atomic: the staging folder is renamed to the model's folder. If the model's folder already exists, files are merged in one by one (each file replaced atomically).
+
         Args:
             data (Dict[str, Any]): Model data including child relationships
             path (Path, optional): Path where the model should be saved
             parent (KilnBaseModel, optional): Parent model instance for parented models
+            max_workers (int): Number of threads writing staged files. Useful for large trees (thousands of children).
 
         Returns:
             KilnParentModel: The validated and saved model instance
@@ -468,20 +886,23 @@ class KilnParentModel(KilnBaseModel, metaclass=ABCMeta):
             ValidationError: If validation fails for the model or any of its children
         """
         # Validate first, then save. Don't want error half way through, and partly persisted
-        # TODO P2: save to tmp dir, then move atomically. But need to merge directories so later.
-        cls._validate_nested(data, save=False, path=path, parent=parent)
-        instance = cls._validate_nested(data, save=True, path=path, parent=parent)
+        instances: List[KilnBaseModel] = []
+        instance = cls._validate_nested(
+            data, path=path, parent=parent, collect=instances
+        )
+        _save_tree(instances, max_workers=max_workers)
         return instance
 
     @classmethod
     def _validate_nested(
         cls,
         data: Dict[str, Any],
-        save: bool = False,
         parent: KilnBaseModel | None = None,
         path: Path | None = None,
+        collect: List[KilnBaseModel] | None = None,
     ):
         # Collect all validation errors so we can report them all at once
+        # If collect is provided, validated instances are appended to it (parents before children)
         validation_errors = []
 
         try:
@@ -490,8 +911,8 @@ class KilnParentModel(KilnBaseModel, metaclass=ABCMeta):
                 instance.path = path
             if parent is not None and isinstance(instance, KilnParentedModel):
                 instance.parent = parent
-            if save:
-                instance.save_to_file()
+            if collect is not None:
+                collect.append(instance)
         except ValidationError as e:
             instance = None
             for suberror in e.errors():
@@ -507,7 +928,7 @@ class KilnParentModel(KilnBaseModel, metaclass=ABCMeta):
                 for value_index, value in enumerate(value_list):
                     try:
                         if issubclass(parent_type, KilnParentModel):
-                            kwargs = {"data": value, "save": save}
+                            kwargs = {"data": value, "collect": collect}
                             if instance is not None:
                                 kwargs["parent"] = instance
                             parent_type._validate_nested(**kwargs)
@@ -516,8 +937,8 @@ class KilnParentModel(KilnBaseModel, metaclass=ABCMeta):
                             subinstance = parent_type.model_validate(value)
                             if instance is not None:
                                 subinstance.parent = instance
-                            if save:
-                                subinstance.save_to_file()
+                            if collect is not None:
+                                collect.append(subinstance)
                         else:
                             raise ValueError(
                                 f"Invalid type {parent_type}. Should be KilnBaseModel based."
@@ -549,3 +970,58 @@ class KilnParentModel(KilnBaseModel, metaclass=ABCMeta):
         elif isinstance(orig_loc, list):
             new_loc.extend(orig_loc)
         error["loc"] = tuple(new_loc)
+
+
+def _save_tree(instances: List[KilnBaseModel], max_workers: int = 1) -> None:
+    # Save a validated tree of models (parents before children): stage in a hidden folder next to the root model's folder, then move into place.
+    if len(instances) == 0:
+        return
+    # Sets paths top down, so children build their paths from their parent's
+    files = [instance.serialize_for_save() for instance in instances]
+    root_folder = files[0][0].parent
+    for file_path, _ in files:
+        if not file_path.is_relative_to(root_folder):
+            raise ValueError(
+                f"Nested model path {file_path} is not inside the root model folder {root_folder}"
+            )
+
+    root_folder.parent.mkdir(parents=True, exist_ok=True)
+    staging_folder = (
+        root_folder.parent / f".{root_folder.name}.{uuid.uuid4().hex}.staging"
+    )
+    staged_files = [
+        (staging_folder / file_path.relative_to(root_folder), json_data)
+        for file_path, json_data in files
+    ]
+    try:
+        for folder in sorted({staged_path.parent for staged_path, _ in staged_files}):
+            folder.mkdir(parents=True, exist_ok=True)
+
+        def write_staged(staged_file: Tuple[Path, str]) -> None:
+            staged_path, json_data = staged_file
+            with open(staged_path, "x", encoding="utf-8") as file:
+                file.write(json_data)
+
+        if max_workers > 1 and len(staged_files) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # list() to raise any write error
+                list(executor.map(write_staged, staged_files))
+        else:
+            for staged_file in staged_files:
+                write_staged(staged_file)
+
+        if root_folder.exists():
+            # Merge into the existing folder, file by file
+            for (staged_path, _), (file_path, _) in zip(staged_files, files):
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged_path, file_path)
+        else:
+            # New tree: one atomic rename
+            os.rename(staging_folder, root_folder)
+    finally:
+        shutil.rmtree(staging_folder, ignore_errors=True)
+
+    cache = ModelCache.shared()
+    for file_path, _ in files:
+        cache.invalidate(file_path)
+        cache.invalidate_children_paths(file_path.parent.parent)
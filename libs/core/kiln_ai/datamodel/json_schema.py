@@ -1,6 +1,8 @@
+import copy
+import functools
 import json
 import re
-from typing import Annotated, Dict
+from typing import Annotated, Any, Callable, Dict, Iterable, List
 
 import jsonschema
 import jsonschema.exceptions
@@ -16,6 +18,10 @@ Must be a valid JSON schema object with 'type': 'object' and 'properties' define
 """
 
 
+# Compiled schemas are cached by schema text. Tasks and evals each have a few, so this comfortably covers a project.
+SCHEMA_CACHE_SIZE = 256
+
+
 def _check_json_schema(v: str) -> str:
     """Internal validation function for JSON schema strings.
 
@@ -28,12 +34,12 @@ def _check_json_schema(v: str) -> str:
     Raises:
         ValueError: If the schema is invalid
     """
-    schema_from_json_str(v)
+    compiled_schema(v)
     return v
 
 
 def validate_schema(instance: Dict, schema_str: str) -> None:
-    """Validate a dictionary against a JSON schema.
+    """Validate a dictionary against a JSON schema. The schema is compiled once, and cached by its text.
 
     Args:
         instance: Dictionary to validate
@@ -43,14 +49,26 @@ def validate_schema(instance: Dict, schema_str: str) -> None:
         jsonschema.exceptions.ValidationError: If validation fails
         ValueError: If the schema is invalid
     """
-    try:
-        schema = schema_from_json_str(schema_str)
-        v = jsonschema.Draft202012Validator(schema)
-        v.validate(instance)
-    except jsonschema.exceptions.ValidationError as e:
-        raise ValueError(
-            f"This task requires a specific output schema. While the model produced JSON, that JSON didn't meet the schema. Search 'Troubleshooting Structured Data Issues' in our docs for more information. The error from the schema check was: {e.message}"
-        ) from e
+    compiled_schema(schema_str).validate(instance)
+
+
+def validate_schema_many(
+    instances: Iterable[Dict], schema_str: str
+) -> List[str | None]:
+    """Validate many dictionaries against a JSON schema, compiling it once.
+
+    Args:
+        instances: Dictionaries to validate
+        schema_str: JSON schema string to validate against
+
+    Returns:
+        For each instance, None if valid, or the error message if not
+
+    Raises:
+        ValueError: If the schema is invalid
+    """
+    compiled = compiled_schema(schema_str)
+    return [compiled.error(instance) for instance in instances]
 
 
 def schema_from_json_str(v: str) -> Dict:
@@ -60,11 +78,57 @@ def schema_from_json_str(v: str) -> Dict:
         v: String containing a JSON schema definition
 
     Returns:
-        Dict containing the parsed JSON schema
+        Dict containing the parsed JSON schema. A copy: callers may modify it.
 
     Raises:
         ValueError: If the input is not a valid JSON schema object with required properties
     """
+    return copy.deepcopy(compiled_schema(v).schema)
+
+
+@functools.lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def compiled_schema(schema_str: str) -> "CompiledSchema":
+    """The compiled (parsed, checked, with a validator built) schema for a JSON schema string. Cached by schema text.
+
+    Raises:
+        ValueError: If the input is not a valid JSON schema object with required properties
+    """
+    return CompiledSchema(schema_str)
+
+
+class CompiledSchema:
+    """A parsed and checked JSON schema, with its validator. Build with compiled_schema() to share them.
+
+    Simple object schemas (properties of basic types, enums and bounds) are checked with a fast path. Anything the fast path can't accept is checked by the full jsonschema validator, which also produces the error message.
+    """
+
+    def __init__(self, schema_str: str):
+        # Shared: don't modify
+        self.schema = _parse_json_schema(schema_str)
+        self.validator = jsonschema.Draft202012Validator(self.schema)
+        self.fast_check = _simple_object_check(self.schema)
+
+    def validate(self, instance: Any) -> None:
+        """Raises ValueError if the instance doesn't match the schema."""
+        if self.fast_check is not None and self.fast_check(instance):
+            return
+        try:
+            self.validator.validate(instance)
+        except jsonschema.exceptions.ValidationError as e:
+            raise ValueError(
+                f"This task requires a specific output schema. While the model produced JSON, that JSON didn't meet the schema. Search 'Troubleshooting Structured Data Issues' in our docs for more information. The error from the schema check was: {e.message}"
+            ) from e
+
+    def error(self, instance: Any) -> str | None:
+        """The validation error message for the instance, or None if valid."""
+        try:
+            self.validate(instance)
+            return None
+        except ValueError as e:
+            return str(e)
+
+
+def _parse_json_schema(v: str) -> Dict:
     try:
         parsed = json.loads(v)
         jsonschema.Draft202012Validator.check_schema(parsed)
@@ -86,6 +150,106 @@ def schema_from_json_str(v: str) -> Dict:
         raise ValueError(f"Unexpected error parsing JSON schema: {v}\n {e}")
 
 
+# Type checks for the fast path. Conservative: anything rejected here is re-checked by the full validator (eg, 1.0 is a JSON schema integer).
+_SIMPLE_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+_SIMPLE_OBJECT_KEYS = {
+    "type",
+    "properties",
+    "required",
+    "additionalProperties",
+    "title",
+    "description",
+}
+_SIMPLE_PROPERTY_KEYS = {"type", "enum", "minimum", "maximum", "title", "description"}
+
+
+def _simple_object_check(schema: Dict) -> Callable[[Any], bool] | None:
+    """A fast check for simple object schemas, or None if the schema isn't simple.
+
+    The check returns True only if the instance is certainly valid. False means "not sure": use the full validator.
+    """
+    if not _SIMPLE_OBJECT_KEYS.issuperset(schema.keys()):
+        return None
+    additional_properties = schema.get("additionalProperties", True)
+    if not isinstance(additional_properties, bool):
+        return None
+    properties = schema["properties"]
+    if not isinstance(properties, dict):
+        return None
+    property_checks: Dict[str, Callable[[Any], bool]] = {}
+    for name, property_schema in properties.items():
+        check = _simple_property_check(property_schema)
+        if check is None:
+            return None
+        property_checks[name] = check
+    required = schema.get("required", [])
+
+    def check(instance: Any) -> bool:
+        if not isinstance(instance, dict):
+            return False
+        for key in required:
+            if key not in instance:
+                return False
+        for key, value in instance.items():
+            property_check = property_checks.get(key)
+            if property_check is None:
+                if not additional_properties:
+                    return False
+            elif not property_check(value):
+                return False
+        return True
+
+    return check
+
+
+def _simple_property_check(property_schema: Any) -> Callable[[Any], bool] | None:
+    if not isinstance(property_schema, dict) or not _SIMPLE_PROPERTY_KEYS.issuperset(
+        property_schema.keys()
+    ):
+        return None
+    checks: List[Callable[[Any], bool]] = []
+
+    if "type" in property_schema:
+        property_type = property_schema["type"]
+        type_check = (
+            _SIMPLE_TYPE_CHECKS.get(property_type)
+            if isinstance(property_type, str)
+            else None
+        )
+        if type_check is None:
+            return None
+        checks.append(type_check)
+
+    if "enum" in property_schema:
+        # Match type too: JSON schema enums compare 1 == 1.0 but not True == 1. Leave those to the full validator.
+        options = [(type(option), option) for option in property_schema["enum"]]
+        checks.append(
+            lambda v: any(type(v) is t and v == option for t, option in options)
+        )
+
+    minimum = property_schema.get("minimum")
+    maximum = property_schema.get("maximum")
+    if minimum is not None or maximum is not None:
+        is_number = _SIMPLE_TYPE_CHECKS["number"]
+
+        # Bounds only apply to numbers
+        def in_bounds(v: Any) -> bool:
+            if not is_number(v):
+                return True
+            return (minimum is None or v >= minimum) and (
+                maximum is None or v <= maximum
+            )
+
+        checks.append(in_bounds)
+
+    return lambda v: all(check(v) for check in checks)
+
+
 def string_to_json_key(s: str) -> str:
     """Convert a string to a valid JSON key."""
     return re.sub(r"[^a-z0-9_]", "", s.strip().lower().replace(" ", "_"))
@@ -0,0 +1,369 @@
+"""
+A persistent, on-disk index of child summaries for our datamodel.
+
+Listing endpoints usually need a handful of summary fields per child (id, tags, rating, source, created_at), not the full model. Without an index, a cold start (empty ModelCache) means loading and validating every child file before we can return anything.
+
+ - Stored as a sqlite file in the Kiln settings directory (`~/.kiln_ai/summary_indexes/`), one per relationship folder, named by a hash of the folder's path. Project folders are meant to be git friendly and synced, so reading them never writes to them.
+ - Keyed by child folder name, file mtime and file size.
+ - Each refresh stats the child files and only re-loads children which are new or changed. Deleted children are removed.
+ - Refreshes are skipped while the relationship folder is unchanged: same mtime (no child added or removed) and same ModelCache revision (no child saved or deleted by this process). If only the revision changed, only the changed children are checked (ModelCache.changes_since). Edits to existing children by other processes don't change the folder mtime, so every child is re-checked at least every RECHECK_SECONDS.
+ - Summaries are JSON dicts produced by a caller supplied function. Bump the version if that function changes, and stale rows are dropped.
+ - Summaries can be filtered, sorted and paged in sqlite (see query), so a page of results costs memory for the page, not for every child.
+ - The index is a cache, never a source of truth. If it can't be read or written (read-only disk, corrupt file) we fall back to building summaries from the models.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from kiln_ai.datamodel.basemodel import KilnParentedModel
+from kiln_ai.datamodel.model_cache import ModelCache
+from kiln_ai.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+PT = TypeVar("PT", bound=KilnParentedModel)
+
+# Folder of the index files, in the settings directory
+INDEX_DIRNAME = "summary_indexes"
+# Children of an unchanged folder are still re-checked this often, to notice edits by other processes
+RECHECK_SECONDS = 60.0
+
+
+def index_path_for_folder(relationship_folder: Path) -> Path:
+    """The index file of a relationship folder: in the settings directory, named by a hash of the folder's absolute path."""
+    key = hashlib.sha256(str(relationship_folder.resolve()).encode("utf-8")).hexdigest()
+    return Path(Config.settings_dir()) / INDEX_DIRNAME / f"{key}.sqlite"
+
+
+@dataclass
+class SummaryQuery:
+    """Filters and sort order for ChildSummaryIndex.query, as sqlite expressions over each child's summary.
+
+    Read summary fields with json_extract(summary, '$.field'). Use ? placeholders for values.
+
+    Attributes:
+        where: Conditions a summary must match (all of them)
+        params: Values for the placeholders in where, in order
+        order_by: Expressions to sort by, ascending. The child folder name is always the final tie breaker.
+    """
+
+    where: List[str] = field(default_factory=list)
+    params: List[Any] = field(default_factory=list)
+    order_by: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _CheckedFolder:
+    # The folder mtime and ModelCache revision the index reflects, and when all children were last checked
+    mtime_ns: int
+    revision: int
+    checked_at: float
+
+
+class ChildSummaryIndex(Generic[PT]):
+    """An incrementally maintained index of summaries for a parent/child relationship.
+
+    Args:
+        child_class: The child model type (eg TaskRun)
+        name: A name for this summary type. Several summary types can share a single index file.
+        summarize: Builds a JSON serializable summary dict from a child model
+        version: Version of the summarize function. Changing it drops previously indexed summaries.
+        deferred_fields: Fields summarize doesn't use. Skipped when loading children to summarize (see load_partial_from_file).
+        sql_functions: Single argument functions made available to query expressions, by name. Must be deterministic.
+    """
+
+    def __init__(
+        self,
+        child_class: Type[PT],
+        name: str,
+        summarize: Callable[[PT], Dict[str, Any]],
+        version: int = 1,
+        deferred_fields: Set[str] | None = None,
+        sql_functions: Dict[str, Callable[[Any], Any]] | None = None,
+    ):
+        self.child_class = child_class
+        self.name = name
+        self.summarize = summarize
+        self.version = version
+        self.deferred_fields = deferred_fields
+        self.sql_functions = sql_functions or {}
+        # Relationship folder -> state as of the last refresh, to skip refreshing unchanged folders
+        self._checked: Dict[Path, _CheckedFolder] = {}
+        self._lock = threading.Lock()
+
+    def relationship_folder(self, parent_path: Path) -> Path:
+        parent_folder = parent_path.parent if parent_path.is_file() else parent_path
+        return parent_folder / self.child_class.relationship_name()
+
+    def index_path(self, parent_path: Path) -> Path:
+        return index_path_for_folder(self.relationship_folder(parent_path))
+
+    def summaries(self, parent_path: Path | None) -> List[Dict[str, Any]]:
+        """Get the summaries of all children of a parent, refreshing any stale index entries first."""
+        return [summary for _, summary in self.summaries_with_paths(parent_path)]
+
+    def summaries_with_paths(
+        self, parent_path: Path | None
+    ) -> List[Tuple[Path, Dict[str, Any]]]:
+        """Like summaries, but paired with the path of each child's file. Useful to load only a few full children after filtering summaries.
+
+        Sorted by child folder name, so the order is the same across refreshes and processes.
+        """
+        if parent_path is None:
+            # children are disk based. If not saved, they don't exist
+            return []
+
+        relationship_folder = self.relationship_folder(parent_path)
+        try:
+            if not self._refresh(relationship_folder):
+                return []
+            with closing(self._connect(relationship_folder)) as connection:
+                return [
+                    (self._child_path(relationship_folder, child), json.loads(summary))
+                    for child, summary in connection.execute(
+                        "SELECT child, summary FROM summaries WHERE name = ? ORDER BY child",
+                        (self.name,),
+                    )
+                ]
+        except sqlite3.Error as e:
+            logger.warning(
+                f"Summary index unavailable for {relationship_folder}, building summaries without it: {e}"
+            )
+            return [
+                (path, self.summarize(self._load_child(path)))
+                for _, path, _, _ in sorted(
+                    self._child_files_with_stats(relationship_folder)
+                )
+            ]
+
+    def query(
+        self,
+        parent_path: Path | None,
+        query: SummaryQuery,
+        after: List[Any] | None = None,
+        limit: int | None = None,
+        refresh: bool = True,
+    ) -> List[Tuple[List[Any], Path, Dict[str, Any]]]:
+        """Matching summaries, sorted, evaluated in sqlite. Only the returned rows are read into memory.
+
+        Args:
+            parent_path: Path of the parent model
+            query: Filters and sort order
+            after: A sort key returned by a previous query. Only summaries sorting after it are returned (keyset pagination).
+            limit: Maximum number of summaries to return
+            refresh: Refresh stale index entries first. Pass False when reading later pages of a result already refreshed.
+
+        Returns:
+            (sort key, child file path, summary) tuples. The sort key is the order_by values, then the child folder name.
+
+        Raises:
+            sqlite3.Error: If the index is unavailable. Callers can fall back to filtering summaries_with_paths.
+            ValueError: If after isn't a sort key for this query's order.
+        """
+        if parent_path is None:
+            return []
+        relationship_folder = self.relationship_folder(parent_path)
+        if refresh and not self._refresh(relationship_folder):
+            return []
+
+        sort_columns = [*query.order_by, "child"]
+        sql = f"SELECT {', '.join(sort_columns)}, summary FROM summaries WHERE name = ?"
+        params: List[Any] = [self.name]
+        for condition in query.where:
+            sql += f" AND ({condition})"
+        params.extend(query.params)
+        if after is not None:
+            if len(after) != len(sort_columns):
+                raise ValueError("Sort key doesn't match the query's sort order")
+            placeholders = ", ".join("?" for _ in after)
+            sql += f" AND ({', '.join(sort_columns)}) > ({placeholders})"
+            params.extend(after)
+        sql += f" ORDER BY {', '.join(sort_columns)}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with closing(self._connect(relationship_folder)) as connection:
+            return [
+                (
+                    list(row[:-1]),
+                    self._child_path(relationship_folder, row[-2]),
+                    json.loads(row[-1]),
+                )
+                for row in connection.execute(sql, params)
+            ]
+
+    def _child_path(self, relationship_folder: Path, child: str) -> Path:
+        return relationship_folder / child / self.child_class.base_filename()
+
+    def _load_child(self, path: Path) -> PT:
+        if self.deferred_fields:
+            return self.child_class.load_partial_from_file(path, self.deferred_fields)
+        return self.child_class.load_from_file(path, readonly=True)
+
+    def _child_files_with_stats(
+        self, relationship_folder: Path
+    ) -> Iterator[Tuple[str, Path, int, int]]:
+        # Yields (folder name, child file path, mtime_ns, size) for each child
+        base_filename = self.child_class.base_filename()
+        with os.scandir(relationship_folder) as entries:
+            for entry in entries:
+                # Hidden folders are staging folders, not children (see validate_and_save_with_subrelations)
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+                child_file = Path(entry.path) / base_filename
+                try:
+                    stat = child_file.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.name, child_file, stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self, relationship_folder: Path) -> bool:
+        """Bring the index up to date with the children on disk. Returns False if the relationship folder doesn't exist (no children)."""
+        try:
+            mtime_ns = relationship_folder.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if not relationship_folder.is_dir():
+            return False
+        # Read before refreshing: changes made while we refresh are picked up next time
+        cache = ModelCache.shared()
+        revision = cache.revision(relationship_folder)
+
+        with self._lock:
+            checked = self._checked.pop(relationship_folder, None)
+            if (
+                checked is not None
+                and checked.mtime_ns == mtime_ns
+                and time.monotonic() - checked.checked_at < RECHECK_SECONDS
+            ):
+                changes = cache.changes_since(relationship_folder, checked.revision)
+                if changes is not None:
+                    self._refresh_changed(relationship_folder, changes)
+                    checked.revision = revision
+                    self._checked[relationship_folder] = checked
+                    return True
+
+            checked_at = time.monotonic()
+            self._refresh_all(relationship_folder)
+            self._checked[relationship_folder] = _CheckedFolder(
+                mtime_ns=mtime_ns, revision=revision, checked_at=checked_at
+            )
+            return True
+
+    def _connect(self, relationship_folder: Path) -> sqlite3.Connection:
+        index_path = index_path_for_folder(relationship_folder)
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise sqlite3.OperationalError(f"Can't create index folder: {e}") from e
+        connection = sqlite3.connect(index_path, timeout=30)
+        for name, function in self.sql_functions.items():
+            connection.create_function(name, 1, function, deterministic=True)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "name TEXT NOT NULL, child TEXT NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, summary TEXT NOT NULL, PRIMARY KEY (name, child))"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+        )
+        return connection
+
+    def _refresh_all(self, relationship_folder: Path) -> None:
+        # Stat every child, and re-summarize those which are new or changed
+        children = self._child_files_with_stats(relationship_folder)
+        with closing(self._connect(relationship_folder)) as connection:
+            with connection:
+                self._check_version(connection)
+
+                indexed: Dict[str, Tuple[int, int]] = {
+                    child: (mtime_ns, size)
+                    for child, mtime_ns, size in connection.execute(
+                        "SELECT child, mtime_ns, size FROM summaries WHERE name = ?",
+                        (self.name,),
+                    )
+                }
+
+                updates: List[Tuple[str, str, int, int, str]] = []
+                for child, path, mtime_ns, size in children:
+                    if indexed.pop(child, None) == (mtime_ns, size):
+                        continue
+                    summary = self.summarize(self._load_child(path))
+                    updates.append(
+                        (self.name, child, mtime_ns, size, json.dumps(summary))
+                    )
+
+                if updates:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO summaries (name, child, mtime_ns, size, summary) VALUES (?, ?, ?, ?, ?)",
+                        updates,
+                    )
+                # Anything left in indexed was deleted from disk
+                if indexed:
+                    connection.executemany(
+                        "DELETE FROM summaries WHERE name = ? AND child = ?",
+                        [(self.name, child) for child in indexed],
+                    )
+
+    def _refresh_changed(self, relationship_folder: Path, changes: List[Path]) -> None:
+        # Re-check only the children this process changed since the last refresh
+        base_filename = self.child_class.base_filename()
+        changed = [path for path in changes if path.name == base_filename]
+        if not changed:
+            return
+        with closing(self._connect(relationship_folder)) as connection:
+            with connection:
+                for path in changed:
+                    child = path.parent.name
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        connection.execute(
+                            "DELETE FROM summaries WHERE name = ? AND child = ?",
+                            (self.name, child),
+                        )
+                        continue
+                    summary = self.summarize(self._load_child(path))
+                    connection.execute(
+                        "INSERT OR REPLACE INTO summaries (name, child, mtime_ns, size, summary) VALUES (?, ?, ?, ?, ?)",
+                        (
+                            self.name,
+                            child,
+                            stat.st_mtime_ns,
+                            stat.st_size,
+                            json.dumps(summary),
+                        ),
+                    )
+
+    def _check_version(self, connection: sqlite3.Connection) -> None:
+        row = connection.execute(
+            "SELECT version FROM versions WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is not None and row[0] == self.version:
+            return
+        connection.execute("DELETE FROM summaries WHERE name = ?", (self.name,))
+        connection.execute(
+            "INSERT OR REPLACE INTO versions (name, version) VALUES (?, ?)",
+            (self.name, self.version),
+        )
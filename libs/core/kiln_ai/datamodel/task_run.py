@@ -125,7 +125,10 @@ class TaskRun(KilnParentedModel):
         return self
 
     @model_validator(mode="after")
-    def validate_repaired_output(self) -> Self:
+    def validate_repaired_output(self, info: ValidationInfo) -> Self:
+        # Partially loaded, can't check consistency until repaired_output is loaded
+        if self.deferring_field("repaired_output", info):
+            return self
         if self.repaired_output is not None:
             if self.repaired_output.rating is not None:
                 raise ValueError(
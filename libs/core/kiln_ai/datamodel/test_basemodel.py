@@ -8,14 +8,27 @@ import pytest
 
 from kiln_ai.adapters.model_adapters.base_adapter import BaseAdapter
 from kiln_ai.adapters.run_output import RunOutput
-from kiln_ai.datamodel import Task, TaskRun
+from kiln_ai.datamodel import (
+    DataSource,
+    DataSourceType,
+    Project,
+    Task,
+    TaskOutput,
+    TaskRun,
+    basemodel,
+)
 from kiln_ai.datamodel.basemodel import (
+    DEFERRED_FIELD,
+    PARALLEL_LOAD_MIN_FILES,
     KilnBaseModel,
     KilnParentedModel,
+    shutdown_model_load_pool,
     string_to_valid_name,
+    write_file_atomic,
 )
 from kiln_ai.datamodel.model_cache import ModelCache
 from kiln_ai.datamodel.task import RunConfig
+from kiln_ai.utils.config import Config
 
 
 @pytest.fixture
@@ -255,6 +268,371 @@ def test_load_children(test_base_parented_file):
     assert all(child.model_type == "default_parented_model" for child in children)
 
 
+def test_load_children_listing_cached(test_base_parented_file, tmp_model_cache):
+    parent = BaseParentExample.load_from_file(test_base_parented_file)
+    child1 = DefaultParentedModel(parent=parent, name="Child1")
+    child1.save_to_file()
+
+    children = DefaultParentedModel.all_children_of_parent_path(test_base_parented_file)
+    assert [c.name for c in children] == ["Child1"]
+    relationship_folder = test_base_parented_file.parent / "children"
+    assert tmp_model_cache.get_children_paths(relationship_folder) == [child1.path]
+
+    # Warm listing doesn't check each child file
+    original_is_file = Path.is_file
+    with patch.object(
+        Path, "is_file", autospec=True, side_effect=original_is_file
+    ) as mock_is_file:
+        paths = list(
+            DefaultParentedModel.iterate_children_paths_of_parent_path(parent.path)
+        )
+    assert paths == [child1.path]
+    assert child1.path not in [call.args[0] for call in mock_is_file.call_args_list]
+
+    # New children are picked up
+    child2 = DefaultParentedModel(parent=parent, name="Child2")
+    child2.save_to_file()
+    children = DefaultParentedModel.all_children_of_parent_path(test_base_parented_file)
+    assert sorted(c.name for c in children) == ["Child1", "Child2"]
+
+    # Deleted children are removed, even if we trust the cache without stat (polling mode)
+    tmp_model_cache._poll_interval = 60
+    child1.delete()
+    children = DefaultParentedModel.all_children_of_parent_path(test_base_parented_file)
+    assert [c.name for c in children] == ["Child2"]
+
+
+@pytest.fixture
+def task_with_runs(tmp_path):
+    def _create(count):
+        project = Project(name="Test Project", path=tmp_path / "project.kiln")
+        project.save_to_file()
+        task = Task(name="Test Task", instruction="Test", parent=project)
+        task.save_to_file()
+        for i in range(count):
+            TaskRun(
+                parent=task,
+                input=f"input {i}",
+                input_source=DataSource(
+                    type=DataSourceType.human, properties={"created_by": "Tester"}
+                ),
+                output=TaskOutput(
+                    output=f"output {i}",
+                    source=DataSource(
+                        type=DataSourceType.human, properties={"created_by": "Tester"}
+                    ),
+                ),
+            ).save_to_file()
+        return task
+
+    return _create
+
+
+def test_all_children_parallel_load(task_with_runs, tmp_model_cache):
+    task = task_with_runs(PARALLEL_LOAD_MIN_FILES + 6)
+
+    runs = TaskRun.all_children_of_parent_path(task.path, max_workers=2)
+
+    assert len(runs) == PARALLEL_LOAD_MIN_FILES + 6
+    assert sorted(run.input for run in runs) == sorted(
+        f"input {i}" for i in range(PARALLEL_LOAD_MIN_FILES + 6)
+    )
+    assert all(run.path is not None for run in runs)
+    # Results from the workers populate the cache
+    assert len(tmp_model_cache.model_cache) >= len(runs)
+    for run in runs:
+        cached = tmp_model_cache.get_model(run.path, TaskRun, readonly=True)
+        assert cached is not None
+        assert cached.id == run.id
+
+    # Same result as serial loading
+    serial = TaskRun.all_children_of_parent_path(task.path, max_workers=0)
+    assert [run.id for run in serial] == [run.id for run in runs]
+
+
+def test_all_children_parallel_load_returns_copies(task_with_runs, tmp_model_cache):
+    task = task_with_runs(PARALLEL_LOAD_MIN_FILES)
+    with patch.object(Config, "shared") as mock_config:
+        mock_config.return_value.model_load_workers = 2
+        runs = TaskRun.all_children_of_parent_path(task.path)
+
+    run = runs[0]
+    cached = tmp_model_cache.get_model(run.path, TaskRun, readonly=True)
+    assert cached is not None
+    assert run is not cached
+    run.input = "edited"
+    run.tags.append("edited")
+    assert cached.input != "edited"
+    assert cached.tags == []
+
+    # Readonly callers get the cached instances
+    readonly_runs = TaskRun.all_children_of_parent_path(
+        task.path, readonly=True, max_workers=2
+    )
+    assert any(r is cached for r in readonly_runs)
+
+
+def test_model_load_pool_shutdown(task_with_runs, tmp_model_cache):
+    task = task_with_runs(PARALLEL_LOAD_MIN_FILES)
+    TaskRun.all_children_of_parent_path(task.path, max_workers=2)
+    pool = basemodel._model_load_pool
+    assert pool is not None
+    assert pool._mp_context.get_start_method() == "spawn"
+
+    shutdown_model_load_pool()
+    assert basemodel._model_load_pool is None
+    # Safe to call again, and the pool restarts when needed
+    shutdown_model_load_pool()
+    tmp_model_cache.clear()
+    runs = TaskRun.all_children_of_parent_path(task.path, max_workers=2)
+    assert len(runs) == PARALLEL_LOAD_MIN_FILES
+    assert basemodel._model_load_pool is not None
+    shutdown_model_load_pool()
+
+
+def test_all_children_parallel_load_skips_small_and_cached(
+    task_with_runs, tmp_model_cache
+):
+    task = task_with_runs(3)
+    with patch("kiln_ai.datamodel.basemodel._model_load_executor") as mock_executor:
+        runs = TaskRun.all_children_of_parent_path(task.path, max_workers=4)
+        mock_executor.assert_not_called()
+    assert len(runs) == 3
+
+    # Already cached files aren't sent to workers
+    with (
+        patch("kiln_ai.datamodel.basemodel._model_load_executor") as mock_executor,
+        patch("kiln_ai.datamodel.basemodel.PARALLEL_LOAD_MIN_FILES", 1),
+    ):
+        runs = TaskRun.all_children_of_parent_path(task.path, max_workers=4)
+        mock_executor.assert_not_called()
+    assert len(runs) == 3
+
+
+def test_all_children_workers_from_config(task_with_runs):
+    task = task_with_runs(2)
+    with (
+        patch("kiln_ai.datamodel.basemodel.PARALLEL_LOAD_MIN_FILES", 1),
+        patch.object(
+            TaskRun, "_parallel_load_uncached", return_value={}
+        ) as mock_parallel,
+        patch.object(Config, "shared") as mock_config,
+    ):
+        mock_config.return_value.model_load_workers = 3
+        runs = task.runs()
+    assert len(runs) == 2
+    mock_parallel.assert_called_once()
+    assert mock_parallel.call_args.args[1] == 3
+
+
+def save_repaired_run(task: Task) -> TaskRun:
+    source = DataSource(type=DataSourceType.human, properties={"created_by": "Tester"})
+    run = TaskRun(
+        parent=task,
+        input="input",
+        input_source=source,
+        output=TaskOutput(output="output", source=source),
+        intermediate_outputs={"chain_of_thought": "long thoughts"},
+        repair_instructions="fix it",
+        repaired_output=TaskOutput(output="fixed output", source=source),
+    )
+    run.save_to_file()
+    return run
+
+
+def test_load_partial_from_file(task_with_runs):
+    task = task_with_runs(0)
+    run = save_repaired_run(task)
+    deferred = {"intermediate_outputs", "repaired_output"}
+
+    with patch.object(
+        TaskRun, "model_validate", wraps=TaskRun.model_validate
+    ) as mock_validate:
+        partial = TaskRun.load_partial_from_file(run.path, deferred)
+    validated_data = mock_validate.call_args.args[0]
+    assert "intermediate_outputs" not in validated_data
+    assert "repaired_output" not in validated_data
+
+    assert partial.id == run.id
+    assert partial.repair_instructions == "fix it"
+    assert partial._deferred_fields == deferred
+    assert partial.__dict__["intermediate_outputs"] is DEFERRED_FIELD
+
+    # Deferred fields are loaded on first access
+    assert partial.intermediate_outputs == {"chain_of_thought": "long thoughts"}
+    assert partial._deferred_fields is None
+    assert partial.repaired_output is not None
+    assert partial.repaired_output.output == "fixed output"
+
+
+def test_load_partial_save_keeps_deferred_fields(task_with_runs):
+    task = task_with_runs(0)
+    run = save_repaired_run(task)
+
+    partial = TaskRun.load_partial_from_file(
+        run.path, {"intermediate_outputs", "repaired_output"}
+    )
+    partial.tags = ["new_tag"]
+    partial.save_to_file()
+
+    reloaded = TaskRun.load_from_file(run.path)
+    assert reloaded.tags == ["new_tag"]
+    assert reloaded.intermediate_outputs == {"chain_of_thought": "long thoughts"}
+    assert reloaded.repaired_output.output == "fixed output"
+
+
+def test_load_partial_dump_after_load_deferred(task_with_runs):
+    task = task_with_runs(0)
+    run = save_repaired_run(task)
+
+    partial = TaskRun.load_partial_from_file(run.path, {"intermediate_outputs"})
+    partial.load_deferred_fields()
+    assert partial.model_dump() == run.model_dump()
+
+
+def test_load_partial_null_deferred_field(task_with_runs):
+    task = task_with_runs(1)
+    run = task.runs()[0]
+
+    # Saved as null, loads as None
+    partial = TaskRun.load_partial_from_file(run.path, {"intermediate_outputs"})
+    assert partial.intermediate_outputs is None
+    assert partial._deferred_fields is None
+
+
+def test_load_partial_required_field_errors(task_with_runs):
+    task = task_with_runs(1)
+    run = task.runs()[0]
+
+    with pytest.raises(ValueError, match="Can only defer optional fields"):
+        TaskRun.load_partial_from_file(run.path, {"output"})
+    with pytest.raises(ValueError, match="Can only defer optional fields"):
+        TaskRun.load_partial_from_file(run.path, {"not_a_field"})
+
+
+def test_load_partial_uses_cached_model(task_with_runs, tmp_model_cache):
+    task = task_with_runs(1)
+    path = task.runs()[0].path
+    cached = TaskRun.load_from_file(path, readonly=True)
+
+    partial = TaskRun.load_partial_from_file(path, {"intermediate_outputs"})
+    assert partial is cached
+
+
+def test_load_partial_not_cached(task_with_runs, tmp_model_cache):
+    task = task_with_runs(1)
+    path = task.runs(readonly=True)[0].path
+    tmp_model_cache.clear()
+
+    TaskRun.load_partial_from_file(path, {"intermediate_outputs"})
+    assert tmp_model_cache.get_model(path, TaskRun) is None
+
+
+def test_copy_on_write_cache_hit(task_with_runs, tmp_model_cache):
+    task = task_with_runs(0)
+    path = save_repaired_run(task).path
+    cached = TaskRun.load_from_file(path, readonly=True)
+
+    run = TaskRun.load_from_file(path)
+    assert run is not cached
+    assert run == cached
+    # Mutable values are shared until first accessed
+    assert run.__dict__["output"] is cached.output
+    assert run._shared_fields >= {"output", "tags", "intermediate_outputs"}
+    assert "input" not in run._shared_fields
+
+    run.output.output = "changed"
+    run.tags.append("new_tag")
+    run.intermediate_outputs["chain_of_thought"] = "changed"
+    assert cached.output.output == "output"
+    assert cached.tags == []
+    assert cached.intermediate_outputs == {"chain_of_thought": "long thoughts"}
+    assert run.output.output == "changed"
+    assert run.tags == ["new_tag"]
+    assert "output" not in run._shared_fields
+
+
+def test_copy_on_write_assignment(task_with_runs, tmp_model_cache):
+    task = task_with_runs(1)
+    path = task.runs()[0].path
+    cached = TaskRun.load_from_file(path, readonly=True)
+
+    run = TaskRun.load_from_file(path)
+    run.tags = ["a"]
+    assert "tags" not in run._shared_fields
+    # Assigned values aren't copied on access
+    assert run.tags is run.tags
+    assert run.tags == ["a"]
+    assert cached.tags == []
+
+
+def test_copy_on_write_copies(task_with_runs, tmp_model_cache):
+    task = task_with_runs(1)
+    path = task.runs()[0].path
+    cached = TaskRun.load_from_file(path, readonly=True)
+    run = TaskRun.load_from_file(path)
+
+    # A shallow copy tracks shared values separately
+    shallow = run.model_copy()
+    run.tags.append("run_tag")
+    shallow.tags.append("shallow_tag")
+    assert run.tags == ["run_tag"]
+    assert shallow.tags == ["shallow_tag"]
+    assert cached.tags == []
+
+    # A deep copy shares nothing
+    deep = run.model_copy(deep=True)
+    assert not deep._shared_fields
+    assert deep.__dict__["output"] is not cached.output
+
+
+def test_copy_on_write_parent(task_with_runs, tmp_model_cache):
+    task = task_with_runs(1)
+    path = task.runs()[0].path
+    cached = TaskRun.load_from_file(path, readonly=True)
+    # Lazy loads the parent onto the cached instance
+    cached_parent = cached.parent
+    assert cached_parent is not None
+
+    run = TaskRun.load_from_file(path)
+    assert "parent" in run._shared_fields
+    run.parent.name = "Changed Task"
+    assert run.parent.name == "Changed Task"
+    assert cached.parent is cached_parent
+    assert cached_parent.name == "Test Task"
+    assert "parent" not in run._shared_fields
+
+
+def test_copy_on_write_equality(task_with_runs, tmp_model_cache):
+    task = task_with_runs(1)
+    path = task.runs()[0].path
+    cached = TaskRun.load_from_file(path, readonly=True)
+
+    run = TaskRun.load_from_file(path)
+    assert run._shared_fields
+    assert run == cached
+    assert cached == run
+    # Bookkeeping is a plain set, ignored by model equality
+    assert type(run._shared_fields) is set
+
+    run.tags.append("new_tag")
+    assert run != cached
+
+
+def test_copy_on_write_dump_and_save(task_with_runs, tmp_model_cache):
+    task = task_with_runs(1)
+    path = task.runs()[0].path
+    cached = TaskRun.load_from_file(path, readonly=True)
+
+    run = TaskRun.load_from_file(path)
+    assert run.model_dump() == cached.model_dump()
+    run.output.output = "saved change"
+    run.save_to_file()
+
+    assert TaskRun.load_from_file(path).output.output == "saved change"
+    assert cached.output.output == "output 0"
+
+
 def test_base_filename():
     model = DefaultParentedModel(name="Test")
     assert model.base_filename() == "default_parented_model.kiln"
@@ -298,6 +676,46 @@ def test_lazy_load_parent(tmp_path):
     assert loaded_child.cached_parent() is loaded_parent
 
 
+def test_save_to_file_atomic(tmp_path):
+    model = KilnBaseModel(path=tmp_path / "test.kiln")
+    model.save_to_file()
+    model.path.chmod(0o640)
+
+    with patch(
+        "kiln_ai.datamodel.basemodel.os.replace", side_effect=OSError("disk error")
+    ):
+        with pytest.raises(OSError, match="disk error"):
+            model.save_to_file()
+    # Failed write leaves the original file, and no temp files
+    assert KilnBaseModel.load_from_file(model.path).id == model.id
+    assert list(tmp_path.iterdir()) == [model.path]
+
+    model.save_to_file()
+    assert list(tmp_path.iterdir()) == [model.path]
+    # Permissions of the replaced file are kept
+    assert model.path.stat().st_mode & 0o777 == 0o640
+
+
+def test_write_file_atomic_fsync(tmp_path):
+    path = tmp_path / "file.txt"
+    with patch("kiln_ai.datamodel.basemodel.os.fsync") as mock_fsync:
+        write_file_atomic(path, "contents", fsync=True)
+    mock_fsync.assert_called_once()
+    assert path.read_text() == "contents"
+
+
+def test_serialize_for_save(tmp_path):
+    model = KilnBaseModel(path=tmp_path / "test.kiln")
+    path, json_data = model.serialize_for_save()
+    assert path == tmp_path / "test.kiln"
+    assert json.loads(json_data)["id"] == model.id
+    # Nothing written
+    assert not path.exists()
+
+    with pytest.raises(ValueError):
+        KilnBaseModel().serialize_for_save()
+
+
 def test_delete(tmp_path):
     # Test deleting a file
     file_path = tmp_path / "test.kiln"
@@ -463,14 +881,75 @@ def test_from_id_and_parent_path_with_cache(test_base_parented_file, tmp_model_c
     # Mock cache to verify it's used
     tmp_model_cache.get_model_id = MagicMock(return_value=child.id)
 
-    # Load again - should use cache
+    # Load again - should use the ID index, without checking each child's ID
     found_child = DefaultParentedModel.from_id_and_parent_path(
         child.id, test_base_parented_file
     )
 
     assert found_child is not None
     assert found_child.id == child.id
-    tmp_model_cache.get_model_id.assert_called()
+    tmp_model_cache.get_model_id.assert_not_called()
+
+
+def test_from_id_and_parent_path_uses_id_index(
+    test_base_parented_file, tmp_model_cache
+):
+    parent = BaseParentExample.load_from_file(test_base_parented_file)
+    children = [DefaultParentedModel(parent=parent, name=f"Child{i}") for i in range(5)]
+    for child in children:
+        child.save_to_file()
+
+    loaded_paths = []
+    original_load = DefaultParentedModel.load_from_file
+
+    def tracking_load(path, readonly=False):
+        loaded_paths.append(path)
+        return original_load(path, readonly=readonly)
+
+    with patch.object(
+        DefaultParentedModel, "load_from_file", side_effect=tracking_load
+    ):
+        found = DefaultParentedModel.from_id_and_parent_path(
+            children[3].id, test_base_parented_file
+        )
+
+    assert found.name == "Child3"
+    # Only the matching child is loaded
+    assert loaded_paths == [children[3].path]
+
+    # New children are found after the listing changes
+    new_child = DefaultParentedModel(parent=parent, name="New")
+    new_child.save_to_file()
+    found = DefaultParentedModel.from_id_and_parent_path(
+        new_child.id, test_base_parented_file
+    )
+    assert found.name == "New"
+
+
+def test_from_id_and_parent_path_renamed_folder(
+    test_base_parented_file, tmp_model_cache
+):
+    parent = BaseParentExample.load_from_file(test_base_parented_file)
+    child = DefaultParentedModel(parent=parent, name="Child")
+    child.save_to_file()
+    other = DefaultParentedModel(parent=parent, name="Other")
+    other.save_to_file()
+
+    # Folder name no longer encodes the ID: falls back to the in-file ID
+    renamed_folder = child.path.parent.parent / "renamed"
+    child.path.parent.rename(renamed_folder)
+    found = DefaultParentedModel.from_id_and_parent_path(
+        child.id, test_base_parented_file
+    )
+    assert found.path == renamed_folder / DefaultParentedModel.base_filename()
+
+    # Folder name encodes a different ID than the file: the in-file ID wins
+    misleading_folder = child.path.parent.parent / f"{other.id} - copy"
+    renamed_folder.rename(misleading_folder)
+    found = DefaultParentedModel.from_id_and_parent_path(
+        other.id, test_base_parented_file
+    )
+    assert found.name == "Other"
 
 
 def test_from_id_and_parent_path_without_parent():
@@ -1,11 +1,16 @@
+import json
+
+import jsonschema
 import pytest
 from pydantic import BaseModel
 
 from kiln_ai.datamodel.json_schema import (
     JsonObjectSchema,
+    compiled_schema,
     schema_from_json_str,
     string_to_json_key,
     validate_schema,
+    validate_schema_many,
 )
 
 
@@ -126,6 +131,125 @@ def test_triangle_schema():
         validate_schema({"a": 1, "b": 2, "c": "3"}, json_triangle_schema)
 
 
+def test_compiled_schema_cached():
+    assert compiled_schema(json_triangle_schema) is compiled_schema(
+        json_triangle_schema
+    )
+
+    # Parsed schemas are copies: callers can modify them
+    schema = schema_from_json_str(json_triangle_schema)
+    schema["additionalProperties"] = False
+    assert "additionalProperties" not in schema_from_json_str(json_triangle_schema)
+    assert "additionalProperties" not in compiled_schema(json_triangle_schema).schema
+
+    # Invalid schemas raise every time
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            compiled_schema("{asdf")
+
+
+def test_validate_schema_many():
+    errors = validate_schema_many(
+        [{"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 2}, {"a": 1, "b": 2, "c": 3.5}],
+        json_triangle_schema,
+    )
+    assert errors[0] is None
+    assert "'c' is a required property" in errors[1]
+    assert "3.5 is not of type 'integer'" in errors[2]
+
+    with pytest.raises(ValueError):
+        validate_schema_many([{}], "{asdf")
+
+
+simple_schema = json.dumps(
+    {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "title": "Name"},
+            "count": {"type": "integer", "minimum": 0, "maximum": 10},
+            "score": {"type": "number", "minimum": -1, "maximum": 1},
+            "flag": {"type": "boolean"},
+            "rating": {"enum": [1, 2, 3, "pass"]},
+            "anything": {"description": "no constraints"},
+        },
+        "required": ["name"],
+    }
+)
+
+
+@pytest.mark.parametrize(
+    "instance",
+    [
+        {"name": "a"},
+        {"name": "a", "count": 0, "score": 0.5, "flag": True, "rating": 2},
+        {"name": "a", "rating": "pass", "anything": [1, {"b": None}]},
+        {"name": "a", "extra": 1},
+        # Valid, but only the full validator accepts them
+        {"name": "a", "count": 3.0},
+        {"name": "a", "rating": 2.0},
+        # Invalid
+        {},
+        {"name": 1},
+        {"name": "a", "count": 11},
+        {"name": "a", "count": -1},
+        {"name": "a", "count": True},
+        {"name": "a", "score": 1.5},
+        {"name": "a", "score": "1"},
+        {"name": "a", "flag": 1},
+        {"name": "a", "rating": 4},
+        {"name": "a", "rating": True},
+        "not an object",
+        ["name"],
+    ],
+)
+def test_fast_path_matches_full_validator(instance):
+    compiled = compiled_schema(simple_schema)
+    assert compiled.fast_check is not None
+    full_validator_valid = jsonschema.Draft202012Validator(
+        json.loads(simple_schema)
+    ).is_valid(instance)
+
+    # The fast path only accepts valid instances
+    if compiled.fast_check(instance):
+        assert full_validator_valid
+    assert (compiled.error(instance) is None) == full_validator_valid
+    if not full_validator_valid:
+        with pytest.raises(ValueError, match="didn't meet the schema"):
+            validate_schema(instance, simple_schema)
+
+
+def test_fast_path_additional_properties():
+    schema = json.dumps(
+        {
+            "type": "object",
+            "properties": {"a": {"type": "string"}},
+            "additionalProperties": False,
+        }
+    )
+    assert compiled_schema(schema).fast_check({"a": "x"})
+    assert not compiled_schema(schema).fast_check({"a": "x", "b": 1})
+    with pytest.raises(ValueError):
+        validate_schema({"a": "x", "b": 1}, schema)
+
+
+@pytest.mark.parametrize(
+    "property_schema",
+    [
+        {"type": ["string", "null"]},
+        {"type": "array", "items": {"type": "string"}},
+        {"anyOf": [{"type": "integer"}, {"type": "null"}]},
+        {"type": "string", "pattern": "^a"},
+        {"type": "object", "properties": {}},
+    ],
+)
+def test_no_fast_path_for_complex_schemas(property_schema):
+    schema = json.dumps({"type": "object", "properties": {"a": property_schema}})
+    compiled = compiled_schema(schema)
+    assert compiled.fast_check is None
+    # Still validated by the full validator
+    validate_schema({}, schema)
+
+
 @pytest.mark.parametrize(
     "input_str,expected",
     [
@@ -1,3 +1,5 @@
+import threading
+import time
 from pathlib import Path
 from unittest import mock
 
@@ -56,6 +58,54 @@ def test_invalidate_model(model_cache, test_path):
     assert cached_model is None
 
 
+def test_revision(model_cache, tmp_path):
+    folder = tmp_path / "runs"
+    child_file = folder / "child" / "child.kiln"
+    assert model_cache.revision(folder) == 0
+
+    # Counted whether or not caching is enabled
+    model_cache.invalidate(child_file)
+    assert model_cache.revision(folder) == 1
+    model_cache.invalidate(folder / "child2" / "child.kiln")
+    assert model_cache.revision(folder) == 2
+    assert model_cache.revision(tmp_path / "other") == 0
+
+    # Clearing the cache doesn't mean the children changed
+    model_cache.clear()
+    assert model_cache.revision(folder) == 2
+
+
+def test_changes_since(model_cache, tmp_path):
+    folder = tmp_path / "runs"
+    child_a = folder / "a" / "child.kiln"
+    child_b = folder / "b" / "child.kiln"
+    assert model_cache.changes_since(folder, 0) == []
+
+    model_cache.invalidate(child_a)
+    model_cache.invalidate(child_b)
+    model_cache.invalidate(child_a)
+    assert model_cache.changes_since(folder, 0) == [child_a, child_b]
+    assert model_cache.changes_since(folder, 2) == [child_a]
+    assert model_cache.changes_since(folder, 3) == []
+
+    # A change to an unknown child: can't say what changed since before it
+    model_cache._record_change(folder, None)
+    assert model_cache.changes_since(folder, 3) is None
+    assert model_cache.changes_since(folder, 4) == []
+
+
+def test_changes_since_log_bounded(model_cache, tmp_path):
+    folder = tmp_path / "runs"
+    with mock.patch("libs.core.kiln_ai.datamodel.model_cache.MAX_CHANGE_LOG", 3):
+        for name in ["a", "b", "c", "d", "e"]:
+            model_cache.invalidate(folder / name / "child.kiln")
+    assert model_cache.revision(folder) == 5
+    assert model_cache.changes_since(folder, 1) is None
+    assert model_cache.changes_since(folder, 2) == [
+        folder / name / "child.kiln" for name in ["c", "d", "e"]
+    ]
+
+
 def test_clear_cache(model_cache, test_path):
     model = ModelTest(name="test", value=123)
     mtime = test_path.stat().st_mtime
@@ -266,3 +316,295 @@ def test_get_model_readonly(model_cache, test_path):
 
     # Both should have the same data
     assert readonly_model == copied_model == model
+
+
+@pytest.fixture
+def enabled_cache():
+    cache = ModelCache()
+    cache._enabled = True
+    return cache
+
+
+def make_test_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"model_{i}.kiln"
+        path.write_text("x" * 10)
+        paths.append(path)
+    return paths
+
+
+def test_lru_eviction_by_entries(enabled_cache, tmp_path):
+    enabled_cache.max_entries = 2
+    paths = make_test_files(tmp_path, 3)
+
+    for i, path in enumerate(paths[:2]):
+        enabled_cache.set_model(
+            path, ModelTest(name=str(i), value=i), path.stat().st_mtime_ns
+        )
+
+    # Touch the first entry so the second is least recently used
+    assert enabled_cache.get_model(paths[0], ModelTest) is not None
+
+    enabled_cache.set_model(
+        paths[2], ModelTest(name="2", value=2), paths[2].stat().st_mtime_ns
+    )
+
+    assert len(enabled_cache.model_cache) == 2
+    assert enabled_cache.get_model(paths[1], ModelTest) is None
+    assert enabled_cache.get_model(paths[0], ModelTest) is not None
+    assert enabled_cache.get_model(paths[2], ModelTest) is not None
+    assert enabled_cache.evictions == 1
+
+
+def test_lru_eviction_by_bytes(enabled_cache, tmp_path):
+    enabled_cache.max_bytes = 25
+    paths = make_test_files(tmp_path, 3)
+
+    for i, path in enumerate(paths):
+        enabled_cache.set_model(
+            path, ModelTest(name=str(i), value=i), path.stat().st_mtime_ns
+        )
+
+    # Each file is 10 bytes, only 2 fit
+    assert list(enabled_cache.model_cache.keys()) == paths[1:]
+    assert enabled_cache.estimated_bytes == 20
+    assert enabled_cache.evictions == 1
+
+
+def test_set_model_explicit_size(enabled_cache, test_path):
+    mtime_ns = test_path.stat().st_mtime_ns
+    enabled_cache.set_model(test_path, ModelTest(name="a", value=1), mtime_ns, 1234)
+    assert enabled_cache.estimated_bytes == 1234
+
+    # Replacing an entry doesn't double count
+    enabled_cache.set_model(test_path, ModelTest(name="a", value=1), mtime_ns, 100)
+    assert enabled_cache.estimated_bytes == 100
+
+    enabled_cache.invalidate(test_path)
+    assert enabled_cache.estimated_bytes == 0
+
+
+def test_single_oversized_entry_not_cached(enabled_cache, test_path):
+    enabled_cache.max_bytes = 10
+    mtime_ns = test_path.stat().st_mtime_ns
+    enabled_cache.set_model(test_path, ModelTest(name="a", value=1), mtime_ns, 11)
+    assert len(enabled_cache.model_cache) == 0
+    assert enabled_cache.estimated_bytes == 0
+
+
+def test_stats(enabled_cache, tmp_path):
+    enabled_cache.max_entries = 1
+    enabled_cache.max_bytes = 1000
+    paths = make_test_files(tmp_path, 2)
+
+    assert enabled_cache.get_model(paths[0], ModelTest) is None
+    enabled_cache.set_model(
+        paths[0], ModelTest(name="a", value=1), paths[0].stat().st_mtime_ns
+    )
+    assert enabled_cache.get_model(paths[0], ModelTest) is not None
+    enabled_cache.set_model(
+        paths[1], ModelTest(name="b", value=2), paths[1].stat().st_mtime_ns
+    )
+
+    stats = enabled_cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.evictions == 1
+    assert stats.entries == 1
+    assert stats.estimated_bytes == 10
+    assert stats.max_entries == 1
+    assert stats.max_bytes == 1000
+
+    enabled_cache.clear()
+    assert enabled_cache.stats().entries == 0
+    assert enabled_cache.stats().estimated_bytes == 0
+
+
+def test_stats_counted_across_threads(enabled_cache, tmp_path):
+    paths = make_test_files(tmp_path, 2)
+    enabled_cache.set_model(
+        paths[0], ModelTest(name="a", value=1), paths[0].stat().st_mtime_ns
+    )
+
+    def get_models():
+        for _ in range(500):
+            enabled_cache.get_model(paths[0], ModelTest, readonly=True)
+            enabled_cache.get_model(paths[1], ModelTest, readonly=True)
+
+    threads = [threading.Thread(target=get_models) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = enabled_cache.stats()
+    assert stats.hits == 8 * 500
+    assert stats.misses == 8 * 500
+
+
+def test_shared_uses_config_limits():
+    with (
+        mock.patch.object(ModelCache, "_shared_instance", None),
+        mock.patch("kiln_ai.datamodel.model_cache.Config.shared") as mock_config,
+    ):
+        mock_config.return_value.model_cache_max_entries = 10
+        mock_config.return_value.model_cache_max_bytes = 2000
+        mock_config.return_value.model_cache_poll_interval = None
+        cache = ModelCache.shared()
+        assert not cache.polling()
+        assert cache.max_entries == 10
+        assert cache.max_bytes == 2000
+
+
+def test_children_paths_cache(enabled_cache, tmp_path):
+    folder = tmp_path / "children"
+    folder.mkdir()
+    child = folder / "1" / "child.kiln"
+
+    assert enabled_cache.get_children_paths(folder) is None
+    enabled_cache.set_children_paths(folder, [child], [], folder.stat().st_mtime_ns)
+    assert enabled_cache.get_children_paths(folder) == [child]
+
+    enabled_cache.invalidate_children_paths(folder)
+    assert enabled_cache.get_children_paths(folder) is None
+
+
+def test_children_paths_cache_stale_folder_mtime(enabled_cache, tmp_path):
+    folder = tmp_path / "children"
+    folder.mkdir()
+    enabled_cache.set_children_paths(folder, [], [], folder.stat().st_mtime_ns - 1)
+
+    assert enabled_cache.get_children_paths(folder) is None
+    assert folder not in enabled_cache.children_cache
+
+
+def test_children_paths_cache_pending_child(enabled_cache, tmp_path):
+    folder = tmp_path / "children"
+    (folder / "1").mkdir(parents=True)
+    pending = folder / "1" / "child.kiln"
+    enabled_cache.set_children_paths(folder, [], [pending], folder.stat().st_mtime_ns)
+
+    assert enabled_cache.get_children_paths(folder) == []
+
+    # File written after listing, into an existing folder (doesn't change the parent folder mtime)
+    pending.write_text("{}")
+    assert enabled_cache.get_children_paths(folder) == [pending]
+    assert enabled_cache.children_cache[folder][1] == []
+
+
+def test_children_paths_cache_disabled(model_cache, tmp_path):
+    model_cache._enabled = False
+    model_cache.set_children_paths(tmp_path, [], [], tmp_path.stat().st_mtime_ns)
+    assert model_cache.get_children_paths(tmp_path) is None
+
+
+def test_child_path_by_id(enabled_cache, tmp_path):
+    folder = tmp_path / "children"
+    folder.mkdir()
+    named = folder / "123 - Named Child" / "child.kiln"
+    unnamed = folder / "456" / "child.kiln"
+
+    # No cached listing
+    assert enabled_cache.get_child_path_by_id(folder, "123") is None
+
+    enabled_cache.set_children_paths(
+        folder, [named, unnamed], [], folder.stat().st_mtime_ns
+    )
+    assert enabled_cache.get_child_path_by_id(folder, "123") == named
+    assert enabled_cache.get_child_path_by_id(folder, "456") == unnamed
+    assert enabled_cache.get_child_path_by_id(folder, "789") is None
+
+    # Index rebuilt when the listing changes
+    enabled_cache.set_children_paths(folder, [unnamed], [], folder.stat().st_mtime_ns)
+    assert enabled_cache.get_child_path_by_id(folder, "123") is None
+
+    enabled_cache.invalidate_children_paths(folder)
+    assert folder not in enabled_cache.children_id_index
+    assert enabled_cache.get_child_path_by_id(folder, "456") is None
+
+
+def test_child_path_by_id_pending_child(enabled_cache, tmp_path):
+    folder = tmp_path / "children"
+    (folder / "123 - Child").mkdir(parents=True)
+    pending = folder / "123 - Child" / "child.kiln"
+    enabled_cache.set_children_paths(folder, [], [pending], folder.stat().st_mtime_ns)
+
+    assert enabled_cache.get_child_path_by_id(folder, "123") is None
+    pending.write_text("{}")
+    assert enabled_cache.get_child_path_by_id(folder, "123") == pending
+
+
+def test_polling_skips_stat_on_get(enabled_cache, test_path):
+    model = ModelTest(name="test", value=123)
+    enabled_cache.set_model(test_path, model, test_path.stat().st_mtime_ns)
+    enabled_cache._poll_interval = 60
+
+    with mock.patch.object(
+        enabled_cache, "_is_cache_valid", side_effect=Exception("no stat")
+    ):
+        assert enabled_cache.get_model(test_path, ModelTest, readonly=True) is model
+
+
+def test_validate_all_invalidates_stale(enabled_cache, tmp_path):
+    paths = make_test_files(tmp_path, 2)
+    for path in paths:
+        enabled_cache.set_model(
+            path, ModelTest(name="a", value=1), path.stat().st_mtime_ns
+        )
+    fresh_folder = tmp_path / "fresh"
+    fresh_folder.mkdir()
+    stale_folder = tmp_path / "stale"
+    stale_folder.mkdir()
+    enabled_cache.set_children_paths(
+        fresh_folder, [], [], fresh_folder.stat().st_mtime_ns
+    )
+    enabled_cache.set_children_paths(stale_folder, [], [], 0)
+
+    paths[1].unlink()
+    enabled_cache.validate_all()
+
+    assert list(enabled_cache.model_cache.keys()) == [paths[0]]
+    assert list(enabled_cache.children_cache.keys()) == [fresh_folder]
+
+
+def test_start_and_stop_polling(enabled_cache, test_path):
+    enabled_cache.set_model(
+        test_path, ModelTest(name="test", value=123), test_path.stat().st_mtime_ns - 1
+    )
+    enabled_cache.start_polling(0.01)
+    assert enabled_cache.polling()
+
+    # Background poll removes the stale entry
+    for _ in range(200):
+        if test_path not in enabled_cache.model_cache:
+            break
+        time.sleep(0.01)
+    assert test_path not in enabled_cache.model_cache
+
+    enabled_cache.stop_polling()
+    assert not enabled_cache.polling()
+    assert enabled_cache._poll_thread is None
+
+
+def test_shared_starts_polling_from_config():
+    with (
+        mock.patch.object(ModelCache, "_shared_instance", None),
+        mock.patch("kiln_ai.datamodel.model_cache.Config.shared") as mock_config,
+        mock.patch.object(ModelCache, "start_polling") as mock_start_polling,
+    ):
+        mock_config.return_value.model_cache_poll_interval = 2.5
+        ModelCache.shared()
+        mock_start_polling.assert_called_once_with(2.5)
+
+
+@pytest.mark.parametrize("poll_interval", [None, 0, -1.0])
+def test_shared_ignores_invalid_poll_interval(poll_interval):
+    with (
+        mock.patch.object(ModelCache, "_shared_instance", None),
+        mock.patch("kiln_ai.datamodel.model_cache.Config.shared") as mock_config,
+        mock.patch.object(ModelCache, "start_polling") as mock_start_polling,
+    ):
+        mock_config.return_value.model_cache_poll_interval = poll_interval
+        ModelCache.shared()
+        mock_start_polling.assert_not_called()
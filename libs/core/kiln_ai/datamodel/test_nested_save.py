@@ -1,3 +1,7 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
 import pytest
 from pydantic import Field, ValidationError
 
@@ -138,7 +142,7 @@ def test_validate_without_saving(tmp_path):
     }
 
     # Validate the data without saving
-    ModelA._validate_nested(data, save=False)
+    ModelA._validate_nested(data)
 
     data = {
         "name": "ValidateOnly",
@@ -149,7 +153,7 @@ def test_validate_without_saving(tmp_path):
     }
 
     with pytest.raises(ValidationError):
-        ModelA._validate_nested(data, save=False)
+        ModelA._validate_nested(data)
 
 
 def test_validation_error_in_multiple_levels():
@@ -204,3 +208,106 @@ def test_validation_error_in_c_level_length():
         ModelA.validate_and_save_with_subrelations(data)
 
     assert "String should match pattern" in str(exc_info.value)
+
+
+def test_save_new_tree_atomic(tmp_path):
+    root_path = tmp_path / "project" / "model_a.kiln"
+    data = {
+        "name": "Root",
+        "bs": [{"value": 10, "cs": [{"code": "ABC"}]}],
+    }
+
+    with patch("kiln_ai.datamodel.basemodel.os.rename", wraps=os.rename) as mock_rename:
+        instance = ModelA.validate_and_save_with_subrelations(data, path=root_path)
+
+    # New tree is moved into place with a single rename of the staging folder
+    mock_rename.assert_called_once()
+    assert mock_rename.call_args.args[1] == root_path.parent
+    assert instance.path == root_path
+    assert [b.value for b in instance.bs()] == [10]
+    assert [c.code for c in instance.bs()[0].cs()] == ["ABC"]
+    # No staging folder left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["project"]
+
+
+def test_save_validation_error_writes_nothing(tmp_path):
+    root_path = tmp_path / "project" / "model_a.kiln"
+    data = {
+        "name": "Root",
+        "bs": [{"value": 10, "cs": [{"code": "ABC"}, {"code": "invalid"}]}],
+    }
+
+    with pytest.raises(ValidationError):
+        ModelA.validate_and_save_with_subrelations(data, path=root_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_merges_into_existing_folder(tmp_path):
+    root_path = tmp_path / "model_a.kiln"
+    instance = ModelA.validate_and_save_with_subrelations(
+        {"name": "Root", "bs": [{"value": 10}]}, path=root_path
+    )
+    existing_b = instance.bs()[0]
+
+    # Save more children into the existing tree
+    updated = ModelA.validate_and_save_with_subrelations(
+        {"id": instance.id, "name": "Renamed", "bs": [{"value": 20}]},
+        path=root_path,
+    )
+
+    assert updated.path == root_path
+    assert ModelA.load_from_file(root_path).name == "Renamed"
+    assert sorted(b.value for b in updated.bs()) == [10, 20]
+    assert ModelB.load_from_file(existing_b.path).value == 10
+    assert not any(p.name.endswith(".staging") for p in tmp_path.iterdir())
+
+
+def test_save_write_error_cleans_up(tmp_path):
+    root_path = tmp_path / "project" / "model_a.kiln"
+    data = {"name": "Root", "bs": [{"value": 10}]}
+
+    with patch(
+        "kiln_ai.datamodel.basemodel.os.rename", side_effect=OSError("disk error")
+    ):
+        with pytest.raises(OSError, match="disk error"):
+            ModelA.validate_and_save_with_subrelations(data, path=root_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_parallel_writers(tmp_path):
+    root_path = tmp_path / "project" / "model_a.kiln"
+    data = {
+        "name": "Root",
+        "bs": [
+            {"value": i, "cs": [{"code": "ABC"}, {"code": "DEF"}]} for i in range(20)
+        ],
+    }
+
+    with patch(
+        "kiln_ai.datamodel.basemodel.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+    ) as mock_executor:
+        instance = ModelA.validate_and_save_with_subrelations(
+            data, path=root_path, max_workers=4
+        )
+
+    mock_executor.assert_called_once_with(max_workers=4)
+    bs = instance.bs()
+    assert sorted(b.value for b in bs) == list(range(20))
+    assert all(len(b.cs()) == 2 for b in bs)
+
+
+def test_staging_folders_not_listed_as_children(tmp_path):
+    root_path = tmp_path / "model_a.kiln"
+    instance = ModelA.validate_and_save_with_subrelations(
+        {"name": "Root", "bs": [{"value": 10}]}, path=root_path
+    )
+    # Simulate an in progress save of a child
+    staging_folder = tmp_path / "bs" / ".123 - child.abc.staging"
+    staging_folder.mkdir()
+    (staging_folder / ModelB.base_filename()).write_text(
+        instance.bs()[0].model_dump_json()
+    )
+
+    assert [b.value for b in instance.bs()] == [10]
@@ -0,0 +1,307 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from kiln_ai.datamodel import DataSource, DataSourceType, Project, Task, TaskOutput
+from kiln_ai.datamodel.summary_index import (
+    INDEX_DIRNAME,
+    ChildSummaryIndex,
+    SummaryQuery,
+    index_path_for_folder,
+)
+from kiln_ai.datamodel.task_run import TaskRun
+
+
+@pytest.fixture
+def task(tmp_path):
+    project = Project(name="Test Project", path=tmp_path / "project.kiln")
+    project.save_to_file()
+    task = Task(name="Test Task", instruction="Test instruction", parent=project)
+    task.save_to_file()
+    return task
+
+
+def make_run(task: Task, input: str) -> TaskRun:
+    run = TaskRun(
+        parent=task,
+        input=input,
+        input_source=DataSource(
+            type=DataSourceType.human, properties={"created_by": "Tester"}
+        ),
+        output=TaskOutput(
+            output=f"output for {input}",
+            source=DataSource(
+                type=DataSourceType.human, properties={"created_by": "Tester"}
+            ),
+        ),
+    )
+    run.save_to_file()
+    return run
+
+
+def summarize(run: TaskRun):
+    return {"id": run.id, "input": run.input, "tags": run.tags}
+
+
+@pytest.fixture
+def index():
+    return ChildSummaryIndex(TaskRun, name="test_summary", summarize=summarize)
+
+
+def test_summaries_no_parent_path(index):
+    assert index.summaries(None) == []
+
+
+def test_summaries_no_children(index, task):
+    assert index.summaries(task.path) == []
+    # No relationship folder yet, so no index file created
+    assert not index.index_path(task.path).exists()
+
+
+def test_summaries_builds_index(index, task):
+    run1 = make_run(task, "a")
+    run2 = make_run(task, "b")
+
+    summaries = index.summaries(task.path)
+    assert sorted(summaries, key=lambda s: s["input"]) == [
+        {"id": run1.id, "input": "a", "tags": []},
+        {"id": run2.id, "input": "b", "tags": []},
+    ]
+    index_path = index.index_path(task.path)
+    assert index_path == index_path_for_folder(task.path.parent / "runs")
+    assert index_path.parent.name == INDEX_DIRNAME
+    assert index_path.exists()
+    # Nothing written to the project folder
+    assert sorted(
+        path.name for path in (task.path.parent / "runs").iterdir()
+    ) == sorted([run1.path.parent.name, run2.path.parent.name])
+
+
+def test_index_path_for_folder(tmp_path):
+    assert index_path_for_folder(tmp_path / "a") == index_path_for_folder(
+        tmp_path / "b" / ".." / "a"
+    )
+    assert index_path_for_folder(tmp_path / "a") != index_path_for_folder(
+        tmp_path / "b"
+    )
+
+
+def test_summaries_uses_index_when_fresh(index, task):
+    make_run(task, "a")
+    make_run(task, "b")
+    first = index.summaries(task.path)
+
+    with patch.object(TaskRun, "load_from_file") as mock_load:
+        second = index.summaries(task.path)
+        mock_load.assert_not_called()
+    assert second == first
+
+
+def test_summaries_incremental_update(index, task):
+    run1 = make_run(task, "a")
+    run2 = make_run(task, "b")
+    index.summaries(task.path)
+
+    run1.tags = ["changed_tag"]
+    run1.save_to_file()
+    run3 = make_run(task, "c")
+    run2.delete()
+
+    loaded_paths = []
+    original_load = TaskRun.load_from_file
+
+    def tracking_load(path, readonly=False):
+        loaded_paths.append(path)
+        return original_load(path, readonly=readonly)
+
+    with patch.object(TaskRun, "load_from_file", side_effect=tracking_load):
+        summaries = index.summaries(task.path)
+
+    # Only the new and changed runs were loaded
+    assert sorted(loaded_paths) == sorted([run1.path, run3.path])
+    by_id = {s["id"]: s for s in summaries}
+    assert set(by_id.keys()) == {run1.id, run3.id}
+    assert by_id[run1.id]["tags"] == ["changed_tag"]
+
+    # Deleted run removed from the index
+    with sqlite3.connect(index.index_path(task.path)) as connection:
+        count = connection.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+    assert count == 2
+
+
+def test_summaries_version_change_rebuilds(index, task):
+    make_run(task, "a")
+    index.summaries(task.path)
+
+    new_index = ChildSummaryIndex(
+        TaskRun,
+        name="test_summary",
+        summarize=lambda run: {"input_upper": run.input.upper()},
+        version=2,
+    )
+    assert new_index.summaries(task.path) == [{"input_upper": "A"}]
+
+
+def test_summaries_multiple_names_share_file(index, task):
+    make_run(task, "a")
+    other_index = ChildSummaryIndex(
+        TaskRun, name="other", summarize=lambda run: {"len": len(run.input)}
+    )
+
+    assert index.summaries(task.path)[0]["input"] == "a"
+    assert other_index.summaries(task.path) == [{"len": 1}]
+    assert index.summaries(task.path)[0]["input"] == "a"
+
+
+def test_summaries_fallback_when_index_unavailable(index, task):
+    run = make_run(task, "a")
+
+    with patch.object(
+        ChildSummaryIndex,
+        "_connect",
+        side_effect=sqlite3.OperationalError("readonly database"),
+    ):
+        summaries = index.summaries(task.path)
+
+    assert summaries == [{"id": run.id, "input": "a", "tags": []}]
+
+
+def test_summaries_deferred_fields(task):
+    run = make_run(task, "a")
+    index = ChildSummaryIndex(
+        TaskRun,
+        name="deferred",
+        summarize=summarize,
+        deferred_fields={"intermediate_outputs"},
+    )
+
+    with patch.object(
+        TaskRun, "load_partial_from_file", wraps=TaskRun.load_partial_from_file
+    ) as mock_load_partial:
+        summaries = index.summaries(task.path)
+
+    assert summaries == [{"id": run.id, "input": "a", "tags": []}]
+    mock_load_partial.assert_called_once_with(run.path, {"intermediate_outputs"})
+
+
+def test_summaries_with_paths(index, task):
+    run1 = make_run(task, "a")
+    run2 = make_run(task, "b")
+
+    # Same from the index, or when built directly
+    for _ in range(2):
+        results = sorted(
+            index.summaries_with_paths(task.path), key=lambda r: r[1]["input"]
+        )
+        assert [(path, summary["id"]) for path, summary in results] == [
+            (run1.path, run1.id),
+            (run2.path, run2.id),
+        ]
+
+
+def test_summaries_unchanged_folder_not_rechecked(index, task):
+    make_run(task, "a")
+    first = index.summaries(task.path)
+
+    with (
+        patch.object(ChildSummaryIndex, "_child_files_with_stats") as mock_scan,
+        patch.object(TaskRun, "load_from_file") as mock_load,
+    ):
+        assert index.summaries(task.path) == first
+    mock_scan.assert_not_called()
+    mock_load.assert_not_called()
+
+
+def test_summaries_only_changed_children_rechecked(index, task):
+    run1 = make_run(task, "a")
+    make_run(task, "b")
+    index.summaries(task.path)
+
+    # Edited in place: the runs folder mtime doesn't change
+    run1.tags = ["changed_tag"]
+    run1.save_to_file()
+    with (
+        patch.object(ChildSummaryIndex, "_child_files_with_stats") as mock_scan,
+        patch.object(
+            TaskRun, "load_from_file", wraps=TaskRun.load_from_file
+        ) as mock_load,
+    ):
+        summaries = index.summaries(task.path)
+    mock_scan.assert_not_called()
+    mock_load.assert_called_once_with(run1.path, readonly=True)
+    assert {s["input"]: s["tags"] for s in summaries} == {
+        "a": ["changed_tag"],
+        "b": [],
+    }
+
+    # The index file is updated too
+    assert {
+        s["input"]: s["tags"]
+        for s in ChildSummaryIndex(
+            TaskRun, name="test_summary", summarize=summarize
+        ).summaries(task.path)
+    } == {"a": ["changed_tag"], "b": []}
+
+
+def test_summaries_rechecked_after_interval(index, task):
+    make_run(task, "a")
+    index.summaries(task.path)
+
+    with patch("kiln_ai.datamodel.summary_index.RECHECK_SECONDS", 0):
+        with patch.object(
+            ChildSummaryIndex,
+            "_child_files_with_stats",
+            wraps=index._child_files_with_stats,
+        ) as mock_scan:
+            index.summaries(task.path)
+    mock_scan.assert_called_once()
+
+
+def test_query_filters_sorts_and_pages(index, task):
+    for input in ["b", "d", "a", "c"]:
+        make_run(task, input)
+    query = SummaryQuery(
+        where=["json_extract(summary, '$.input') != ?"],
+        params=["c"],
+        order_by=["json_extract(summary, '$.input')"],
+    )
+
+    results = index.query(task.path, query)
+    assert [summary["input"] for _, _, summary in results] == ["a", "b", "d"]
+    for sort_key, path, summary in results:
+        assert sort_key == [summary["input"], path.parent.name]
+        assert TaskRun.load_from_file(path).input == summary["input"]
+
+    first_page = index.query(task.path, query, limit=2)
+    assert [summary["input"] for _, _, summary in first_page] == ["a", "b"]
+    next_page = index.query(task.path, query, after=first_page[-1][0], limit=2)
+    assert [summary["input"] for _, _, summary in next_page] == ["d"]
+
+
+def test_query_sql_functions(task):
+    index = ChildSummaryIndex(
+        TaskRun,
+        name="test_summary",
+        summarize=summarize,
+        sql_functions={"test_reverse": lambda value: value[::-1]},
+    )
+    make_run(task, "ab")
+    make_run(task, "ba")
+    query = SummaryQuery(
+        where=["test_reverse(json_extract(summary, '$.input')) = ?"], params=["ab"]
+    )
+    assert [summary["input"] for _, _, summary in index.query(task.path, query)] == [
+        "ba"
+    ]
+
+
+def test_query_invalid_after(index, task):
+    make_run(task, "a")
+    with pytest.raises(ValueError):
+        index.query(task.path, SummaryQuery(order_by=["child"]), after=["x"])
+
+
+def test_query_no_children(index, task):
+    assert index.query(None, SummaryQuery()) == []
+    assert index.query(task.path, SummaryQuery()) == []
@@ -0,0 +1,158 @@
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from kiln_ai.datamodel.basemodel import KilnBaseModel
+from kiln_ai.datamodel.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def write_queue():
+    queue = WriteBehindQueue(fsync=False)
+    yield queue
+    queue.shutdown()
+
+
+def test_save_and_flush(write_queue, tmp_path):
+    models = [KilnBaseModel(path=tmp_path / f"{i}" / "test.kiln") for i in range(5)]
+    for model in models:
+        write_queue.save(model)
+    write_queue.flush()
+
+    assert write_queue.pending_count() == 0
+    for model in models:
+        assert KilnBaseModel.load_from_file(model.path).id == model.id
+
+
+def test_save_serializes_when_queued(write_queue, tmp_path):
+    model = KilnBaseModel(path=tmp_path / "test.kiln", created_by="before")
+    write_queue.save(model)
+    model.created_by = "after"
+    write_queue.flush()
+
+    assert json.loads(model.path.read_text())["created_by"] == "before"
+
+
+def test_save_without_path(write_queue):
+    with pytest.raises(ValueError, match="path"):
+        write_queue.save(KilnBaseModel())
+
+
+def test_save_coalesces_pending_writes(write_queue, tmp_path):
+    model = KilnBaseModel(path=tmp_path / "test.kiln")
+    written = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_write(path, json_data, fsync=False):
+        started.set()
+        release.wait()
+        written.append(json.loads(json_data)["created_by"])
+
+    with patch(
+        "kiln_ai.datamodel.write_behind.write_model_file", side_effect=blocking_write
+    ):
+        model.created_by = "first"
+        write_queue.save(model)
+        # Writer is busy with the first write, these are queued behind it
+        started.wait()
+        model.created_by = "second"
+        write_queue.save(model)
+        model.created_by = "third"
+        write_queue.save(model)
+        assert write_queue.pending_count() == 1
+        release.set()
+        write_queue.flush(timeout=5)
+
+    assert written == ["first", "third"]
+
+
+def test_flush_raises_write_errors(write_queue, tmp_path):
+    with patch(
+        "kiln_ai.datamodel.write_behind.write_model_file",
+        side_effect=OSError("disk full"),
+    ):
+        write_queue.save(KilnBaseModel(path=tmp_path / "test.kiln"))
+        with pytest.raises(OSError, match="disk full"):
+            write_queue.flush(timeout=5)
+
+    # Errors are only raised once
+    write_queue.flush(timeout=5)
+
+
+def test_batch_errors_only_raised_by_their_batch(write_queue, tmp_path):
+    failing = write_queue.batch()
+    other = write_queue.batch()
+    failing_path = tmp_path / "failing" / "test.kiln"
+
+    def write(path, json_data, fsync=False):
+        if path == failing_path:
+            raise OSError("disk full")
+
+    with patch("kiln_ai.datamodel.write_behind.write_model_file", side_effect=write):
+        failing.save(KilnBaseModel(path=failing_path))
+        other.save(KilnBaseModel(path=tmp_path / "other" / "test.kiln"))
+        # Another batch's error isn't ours, and isn't cleared by our flush
+        other.flush(timeout=5)
+        write_queue.flush(timeout=5)
+        with pytest.raises(OSError, match="disk full"):
+            failing.flush(timeout=5)
+        failing.flush(timeout=5)
+
+
+def test_batch_flush_waits_for_own_saves(write_queue, tmp_path):
+    release = threading.Event()
+    blocked_path = tmp_path / "blocked" / "test.kiln"
+
+    def write(path, json_data, fsync=False):
+        if path == blocked_path:
+            release.wait()
+
+    batch = write_queue.batch()
+    with patch("kiln_ai.datamodel.write_behind.write_model_file", side_effect=write):
+        batch.save(KilnBaseModel(path=blocked_path))
+        with pytest.raises(TimeoutError):
+            batch.flush(timeout=0.01)
+        # An empty batch doesn't wait for other batches
+        write_queue.batch().flush(timeout=0.01)
+        release.set()
+        batch.flush(timeout=5)
+
+
+def test_flush_timeout(write_queue, tmp_path):
+    release = threading.Event()
+    with patch(
+        "kiln_ai.datamodel.write_behind.write_model_file",
+        side_effect=lambda *args, **kwargs: release.wait(),
+    ):
+        write_queue.save(KilnBaseModel(path=tmp_path / "test.kiln"))
+        with pytest.raises(TimeoutError):
+            write_queue.flush(timeout=0.01)
+        release.set()
+        write_queue.flush(timeout=5)
+
+
+def test_shutdown_writes_pending(tmp_path):
+    write_queue = WriteBehindQueue(fsync=False)
+    model = KilnBaseModel(path=tmp_path / "test.kiln")
+    write_queue.save(model)
+    write_queue.shutdown()
+
+    assert model.path.exists()
+    with pytest.raises(ValueError, match="shut down"):
+        write_queue.save(model)
+
+
+def test_flush_empty_queue(write_queue):
+    write_queue.flush(timeout=1)
+
+
+def test_fsync_setting(tmp_path):
+    write_queue = WriteBehindQueue()
+    with patch("kiln_ai.datamodel.write_behind.write_model_file") as mock_write:
+        write_queue.save(KilnBaseModel(path=tmp_path / "test.kiln"))
+        write_queue.flush(timeout=5)
+    write_queue.shutdown()
+    assert mock_write.call_args.kwargs["fsync"] is True
@@ -0,0 +1,176 @@
+"""
+A write-behind queue for saving models off the calling thread (typically the asyncio event loop).
+
+ - The model is serialized when queued (cheap, and later in-memory edits don't change what's written). Only the disk I/O happens in the background.
+ - A single background thread writes queued files in batches, atomically (temp file + rename) and fsynced, so a crash never leaves a partial file.
+ - Multiple saves of the same path before it's written are coalesced: only the latest is written.
+ - Queued writes aren't visible on disk (or in listings) until written. Call flush() before reading back saved models, and on shutdown. The shared queue is also flushed at interpreter exit.
+ - Errors writing a file are logged, and raised from the next flush() of whoever queued it. Callers sharing the queue (eg concurrent eval runs) each save through their own WriteBatch, so they only wait for, and see errors from, their own saves.
+"""
+
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from kiln_ai.datamodel.basemodel import KilnBaseModel, write_model_file
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBatch:
+    """Saves queued by one caller of a shared WriteBehindQueue. Flushing a batch waits for, and raises errors from, only its own saves.
+
+    Create with WriteBehindQueue.batch().
+    """
+
+    def __init__(self, queue: "WriteBehindQueue"):
+        self._queue = queue
+        # Guarded by the queue's lock
+        self._queued_count = 0
+        self._written_count = 0
+        self._errors: List[Exception] = []
+
+    def save(self, model: KilnBaseModel) -> None:
+        """Queue a model to be saved, see WriteBehindQueue.save."""
+        self._queue.save(model, batch=self)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until everything this batch queued before this call is written to disk.
+
+        Raises:
+            TimeoutError: If the writes aren't complete within timeout seconds
+            Exception: The first error writing one of this batch's files since its last flush. Other files are still written.
+        """
+        self._queue._flush(self, timeout)
+
+
+class WriteBehindQueue:
+    _shared_instance = None
+
+    def __init__(self, fsync: bool = True):
+        self.fsync = fsync
+        # Path -> (JSON to write, batch which queued it). Insertion ordered, so files are written in the order first queued.
+        self._pending: Dict[Path, Tuple[str, WriteBatch]] = {}
+        # Saves made on the queue directly, rather than through a batch
+        self._default_batch = WriteBatch(self)
+        # Number of files written, and queued, by all batches. Flushing the queue waits until written catches up with queued.
+        self._queued_count = 0
+        self._written_count = 0
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    @classmethod
+    def shared(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+            atexit.register(cls._shared_instance.shutdown)
+        return cls._shared_instance
+
+    def batch(self) -> WriteBatch:
+        """A batch to save through, which tracks its own writes and errors."""
+        return WriteBatch(self)
+
+    def save(self, model: KilnBaseModel, batch: WriteBatch | None = None) -> None:
+        """Queue a model to be saved. Like save_to_file, but returns before the file is written.
+
+        Raises:
+            ValueError: If the path is not set, or the queue has been shut down
+        """
+        batch = batch or self._default_batch
+        path, json_data = model.serialize_for_save()
+        with self._condition:
+            if self._stopped:
+                raise ValueError("Write-behind queue has been shut down")
+            existing = self._pending.get(path)
+            if existing is not None:
+                # Coalesce with the write already queued. Counted as written now, as it will never be written on its own.
+                self._written_count += 1
+                existing[1]._written_count += 1
+            self._pending[path] = (json_data, batch)
+            self._queued_count += 1
+            batch._queued_count += 1
+            self._ensure_thread()
+            self._condition.notify_all()
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until everything queued before this call (by anyone) is written to disk.
+
+        Raises:
+            TimeoutError: If the writes aren't complete within timeout seconds
+            Exception: The first error writing a file saved directly on the queue (not through a batch) since the last flush. Other files are still written.
+        """
+        with self._condition:
+            target = self._queued_count
+            if not self._condition.wait_for(
+                lambda: self._written_count >= target, timeout=timeout
+            ):
+                raise TimeoutError("Timed out flushing write-behind queue")
+            errors, self._default_batch._errors = self._default_batch._errors, []
+        if errors:
+            raise errors[0]
+
+    def _flush(self, batch: WriteBatch, timeout: float | None) -> None:
+        with self._condition:
+            target = batch._queued_count
+            if not self._condition.wait_for(
+                lambda: batch._written_count >= target, timeout=timeout
+            ):
+                raise TimeoutError("Timed out flushing write-behind queue")
+            errors, batch._errors = batch._errors, []
+        if errors:
+            raise errors[0]
+
+    def shutdown(self) -> None:
+        """Write everything queued, and stop the background thread. Further saves raise."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._condition:
+            self._thread = None
+            errors, self._default_batch._errors = self._default_batch._errors, []
+        for error in errors:
+            logger.error(f"Error writing file from write-behind queue: {error}")
+
+    def _ensure_thread(self) -> None:
+        # Caller must hold the lock
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._write_loop, name="kiln-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopped)
+                if not self._pending:
+                    # Stopped, and everything is written
+                    return
+                pending, self._pending = self._pending, {}
+
+            written: List[Tuple[WriteBatch, Exception | None]] = []
+            for path, (json_data, batch) in pending.items():
+                try:
+                    write_model_file(path, json_data, fsync=self.fsync)
+                    written.append((batch, None))
+                except Exception as e:
+                    logger.exception(f"Error writing {path} from write-behind queue")
+                    written.append((batch, e))
+
+            with self._condition:
+                self._written_count += len(written)
+                for batch, error in written:
+                    batch._written_count += 1
+                    if error is not None:
+                        batch._errors.append(error)
+                self._condition.notify_all()
@@ -78,6 +78,26 @@ class Config:
                 str,
                 env_var="FIREWORKS_ACCOUNT_ID",
             ),
+            "model_cache_max_entries": ConfigProperty(
+                int,
+                env_var="KILN_MODEL_CACHE_MAX_ENTRIES",
+            ),
+            "model_cache_max_bytes": ConfigProperty(
+                int,
+                env_var="KILN_MODEL_CACHE_MAX_BYTES",
+                # Estimated from file size on disk. Parsed models are larger in memory.
+                default=1024 * 1024 * 1024,
+            ),
+            "model_cache_poll_interval": ConfigProperty(
+                float,
+                env_var="KILN_MODEL_CACHE_POLL_INTERVAL",
+            ),
+            # Processes used to parse large uncached child listings. Workers are spawned: apps embedding Kiln need a `__main__` guard, and multiprocessing.freeze_support() if frozen.
+            "model_load_workers": ConfigProperty(
+                int,
+                env_var="KILN_MODEL_LOAD_WORKERS",
+                default=0,
+            ),
             "projects": ConfigProperty(
                 list,
                 default_lambda=lambda: [],
@@ -91,6 +111,51 @@ class Config:
                 default_lambda=lambda: [],
                 sensitive_keys=["api_key"],
             ),
+            # Cache model responses on disk, and reuse them for identical requests. See response_cache.py.
+            "response_cache": ConfigProperty(
+                bool,
+                env_var="KILN_RESPONSE_CACHE",
+                default=False,
+            ),
+            "response_cache_max_bytes": ConfigProperty(
+                int,
+                env_var="KILN_RESPONSE_CACHE_MAX_BYTES",
+                default=256 * 1024 * 1024,
+            ),
+            # Identical model requests made at the same time share one call. See single_flight.py.
+            # Off by default: callers sharing a call get the same response rather than independent samples, and building the request key costs a prompt build per call.
+            "coalesce_requests": ConfigProperty(
+                bool,
+                env_var="KILN_COALESCE_REQUESTS",
+                default=False,
+            ),
+            # Limits of each base URL's shared HTTP connection pool. See http_client.py.
+            "http_max_connections": ConfigProperty(
+                int,
+                env_var="KILN_HTTP_MAX_CONNECTIONS",
+                default=100,
+            ),
+            "http_max_keepalive_connections": ConfigProperty(
+                int,
+                env_var="KILN_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+                default=20,
+            ),
+            "http_keepalive_expiry": ConfigProperty(
+                float,
+                env_var="KILN_HTTP_KEEPALIVE_EXPIRY",
+                default=30.0,
+            ),
+            # Concurrent calls to each provider, shared by all calls in this process. Queued calls are served by priority. See call_scheduler.py.
+            # Unset by default (no limit). When set, calls beyond it queue, even if a run asks for more concurrency.
+            "provider_max_concurrency": ConfigProperty(
+                int,
+                env_var="KILN_PROVIDER_MAX_CONCURRENCY",
+            ),
+            # Per provider ("openai") or provider/model ("openai/gpt_4o") limits, shared by all calls in this process. Eg: {"openai": {"requests_per_minute": 500, "tokens_per_minute": 200000}}. See rate_limiter.py.
+            "provider_rate_limits": ConfigProperty(
+                dict,
+                default_lambda=lambda: {},
+            ),
         }
         self._settings = self.load_settings()
 
@@ -0,0 +1,144 @@
+"""
+Shared HTTP connection pools for calls to model providers.
+
+Adapters are created per task run (and per eval, repair, data gen call), and each used to create its own HTTP client: a new connection, TLS handshake and (with no reuse) a cold pool for nearly every call. Instead, all provider HTTP traffic goes through one connection pool per base URL, shared by the whole process:
+
+ - Connections are kept alive and reused across adapters, eval jobs and runs.
+ - HTTP/2 is used where the server supports it, if the optional `h2` package is installed.
+ - Pool limits are tunable in settings: `http_max_connections`, `http_max_keepalive_connections` and `http_keepalive_expiry`. They apply to each base URL's pool.
+ - Clients made from the pool are cheap to create, and closing them doesn't close the shared pool. Call HttpClientPool.aclose() on shutdown to close pooled connections.
+
+httpx async connections belong to the event loop which opened them, so each pool keeps one transport per event loop.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+from kiln_ai.utils.config import Config
+
+# Requests without a base URL
+DEFAULT_POOL = ""
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def pool_key(base_url: str | httpx.URL | None) -> str:
+    """The pool a base URL's requests use: one per scheme, host and port."""
+    if not base_url:
+        return DEFAULT_POOL
+    parts = urlsplit(str(base_url))
+    if not parts.scheme or not parts.hostname:
+        return DEFAULT_POOL
+    port = f":{parts.port}" if parts.port else ""
+    return f"{parts.scheme}://{parts.hostname.lower()}{port}"
+
+
+class SharedAsyncTransport(httpx.AsyncBaseTransport):
+    """A pooled transport shared by many clients. Delegates to a transport per event loop.
+
+    Closing a client using it doesn't close the pool: see close().
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool):
+        self.limits = limits
+        self.http2 = http2
+        self._transports: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def connection_pools(self) -> int:
+        with self._lock:
+            return len(self._transports)
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(
+                    limits=self.limits, http2=self.http2
+                )
+                self._transports[loop] = transport
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # Called when a client using the shared pool is closed. The pool outlives it.
+        pass
+
+    async def close(self) -> None:
+        """Close this event loop's pooled connections."""
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+class HttpClientPool:
+    """Process-wide HTTP connection pools, one per base URL."""
+
+    _shared_instance = None
+
+    def __init__(self, limits: httpx.Limits | None = None, http2: bool | None = None):
+        # If not passed, read from settings (limits) and whether h2 is installed (http2)
+        self._limits = limits
+        self.http2 = http2_available() if http2 is None else http2
+        self._transports: Dict[str, SharedAsyncTransport] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared_instance is None:
+            cls._shared_instance = cls()
+        return cls._shared_instance
+
+    def limits(self) -> httpx.Limits:
+        if self._limits is not None:
+            return self._limits
+        config = Config.shared()
+        return httpx.Limits(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry,
+        )
+
+    def transport(
+        self, base_url: str | httpx.URL | None = None
+    ) -> SharedAsyncTransport:
+        """The shared transport for requests to base_url."""
+        key = pool_key(base_url)
+        with self._lock:
+            transport = self._transports.get(key)
+            if transport is None:
+                transport = SharedAsyncTransport(limits=self.limits(), http2=self.http2)
+                self._transports[key] = transport
+            return transport
+
+    def async_client(
+        self, base_url: str | httpx.URL | None = None, **kwargs: Any
+    ) -> httpx.AsyncClient:
+        """A new async client using the shared pool for base_url. Extra arguments are passed to httpx.AsyncClient.
+
+        Cheap to create and close: closing it doesn't close the pooled connections.
+        """
+        if base_url is not None:
+            kwargs["base_url"] = base_url
+        return httpx.AsyncClient(transport=self.transport(base_url), **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the current event loop's pooled connections. Clients keep working, opening new connections as needed."""
+        with self._lock:
+            transports = list(self._transports.values())
+        for transport in transports:
+            await transport.close()
@@ -0,0 +1,145 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from kiln_ai.utils.http_client import (
+    DEFAULT_POOL,
+    HttpClientPool,
+    SharedAsyncTransport,
+    pool_key,
+)
+
+
+@pytest.fixture
+def mock_transports():
+    """Replace the pooled network transports with mock transports, recording each created."""
+    created = []
+
+    def make_transport(**kwargs):
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"url": str(request.url)})
+        )
+        transport.kwargs = kwargs
+        created.append(transport)
+        return transport
+
+    with patch(
+        "kiln_ai.utils.http_client.httpx.AsyncHTTPTransport",
+        side_effect=make_transport,
+    ):
+        yield created
+
+
+@pytest.mark.parametrize(
+    "base_url,expected",
+    [
+        (None, DEFAULT_POOL),
+        ("", DEFAULT_POOL),
+        ("not a url", DEFAULT_POOL),
+        ("https://api.openai.com/v1", "https://api.openai.com"),
+        ("https://API.openai.com/v2/", "https://api.openai.com"),
+        ("http://localhost:11434", "http://localhost:11434"),
+        ("http://localhost:8080/v1", "http://localhost:8080"),
+        (httpx.URL("https://openrouter.ai/api/v1"), "https://openrouter.ai"),
+    ],
+)
+def test_pool_key(base_url, expected):
+    assert pool_key(base_url) == expected
+
+
+def test_limits_from_config():
+    with patch("kiln_ai.utils.http_client.Config.shared") as mock_shared:
+        mock_shared.return_value.http_max_connections = 10
+        mock_shared.return_value.http_max_keepalive_connections = 5
+        mock_shared.return_value.http_keepalive_expiry = 2.5
+        limits = HttpClientPool().limits()
+        assert limits.max_connections == 10
+        assert limits.max_keepalive_connections == 5
+        assert limits.keepalive_expiry == 2.5
+
+    # Defaults
+    limits = HttpClientPool().limits()
+    assert limits.max_connections == 100
+    assert limits.max_keepalive_connections == 20
+    assert limits.keepalive_expiry == 30.0
+
+    limits = httpx.Limits(max_connections=3)
+    assert HttpClientPool(limits=limits).limits() is limits
+
+
+def test_http2_only_if_available():
+    with patch("kiln_ai.utils.http_client.importlib.util.find_spec") as find_spec:
+        find_spec.return_value = None
+        assert HttpClientPool().http2 is False
+        find_spec.return_value = MagicMock()
+        assert HttpClientPool().http2 is True
+    assert HttpClientPool(http2=False).http2 is False
+
+
+def test_transport_per_base_url():
+    pool = HttpClientPool(http2=False)
+    openai = pool.transport("https://api.openai.com/v1")
+    assert isinstance(openai, SharedAsyncTransport)
+    assert pool.transport("https://api.openai.com/v1") is openai
+    assert pool.transport("https://api.openai.com") is openai
+    assert pool.transport("https://openrouter.ai/api/v1") is not openai
+    assert pool.transport() is pool.transport(None)
+
+
+async def test_clients_share_connection_pool(mock_transports):
+    pool = HttpClientPool(limits=httpx.Limits(max_connections=7), http2=False)
+    for _ in range(3):
+        async with pool.async_client("https://api.example.com/v1") as client:
+            response = await client.get("models")
+            assert response.json()["url"] == "https://api.example.com/v1/models"
+
+    # Closing clients didn't close the pool: one transport served them all
+    assert len(mock_transports) == 1
+    assert mock_transports[0].kwargs["limits"].max_connections == 7
+    assert mock_transports[0].kwargs["http2"] is False
+
+
+async def test_async_client_options(mock_transports):
+    pool = HttpClientPool(http2=False)
+    async with pool.async_client(timeout=12.0, headers={"X-Test": "1"}) as client:
+        assert client.timeout.read == 12.0
+        assert client.headers["X-Test"] == "1"
+        response = await client.get("https://api.example.com/ping")
+        assert response.status_code == 200
+
+
+def test_transport_per_event_loop(mock_transports):
+    pool = HttpClientPool(http2=False)
+
+    async def request():
+        async with pool.async_client("https://api.example.com") as client:
+            await client.get("/ping")
+
+    # Async connections can't be shared between event loops
+    asyncio.run(request())
+    asyncio.run(request())
+    assert len(mock_transports) == 2
+
+
+async def test_aclose(mock_transports):
+    pool = HttpClientPool(http2=False)
+    async with pool.async_client("https://api.example.com") as client:
+        await client.get("/ping")
+    transport = pool.transport("https://api.example.com")
+    assert transport.connection_pools() == 1
+
+    await pool.aclose()
+    assert transport.connection_pools() == 0
+
+    # Still usable after closing: opens a new pool
+    async with pool.async_client("https://api.example.com") as client:
+        response = await client.get("/ping")
+        assert response.status_code == 200
+    assert len(mock_transports) == 2
+    await pool.aclose()
+
+
+def test_shared():
+    assert HttpClientPool.shared() is HttpClientPool.shared()
@@ -18,7 +18,7 @@ def editable_prompt_from_id(project_id: str, task_id: str, prompt_id: str) -> Pr
             detail="Only custom prompts can be updated. Automatically frozen prompts can not be edited or deleted.",
         )
     id = prompt_id[4:]
-    prompt = next((p for p in parent_task.prompts() if p.id == id), None)
+    prompt = Prompt.from_id_and_parent_path(id, parent_task.path)
     if not prompt:
         raise HTTPException(status_code=404, detail="Prompt not found")
     return prompt
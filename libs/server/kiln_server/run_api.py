@@ -1,12 +1,21 @@
+import base64
+import bisect
+import json
+import logging
+import sqlite3
 from asyncio import Lock
 from datetime import datetime
-from typing import Any, Dict
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from kiln_ai.adapters.adapter_registry import adapter_for_task
 from kiln_ai.adapters.ml_model_list import ModelProviderName
 from kiln_ai.adapters.model_adapters.base_adapter import AdapterConfig
 from kiln_ai.datamodel import (
+    DataSourceType,
     PromptId,
     Task,
     TaskOutputRating,
@@ -14,10 +23,13 @@ from kiln_ai.datamodel import (
     TaskRun,
 )
 from kiln_ai.datamodel.basemodel import ID_TYPE
+from kiln_ai.datamodel.summary_index import ChildSummaryIndex, SummaryQuery
 from pydantic import BaseModel, ConfigDict
 
 from kiln_server.task_api import task_from_id
 
+logger = logging.getLogger(__name__)
+
 # Lock to prevent overwriting via concurrent updates. We use a load/update/write pattern that is not atomic.
 update_run_lock = Lock()
 
@@ -117,6 +129,274 @@ class RunSummary(BaseModel):
         )
 
 
+def _local_timestamp(value: str | None) -> float | None:
+    # Sortable timestamp of a created_at value from a summary, in sqlite queries. See _local_naive.
+    if value is None:
+        return None
+    return _local_naive(
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+    ).timestamp()
+
+
+# Persistent index of run summaries, so listing runs doesn't load every run on a cold start.
+# Bump the version if RunSummary.from_run changes, to rebuild existing indexes.
+run_summary_index = ChildSummaryIndex(
+    TaskRun,
+    name="run_summary",
+    summarize=lambda run: RunSummary.from_run(run).model_dump(mode="json"),
+    version=1,
+    # Not needed for summaries, and can be large. Skip parsing/validating them.
+    deferred_fields={"intermediate_outputs", "repaired_output"},
+    sql_functions={"kiln_local_timestamp": _local_timestamp},
+)
+
+# Summary fields, as sqlite expressions (see RunQuery.summary_query)
+_SQL_RATING = "json_extract(summary, '$.rating.value')"
+_SQL_CREATED_AT = "kiln_local_timestamp(json_extract(summary, '$.created_at'))"
+
+# Runs read from the index per query while streaming, so memory is bounded by this rather than the number of runs
+STREAM_PAGE_SIZE = 500
+
+
+class RunSortOrder(str, Enum):
+    created_at_asc = "created_at"
+    created_at_desc = "-created_at"
+    # Unrated runs are always sorted last
+    rating_asc = "rating"
+    rating_desc = "-rating"
+
+
+class RunQuery(BaseModel):
+    """Server side filters and sort order for listing runs. Evaluated against run summaries, so no runs need to be loaded."""
+
+    tags: list[str] = []
+    source: DataSourceType | None = None
+    rated: bool | None = None
+    min_rating: float | None = None
+    max_rating: float | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    sort: RunSortOrder = RunSortOrder.created_at_desc
+
+    def summary_query(self) -> SummaryQuery:
+        """The filters and sort order as a sqlite query of the summary index. Same results as matches and sort_key."""
+        query = SummaryQuery()
+        for tag in self.tags:
+            query.where.append(
+                "EXISTS (SELECT 1 FROM json_each(summary, '$.tags') WHERE json_each.value = ?)"
+            )
+            query.params.append(tag)
+        if self.source is not None:
+            query.where.append("json_extract(summary, '$.input_source') = ?")
+            query.params.append(self.source.value)
+        if self.rated is not None:
+            query.where.append(
+                f"{_SQL_RATING} IS NOT NULL" if self.rated else f"{_SQL_RATING} IS NULL"
+            )
+        if self.min_rating is not None:
+            query.where.append(f"{_SQL_RATING} >= ?")
+            query.params.append(self.min_rating)
+        if self.max_rating is not None:
+            query.where.append(f"{_SQL_RATING} <= ?")
+            query.params.append(self.max_rating)
+        if self.created_after is not None:
+            query.where.append(f"{_SQL_CREATED_AT} >= ?")
+            query.params.append(_local_naive(self.created_after).timestamp())
+        if self.created_before is not None:
+            query.where.append(f"{_SQL_CREATED_AT} < ?")
+            query.params.append(_local_naive(self.created_before).timestamp())
+
+        if self.sort == RunSortOrder.created_at_asc:
+            query.order_by = [_SQL_CREATED_AT]
+        elif self.sort == RunSortOrder.created_at_desc:
+            query.order_by = [f"-{_SQL_CREATED_AT}"]
+        elif self.sort == RunSortOrder.rating_asc:
+            query.order_by = [f"{_SQL_RATING} IS NULL", f"IFNULL({_SQL_RATING}, 0)"]
+        else:
+            query.order_by = [f"{_SQL_RATING} IS NULL", f"-IFNULL({_SQL_RATING}, 0)"]
+        return query
+
+    def matches(self, summary: RunSummary) -> bool:
+        if self.tags and not set(self.tags).issubset(summary.tags or []):
+            return False
+        if self.source is not None and summary.input_source != self.source:
+            return False
+        rating = summary.rating.value if summary.rating else None
+        if self.rated is not None and (rating is not None) != self.rated:
+            return False
+        if self.min_rating is not None and (rating is None or rating < self.min_rating):
+            return False
+        if self.max_rating is not None and (rating is None or rating > self.max_rating):
+            return False
+        created_at = _local_naive(summary.created_at)
+        if self.created_after is not None and created_at < _local_naive(
+            self.created_after
+        ):
+            return False
+        if self.created_before is not None and created_at >= _local_naive(
+            self.created_before
+        ):
+            return False
+        return True
+
+    def sort_key(self, summary: RunSummary, child: str) -> list[Any]:
+        # A JSON serializable key (used in cursors), the same as the summary index query's. Sorting is always ascending on the key, with the child folder name as a tie breaker.
+        created_at = _local_naive(summary.created_at).timestamp()
+        if self.sort == RunSortOrder.created_at_asc:
+            return [created_at, child]
+        if self.sort == RunSortOrder.created_at_desc:
+            return [-created_at, child]
+        rating = summary.rating.value if summary.rating else None
+        if rating is None:
+            return [1, 0, child]
+        if self.sort == RunSortOrder.rating_asc:
+            return [0, rating, child]
+        return [0, -rating, child]
+
+
+def _local_naive(value: datetime) -> datetime:
+    # Runs are saved with naive local times. Make any timezone aware values comparable to them.
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def run_query_params(
+    tags: list[str] = Query([]),
+    source: DataSourceType | None = None,
+    rated: bool | None = None,
+    min_rating: float | None = None,
+    max_rating: float | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    sort: RunSortOrder = RunSortOrder.created_at_desc,
+) -> RunQuery:
+    return RunQuery(
+        tags=tags,
+        source=source,
+        rated=rated,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        created_after=created_after,
+        created_before=created_before,
+        sort=sort,
+    )
+
+
+class RunSummaryPage(BaseModel):
+    runs: list[RunSummary]
+    # Pass as the cursor to get the next page. None if this is the last page.
+    next_cursor: str | None = None
+
+
+class RunPage(BaseModel):
+    runs: list[TaskRun]
+    # Pass as the cursor to get the next page. None if this is the last page.
+    next_cursor: str | None = None
+
+
+def query_run_summaries(
+    task: Task,
+    query: RunQuery,
+    after: list[Any] | None = None,
+    limit: int | None = None,
+    refresh: bool = True,
+) -> List[Tuple[list[Any], Path, RunSummary]]:
+    """Matching run summaries, sorted, after a sort key. Returns (sort key, run path, summary) tuples.
+
+    Filtered, sorted and limited in the summary index (sqlite), so only the returned summaries are read and validated.
+    """
+    try:
+        results = run_summary_index.query(
+            task.path, query.summary_query(), after=after, limit=limit, refresh=refresh
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    except sqlite3.Error as e:
+        logger.warning(f"Run summary index unavailable, filtering in memory: {e}")
+        return _query_run_summaries_unindexed(task, query, after, limit)
+    return [
+        (sort_key, path, RunSummary.model_validate(summary_data))
+        for sort_key, path, summary_data in results
+    ]
+
+
+def _query_run_summaries_unindexed(
+    task: Task, query: RunQuery, after: list[Any] | None, limit: int | None
+) -> List[Tuple[list[Any], Path, RunSummary]]:
+    # Fallback if the index can't be used: filter and sort every summary in memory
+    results = []
+    for path, summary_data in run_summary_index.summaries_with_paths(task.path):
+        summary = RunSummary.model_validate(summary_data)
+        if query.matches(summary):
+            results.append((query.sort_key(summary, path.parent.name), path, summary))
+    results.sort(key=lambda result: result[0])
+    start = 0
+    if after is not None:
+        keys = [result[0] for result in results]
+        try:
+            start = bisect.bisect_right(keys, after)
+        except TypeError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    end = None if limit is None else start + limit
+    return results[start:end]
+
+
+def iter_run_summaries(
+    task: Task, query: RunQuery
+) -> Iterator[Tuple[list[Any], Path, RunSummary]]:
+    """All matching run summaries, sorted. Read from the index a page at a time, so memory doesn't grow with the number of runs."""
+    after: list[Any] | None = None
+    refresh = True
+    while True:
+        page = query_run_summaries(
+            task, query, after=after, limit=STREAM_PAGE_SIZE, refresh=refresh
+        )
+        yield from page
+        if len(page) < STREAM_PAGE_SIZE:
+            return
+        after = page[-1][0]
+        # Later pages continue the same listing
+        refresh = False
+
+
+def encode_cursor(query: RunQuery, sort_key: list[Any]) -> str:
+    data = json.dumps({"sort": query.sort.value, "key": sort_key})
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(query: RunQuery, cursor: str) -> list[Any]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        sort = data["sort"]
+        sort_key = data["key"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if sort != query.sort.value or not isinstance(sort_key, list):
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor does not match the sort order of this request.",
+        )
+    return sort_key
+
+
+def page_run_summaries(
+    task: Task, query: RunQuery, limit: int, cursor: str | None
+) -> Tuple[List[Tuple[list[Any], Path, RunSummary]], str | None]:
+    """A page of matching run summaries, and the cursor for the next page.
+
+    Cursors hold the sort key of the last item returned (keyset pagination), so pages stay consistent as runs are added or removed.
+    """
+    after = decode_cursor(query, cursor) if cursor is not None else None
+    # One extra, to know if there's a next page
+    results = query_run_summaries(task, query, after=after, limit=limit + 1)
+    page = results[:limit]
+    next_cursor = None
+    if len(results) > limit:
+        next_cursor = encode_cursor(query, page[-1][0])
+    return page, next_cursor
+
+
 def run_from_id(project_id: str, task_id: str, run_id: str) -> TaskRun:
     task, run = task_and_run_from_id(project_id, task_id, run_id)
     return run
@@ -137,6 +417,47 @@ def task_and_run_from_id(
 
 
 def connect_run_api(app: FastAPI):
+    # Registered before /runs/{run_id}, so "page" and "stream" aren't matched as run IDs
+    @app.get("/api/projects/{project_id}/tasks/{task_id}/runs/page")
+    async def get_runs_page(
+        project_id: str,
+        task_id: str,
+        query: RunQuery = Depends(run_query_params),
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: str | None = None,
+    ) -> RunPage:
+        task = task_from_id(project_id, task_id)
+        page, next_cursor = page_run_summaries(task, query, limit, cursor)
+        # Filtered and sorted with summaries, only the page of runs is loaded
+        runs = []
+        for _, path, _ in page:
+            try:
+                runs.append(TaskRun.load_from_file(path, readonly=True))
+            except FileNotFoundError:
+                # Deleted since listed
+                continue
+        return RunPage(runs=runs, next_cursor=next_cursor)
+
+    @app.get("/api/projects/{project_id}/tasks/{task_id}/runs/stream")
+    async def stream_runs(
+        project_id: str,
+        task_id: str,
+        query: RunQuery = Depends(run_query_params),
+    ) -> StreamingResponse:
+        task = task_from_id(project_id, task_id)
+
+        # Newline delimited JSON, one run per line. Runs are listed a page at a time, and loaded one at a time as the response is sent.
+        def run_lines() -> Iterator[str]:
+            for _, path, _ in iter_run_summaries(task, query):
+                try:
+                    run = TaskRun.load_from_file(path, readonly=True)
+                except FileNotFoundError:
+                    # Deleted since listed
+                    continue
+                yield run.model_dump_json() + "\n"
+
+        return StreamingResponse(content=run_lines(), media_type="application/x-ndjson")
+
     @app.get("/api/projects/{project_id}/tasks/{task_id}/runs/{run_id}")
     async def get_run(project_id: str, task_id: str, run_id: str) -> TaskRun:
         return run_from_id(project_id, task_id, run_id)
@@ -154,13 +475,41 @@ def connect_run_api(app: FastAPI):
     @app.get("/api/projects/{project_id}/tasks/{task_id}/runs_summaries")
     async def get_runs_summary(project_id: str, task_id: str) -> list[RunSummary]:
         task = task_from_id(project_id, task_id)
-        # Readonly since we are not mutating the runs. Faster as we don't need to copy them.
-        runs = task.runs(readonly=True)
-        run_summaries: list[RunSummary] = []
-        for run in runs:
-            summary = RunSummary.from_run(run)
-            run_summaries.append(summary)
-        return run_summaries
+        # Summaries come from the on-disk index, only loading runs which are new or changed since last indexed.
+        return [
+            RunSummary.model_validate(summary)
+            for summary in run_summary_index.summaries(task.path)
+        ]
+
+    @app.get("/api/projects/{project_id}/tasks/{task_id}/runs_summaries/page")
+    async def get_runs_summary_page(
+        project_id: str,
+        task_id: str,
+        query: RunQuery = Depends(run_query_params),
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: str | None = None,
+    ) -> RunSummaryPage:
+        task = task_from_id(project_id, task_id)
+        page, next_cursor = page_run_summaries(task, query, limit, cursor)
+        return RunSummaryPage(
+            runs=[summary for _, _, summary in page], next_cursor=next_cursor
+        )
+
+    @app.get("/api/projects/{project_id}/tasks/{task_id}/runs_summaries/stream")
+    async def stream_runs_summary(
+        project_id: str,
+        task_id: str,
+        query: RunQuery = Depends(run_query_params),
+    ) -> StreamingResponse:
+        task = task_from_id(project_id, task_id)
+
+        def summary_lines() -> Iterator[str]:
+            for _, _, summary in iter_run_summaries(task, query):
+                yield summary.model_dump_json() + "\n"
+
+        return StreamingResponse(
+            content=summary_lines(), media_type="application/x-ndjson"
+        )
 
     @app.post("/api/projects/{project_id}/tasks/{task_id}/runs/delete")
     async def delete_runs(project_id: str, task_id: str, run_ids: list[str]):
@@ -3,6 +3,7 @@ import os
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from kiln_ai.datamodel.model_cache import ModelCache, ModelCacheStats
 
 from .custom_errors import connect_custom_errors
 from .project_api import connect_project_api
@@ -23,6 +24,10 @@ def make_app(lifespan=None):
     def ping():
         return "pong"
 
+    @app.get("/api/model_cache/stats")
+    def model_cache_stats() -> ModelCacheStats:
+        return ModelCache.shared().stats()
+
     connect_project_api(app)
     connect_task_api(app)
     connect_prompt_api(app)
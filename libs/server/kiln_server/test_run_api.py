@@ -1,3 +1,6 @@
+import json
+import sqlite3
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -23,6 +26,7 @@ from kiln_server.run_api import (
     deep_update,
     model_provider_from_string,
     run_from_id,
+    run_summary_index,
 )
 
 
@@ -740,9 +744,7 @@ async def test_get_runs_summaries_success(client, task_run_setup):
     task_run = task_run_setup["task_run"]
 
     with patch("kiln_server.run_api.task_from_id") as mock_task_from_id:
-        mock_task = MagicMock()
-        mock_task.runs.return_value = [task_run]
-        mock_task_from_id.return_value = mock_task
+        mock_task_from_id.return_value = task
 
         response = client.get(
             f"/api/projects/{project.id}/tasks/{task.id}/runs_summaries"
@@ -764,6 +766,329 @@ async def test_get_runs_summaries_success(client, task_run_setup):
     assert result[0]["input_source"] == task_run.input_source.type
 
 
+@pytest.mark.asyncio
+async def test_get_runs_summaries_uses_index(client, task_run_setup):
+    project = task_run_setup["project"]
+    task = task_run_setup["task"]
+    task_run = task_run_setup["task_run"]
+    url = f"/api/projects/{project.id}/tasks/{task.id}/runs_summaries"
+
+    with patch("kiln_server.run_api.task_from_id") as mock_task_from_id:
+        mock_task_from_id.return_value = task
+        first = client.get(url).json()
+        assert run_summary_index.index_path(task.path).exists()
+        # Nothing written to the project folder
+        assert not list((task.path.parent / "runs").glob(".*"))
+
+        # Second request is served from the index, without loading runs
+        with patch.object(
+            TaskRun, "load_from_file", side_effect=Exception("should not load")
+        ):
+            second = client.get(url).json()
+        assert second == first
+
+        # Changing a run updates its summary
+        task_run.tags = ["updated"]
+        task_run.save_to_file()
+        third = client.get(url).json()
+
+    assert len(third) == 1
+    assert third[0]["id"] == task_run.id
+    assert third[0]["tags"] == ["updated"]
+
+
+@pytest.fixture
+def query_runs(tmp_path):
+    project = Project(name="Test Project", path=tmp_path / "project.kiln")
+    project.save_to_file()
+    task = Task(name="Test Task", instruction="Test", parent=project)
+    task.save_to_file()
+
+    # (rating, tags, input source, day of month)
+    specs = [
+        (5.0, ["a", "b"], DataSourceType.human, 1),
+        (None, ["a"], DataSourceType.synthetic, 2),
+        (3.0, [], DataSourceType.human, 3),
+        (1.0, ["b"], DataSourceType.synthetic, 4),
+        (4.0, ["a"], DataSourceType.human, 5),
+    ]
+    runs = []
+    for rating, tags, source_type, day in specs:
+        source = DataSource(
+            type=source_type,
+            properties={"created_by": "Tester"}
+            if source_type == DataSourceType.human
+            else {
+                "model_name": "gpt_4o",
+                "model_provider": "openai",
+                "adapter_name": "test_adapter",
+            },
+        )
+        run = TaskRun(
+            parent=task,
+            input=f"input {day}",
+            input_source=source,
+            tags=tags,
+            created_at=datetime(2024, 1, day, 12, 0, 0),
+            output=TaskOutput(
+                output=f"output {day}",
+                source=source,
+                rating=TaskOutputRating(value=rating) if rating is not None else None,
+            ),
+        )
+        run.save_to_file()
+        runs.append(run)
+
+    with patch("kiln_server.run_api.task_from_id") as mock_task_from_id:
+        mock_task_from_id.return_value = task
+        yield task, runs
+
+
+def summary_inputs(summaries):
+    return [summary["input_preview"] for summary in summaries]
+
+
+def test_run_query_filters(client, query_runs):
+    url = "/api/projects/project1/tasks/task1/runs_summaries/page"
+
+    def inputs(params):
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        return summary_inputs(response.json()["runs"])
+
+    # Default sort is newest first
+    assert inputs({}) == ["input 5", "input 4", "input 3", "input 2", "input 1"]
+    assert inputs({"tags": ["a"]}) == ["input 5", "input 2", "input 1"]
+    assert inputs({"tags": ["a", "b"]}) == ["input 1"]
+    assert inputs({"source": "synthetic"}) == ["input 4", "input 2"]
+    assert inputs({"rated": False}) == ["input 2"]
+    assert inputs({"min_rating": 3, "max_rating": 4}) == ["input 5", "input 3"]
+    assert inputs(
+        {"created_after": "2024-01-02T00:00:00", "created_before": "2024-01-04"}
+    ) == ["input 3", "input 2"]
+
+
+def test_run_query_sort(client, query_runs):
+    url = "/api/projects/project1/tasks/task1/runs_summaries/page"
+
+    def inputs(sort):
+        response = client.get(url, params={"sort": sort})
+        assert response.status_code == 200
+        return summary_inputs(response.json()["runs"])
+
+    assert inputs("created_at") == [
+        "input 1",
+        "input 2",
+        "input 3",
+        "input 4",
+        "input 5",
+    ]
+    # Unrated last in both directions
+    assert inputs("-rating") == ["input 1", "input 5", "input 3", "input 4", "input 2"]
+    assert inputs("rating") == ["input 4", "input 3", "input 5", "input 1", "input 2"]
+    assert client.get(url, params={"sort": "invalid"}).status_code == 422
+
+
+def test_runs_summaries_page_cursor(client, query_runs):
+    url = "/api/projects/project1/tasks/task1/runs_summaries/page"
+    task, runs = query_runs
+
+    first = client.get(url, params={"limit": 2, "sort": "created_at"}).json()
+    assert summary_inputs(first["runs"]) == ["input 1", "input 2"]
+    assert first["next_cursor"] is not None
+
+    # Removing a run already returned doesn't shift later pages
+    runs[0].delete()
+    second = client.get(
+        url, params={"limit": 2, "sort": "created_at", "cursor": first["next_cursor"]}
+    ).json()
+    assert summary_inputs(second["runs"]) == ["input 3", "input 4"]
+
+    third = client.get(
+        url, params={"limit": 2, "sort": "created_at", "cursor": second["next_cursor"]}
+    ).json()
+    assert summary_inputs(third["runs"]) == ["input 5"]
+    assert third["next_cursor"] is None
+
+
+def test_runs_summaries_page_invalid_cursor(client, query_runs):
+    url = "/api/projects/project1/tasks/task1/runs_summaries/page"
+    response = client.get(url, params={"cursor": "not a cursor"})
+    assert response.status_code == 400
+
+    # Cursor from a different sort order
+    cursor = client.get(url, params={"limit": 1, "sort": "rating"}).json()[
+        "next_cursor"
+    ]
+    response = client.get(url, params={"cursor": cursor, "sort": "created_at"})
+    assert response.status_code == 400
+    assert "sort order" in response.json()["message"]
+
+    assert client.get(url, params={"limit": 0}).status_code == 422
+
+
+def test_runs_page(client, query_runs):
+    task, runs = query_runs
+    url = "/api/projects/project1/tasks/task1/runs/page"
+
+    loaded_paths = []
+    original_load = TaskRun.load_from_file
+
+    def tracking_load(path, readonly=False):
+        loaded_paths.append(path)
+        return original_load(path, readonly=readonly)
+
+    # Index built on first use
+    client.get(url)
+    with patch.object(TaskRun, "load_from_file", side_effect=tracking_load):
+        response = client.get(url, params={"limit": 2, "tags": ["a"]})
+
+    assert response.status_code == 200
+    page = response.json()
+    assert [run["id"] for run in page["runs"]] == [runs[4].id, runs[1].id]
+    assert page["runs"][0]["intermediate_outputs"] is None
+    assert page["next_cursor"] is not None
+    # Only the page of runs is loaded
+    assert sorted(loaded_paths) == sorted([runs[4].path, runs[1].path])
+
+
+def test_runs_page_skips_deleted_runs(client, query_runs):
+    task, runs = query_runs
+    url = "/api/projects/project1/tasks/task1/runs/page"
+    original_load = TaskRun.load_from_file
+
+    def load_or_deleted(path, readonly=False):
+        # Deleted between the summary query and loading the page
+        if path == runs[3].path:
+            raise FileNotFoundError(path)
+        return original_load(path, readonly=readonly)
+
+    with patch.object(TaskRun, "load_from_file", side_effect=load_or_deleted):
+        response = client.get(url, params={"limit": 3})
+
+    assert response.status_code == 200
+    page = response.json()
+    assert [run["id"] for run in page["runs"]] == [runs[4].id, runs[2].id]
+    assert page["next_cursor"] is not None
+
+
+def test_runs_stream(client, query_runs):
+    task, runs = query_runs
+    response = client.get(
+        "/api/projects/project1/tasks/task1/runs/stream",
+        params={"sort": "created_at", "source": "human"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [
+        runs[0].id,
+        runs[2].id,
+        runs[4].id,
+    ]
+
+
+def test_runs_summaries_stream(client, query_runs):
+    response = client.get(
+        "/api/projects/project1/tasks/task1/runs_summaries/stream",
+        params={"min_rating": 4},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    summaries = [json.loads(line) for line in response.text.splitlines()]
+    assert summary_inputs(summaries) == ["input 5", "input 1"]
+
+
+def test_runs_summaries_page_validates_only_page(client, query_runs):
+    url = "/api/projects/project1/tasks/task1/runs_summaries/page"
+    # Index built on first use
+    client.get(url)
+
+    with (
+        patch.object(
+            RunSummary, "model_validate", wraps=RunSummary.model_validate
+        ) as mock_validate,
+        patch.object(run_summary_index, "summaries_with_paths") as mock_all,
+    ):
+        response = client.get(url, params={"limit": 2, "sort": "rating"})
+
+    assert response.status_code == 200
+    assert summary_inputs(response.json()["runs"]) == ["input 4", "input 3"]
+    # The page, plus one to check for a next page
+    assert mock_validate.call_count == 3
+    mock_all.assert_not_called()
+
+
+def test_runs_stream_reads_in_pages(client, query_runs):
+    task, runs = query_runs
+    with (
+        patch("kiln_server.run_api.STREAM_PAGE_SIZE", 2),
+        patch.object(
+            run_summary_index, "query", wraps=run_summary_index.query
+        ) as mock_query,
+    ):
+        response = client.get(
+            "/api/projects/project1/tasks/task1/runs/stream",
+            params={"sort": "created_at"},
+        )
+
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [
+        run.id for run in runs
+    ]
+    assert mock_query.call_count == 3
+    # Only the first page refreshes the index
+    assert [call.kwargs["refresh"] for call in mock_query.call_args_list] == [
+        True,
+        False,
+        False,
+    ]
+
+
+@pytest.mark.parametrize("sort", ["created_at", "-created_at", "rating", "-rating"])
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"tags": ["a"]},
+        {"source": "synthetic"},
+        {"rated": True, "min_rating": 3},
+        {"created_after": "2024-01-02T00:00:00Z", "created_before": "2024-01-05"},
+    ],
+)
+def test_runs_summaries_page_fallback_matches_index(client, query_runs, sort, params):
+    url = "/api/projects/project1/tasks/task1/runs_summaries/page"
+
+    def pages():
+        results = []
+        cursor = None
+        while True:
+            page_params = {**params, "sort": sort, "limit": 2}
+            if cursor is not None:
+                page_params["cursor"] = cursor
+            response = client.get(url, params=page_params)
+            assert response.status_code == 200
+            results.append(summary_inputs(response.json()["runs"]))
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                return results
+
+    indexed = pages()
+    with patch.object(
+        run_summary_index, "query", side_effect=sqlite3.OperationalError("no index")
+    ):
+        assert pages() == indexed
+
+
+def test_get_run_not_shadowed_by_page_routes(client, query_runs):
+    task, runs = query_runs
+    response = client.get(f"/api/projects/project1/tasks/task1/runs/{runs[0].id}")
+    assert response.status_code == 200
+    assert response.json()["id"] == runs[0].id
+
+
 @pytest.mark.asyncio
 async def test_get_runs_summaries_task_not_found(client):
     with patch("kiln_server.run_api.task_from_id") as mock_task_from_id: